@@ -1,4 +1,7 @@
+import json
 from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
 from typing import Any
 
 from loguru import logger
@@ -7,6 +10,7 @@ from strands.models import BedrockModel
 from strands.models.ollama import OllamaModel
 
 from doc_redaction.utils.commons import MissingArgumentError, ParameterTypeError
+from doc_redaction.utils.response_cache import CachedModel, cached_model
 
 MODEL_IDS: dict[str, str] = {
     "default": "eu.anthropic.claude-sonnet-4-20250514-v1:0",
@@ -16,22 +20,95 @@ MODEL_IDS: dict[str, str] = {
     "nova_pro": "eu.amazon.nova-pro-v1:0",
 }
 REGION: str = "eu-central-1"
+DEFAULT_MAX_TOKENS: int = 64000
+# Output token limits of models below DEFAULT_MAX_TOKENS; Bedrock rejects requests above them
+MAX_OUTPUT_TOKENS: dict[str, int] = {
+    MODEL_IDS["nova_lite"]: 10000,
+    MODEL_IDS["nova_pro"]: 10000,
+}
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Settings of the model of one agent.
+
+    Attributes:
+        model_id: Bedrock model id, or a key of MODEL_IDS.
+        max_tokens: Maximum output tokens; capped at the model's limit.
+        temperature: Sampling temperature.
+    """
+
+    model_id: str = MODEL_IDS["default"]
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    temperature: float = 0.0
+
 
-bedrock_model: BedrockModel = BedrockModel(
-    model_id=MODEL_IDS["default"],
-    region_name=REGION,
-    streaming=False,
-    temperature=0,
-    cachePoint="default",
-    cache_tools="default",
-    max_tokens=64000,
-)
+# Model settings per graph stage
+STAGE_MODELS: dict[str, ModelConfig] = {
+    "convert_result": ModelConfig(model_id=MODEL_IDS["default"]),
+    "detector_result": ModelConfig(model_id=MODEL_IDS["haiku"]),
+    "redact_result": ModelConfig(model_id=MODEL_IDS["haiku"]),
+}
+
+
+def resolve_model_id(model_id: str) -> str:
+    """Return the Bedrock model id of a MODEL_IDS key; full model ids are returned unchanged."""
+    return MODEL_IDS.get(model_id, model_id)
+
+
+def create_model(config: ModelConfig | None = None) -> BedrockModel | CachedModel:
+    """
+    Build a new BedrockModel from a model config.
+
+    Every call returns an independent instance, so agents never share mutable model state and
+    concurrent workflows can use different models. If a response cache is configured (see
+    ``configure_response_cache``), the model is wrapped in a CachedModel.
+
+    Args:
+        config: Model settings. Defaults to ``ModelConfig()``.
+
+    Returns:
+        BedrockModel with prompt and tool caching enabled, or the CachedModel wrapping it.
+    """
+    config = config or ModelConfig()
+    model_id = resolve_model_id(config.model_id)
+    model = BedrockModel(
+        model_id=model_id,
+        region_name=REGION,
+        streaming=False,
+        temperature=config.temperature,
+        cache_prompt="default",
+        cache_tools="default",
+        max_tokens=min(config.max_tokens, MAX_OUTPUT_TOKENS.get(model_id, config.max_tokens)),
+    )
+    return cached_model(model)
+
+
+def load_model_routing(path: str | None = None) -> dict[str, ModelConfig]:
+    """
+    Return the stage-to-model routing, optionally overridden by a JSON file.
+
+    The file maps graph stage names to ModelConfig fields; missing stages and fields keep their
+    defaults from STAGE_MODELS.
+
+    Args:
+        path: Optional JSON file, e.g. ``{"detector_result": {"model_id": "nova_lite", "max_tokens": 4000}}``.
+
+    Returns:
+        ModelConfig per graph stage.
+    """
+    routing = dict(STAGE_MODELS)
+    if path is None:
+        return routing
+    for stage, settings in json.loads(Path(path).read_text(encoding="utf-8")).items():
+        routing[stage] = replace(routing.get(stage, ModelConfig()), **settings)
+    return routing
 
 
 def create_agent(
     system_prompt: str,
     name: str | None = "Strands Agent",
-    model: BedrockModel | OllamaModel | None = bedrock_model,
+    model: BedrockModel | OllamaModel | CachedModel | None = None,
     tools: Sequence[str | dict[str, str] | Any] | None = None,
     output_model: Any | None = None,
 ) -> Agent:
@@ -40,7 +117,7 @@ def create_agent(
 
     - system_prompt: Required non-empty instructional prompt.
     - name: Optional agent name (default: "Strands Agent").
-    - model: Optional model. Falls back to default bedrock_model if None.
+    - model: Optional model. A new model from ``create_model()`` is built if None.
     - tools: Optional iterable of tool specs/objects. Converted internally to a list.
     - output_model: Optional structured output model for the agent.
 
@@ -53,9 +130,9 @@ def create_agent(
     if not system_prompt.strip():
         raise MissingArgumentError("system_prompt")
 
-    # Fallback to default model if none provided
+    # Every agent gets its own model unless one is provided
     if model is None:
-        model = bedrock_model
+        model = create_model()
 
     # Normalize tools to a list (avoid mutable default pitfalls)
     tools_list: list[str | dict[str, str] | Any] | None = list(tools) if tools else None
@@ -67,7 +144,7 @@ def create_agent(
         structured_output_model=output_model,
     )
 
-    if type(model) is BedrockModel:
+    if type(model.model if isinstance(model, CachedModel) else model) is BedrockModel:
         agent.name = name
 
     logger.info(
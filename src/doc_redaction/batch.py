@@ -0,0 +1,194 @@
+import asyncio
+import datetime
+import functools
+import glob
+import json
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import typer
+from loguru import logger
+
+from doc_redaction.agent import load_model_routing
+from doc_redaction.utils.commons import BudgetExceededError, Dir, DocumentOutsideContractDirError, Format, Prefix
+from doc_redaction.utils.page_conversion import DEFAULT_PAGES_PER_REQUEST
+from doc_redaction.utils.preflight import BudgetRouter
+from doc_redaction.utils.response_cache import configure_response_cache
+from doc_redaction.utils.token_tracker import check_model_pricing
+from doc_redaction.workflow import GRAPH_POOL, run_doc_processing_wf
+
+DEFAULT_MAX_CONCURRENCY: int = 4
+
+
+@dataclass
+class BatchItem:
+    """Outcome of one document of a batch, written as one line of the results manifest.
+
+    Attributes:
+        key: Document key.
+        status: "completed", "failed" (the graph did not complete), "refused" (over budget) or "error".
+        duration_s: Wall-clock time of the document's workflow.
+        error: Exception type and message if the workflow raised.
+        token_summary: Path of the token summary of a finished workflow.
+        finished_at: UTC timestamp in ISO format.
+    """
+
+    key: str
+    status: str
+    duration_s: float
+    error: str | None = None
+    token_summary: str | None = None
+    finished_at: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def resolve_keys(inputs: Iterable[str]) -> list[str]:
+    """
+    Turn document keys, PDF paths, directories and glob patterns into unique document keys.
+
+    Directories contribute all their PDF files. The workflow reads documents from ``data/contract/``,
+    so only the file name of a path is kept, and paths elsewhere are rejected.
+
+    Args:
+        inputs: Keys, paths, directories or glob patterns, e.g. ``data/contract/*vertrag*.pdf``.
+
+    Returns:
+        Document keys in input order without duplicates.
+
+    Raises:
+        DocumentOutsideContractDirError: If a path, directory or glob names a PDF outside ``data/contract/``.
+    """
+    keys: list[str] = []
+    for item in inputs:
+        if Path(item).is_dir():
+            keys.extend(_contract_key(pdf) for pdf in sorted(Path(item).glob(f"*{Format.PDF}")))
+        elif glob.has_magic(item):
+            keys.extend(_contract_key(Path(path)) for path in sorted(glob.glob(item)) if path.endswith(Format.PDF))
+        else:
+            keys.append(_contract_key(Path(item)) if item.endswith(Format.PDF) else item)
+    return list(dict.fromkeys(keys))
+
+
+def _contract_key(pdf: Path) -> str:
+    contract_dir = f"{Dir.Data}{Prefix.CONTRACT}"
+    if pdf.resolve().parent != Path(contract_dir).resolve():
+        raise DocumentOutsideContractDirError(str(pdf), contract_dir)
+    return pdf.stem
+
+
+def _run_document(key: str, router: BudgetRouter | None, workflow: Callable[..., Any]) -> BatchItem:
+    start = time.perf_counter()
+    try:
+        _, result, _ = workflow(key, router)
+        # Local mode runs no graph
+        status, error = ("completed" if result is None or result.status.value == "completed" else "failed"), None
+    except BudgetExceededError as e:
+        status, error = "refused", str(e)
+    except Exception as e:
+        # One failing document must not stop the batch; the error is kept in the manifest
+        logger.exception(f"Workflow for {key} failed")
+        status, error = "error", f"{type(e).__name__}: {e}"
+
+    return BatchItem(
+        key=key,
+        status=status,
+        duration_s=round(time.perf_counter() - start, 3),
+        error=error,
+        token_summary=f"{Dir.Data}{Prefix.TOKEN}{key}{Format.JSON}" if status in ("completed", "failed") else None,
+        finished_at=datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+    )
+
+
+async def run_batch(
+    keys: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    manifest_path: str | None = None,
+    router: BudgetRouter | None = None,
+    workflow: Callable[..., Any] = run_doc_processing_wf,
+) -> list[BatchItem]:
+    """
+    Run the document workflow for many documents concurrently.
+
+    Documents run on a pool of ``max_concurrency`` worker threads, so documents waiting on Bedrock
+    overlap. A document that raises is recorded as an error and does not affect the others. Every
+    finished document is appended to a JSON Lines manifest right away, so the manifest of an
+    interrupted batch lists all documents finished so far. Process pools started by the workers (OCR,
+    parallel assessment) do not fork, see ``process_pool_context``.
+
+    Args:
+        keys: Document keys; duplicates are processed once.
+        max_concurrency: Maximum number of documents processed at the same time.
+        manifest_path: Results manifest. Defaults to ``data/batch/<timestamp>_<id>.jsonl``.
+        router: Optional budget router shared by all documents of the batch.
+        workflow: Workflow run per document, called with the key and the router.
+
+    Returns:
+        BatchItem per document, in the order of keys.
+
+    Example:
+        items = asyncio.run(run_batch(["spielbank_rocketbase_vertrag", "rocketbase_aws_agreement"], max_concurrency=2))
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    run_name = f"{datetime.datetime.now(datetime.UTC):%Y%m%dT%H%M%S}_{uuid.uuid4().hex[:8]}"
+    manifest = Path(manifest_path or f"{Dir.Data}{Prefix.BATCH}{run_name}{Format.JSONL}")
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="doc-wf") as executor, manifest.open("a", encoding="utf-8") as out:
+
+        async def process(key: str) -> BatchItem:
+            item: BatchItem = await loop.run_in_executor(executor, _run_document, key, router, workflow)
+            # Written from the event loop thread only, so lines never interleave
+            out.write(json.dumps(item.to_dict()) + "\n")
+            out.flush()
+            logger.info(f"Batch: {key} {item.status} in {item.duration_s:.1f}s")
+            return item
+
+        items = await asyncio.gather(*(process(key) for key in unique_keys))
+
+    completed = sum(item.status == "completed" for item in items)
+    logger.info(f"Batch finished: {completed}/{len(items)} documents completed, manifest {manifest}")
+    return items
+
+
+def main(
+    inputs: list[str] = typer.Argument(None, help="Document keys, PDF paths, directories or glob patterns. Defaults to all contracts."),  # noqa: B008
+    jobs: int = typer.Option(DEFAULT_MAX_CONCURRENCY, "--jobs", "-j", help="Maximum number of documents processed concurrently."),
+    manifest: str | None = typer.Option(None, help="Path of the JSON Lines results manifest."),
+    document_budget: float | None = typer.Option(None, help="Maximum predicted cost per document."),
+    batch_budget: float | None = typer.Option(None, help="Maximum predicted cost of the whole batch."),
+    routing: str | None = typer.Option(None, help="JSON file mapping graph stages to model settings."),
+    mode: str = typer.Option("agent", help="Workflow mode: 'agent', or 'local' for regex detection and local redaction."),
+    pages_per_request: int = typer.Option(DEFAULT_PAGES_PER_REQUEST, help="Maximum pages of average complexity per vision request."),
+    from_stage: str | None = typer.Option(None, help="First pipeline stage to recompute; completed earlier stages are reused."),
+    response_cache: str = typer.Option("off", help="Model response cache: 'off', 'record', or 'replay' to fail on requests not recorded before."),
+) -> None:
+    """
+    Process many documents concurrently.
+
+    Example:
+        python -m doc_redaction.batch data/contract --jobs 8 --batch-budget 5
+    """
+    configure_response_cache(response_cache)
+    keys = resolve_keys(inputs or [f"{Dir.Data}{Prefix.CONTRACT}"])
+    router = BudgetRouter(document_budget=document_budget, batch_budget=batch_budget) if document_budget is not None or batch_budget is not None else None
+    # Every worker leases its own graph, keep as many warm as there are workers
+    GRAPH_POOL.max_idle = jobs
+    workflow = functools.partial(
+        run_doc_processing_wf, routing=check_model_pricing(load_model_routing(routing)), mode=mode, pages_per_request=pages_per_request, from_stage=from_stage
+    )
+    items = asyncio.run(run_batch(keys, max_concurrency=jobs, manifest_path=manifest, router=router, workflow=workflow))
+    if any(item.status != "completed" for item in items):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,14 +1,11 @@
 # System prompts
 
-CONVERTER_SYSTEM_PROMPT: str = """ You are a helpful assistant that can process documents and images.
-    Extract all content from the document. Preserve the formatting as much as possible.
-    Be thorough and capture all details from the document.
-
-    You can use:
-
-    1. For PNG, JPEG/JPG, GIF, or WebP formats use image_reader to process file
-    2. If multiple images are generated, use merge_markdown_strings to combine them into a single markdown string
-    4. Save the result using save_file
+PAGE_CONVERTER_SYSTEM_PROMPT: str = """ You are a helpful assistant that converts scanned document pages to markdown.
+    The user message contains one or more page images, each preceded by its page number.
+    Extract all content of every page image. Preserve the formatting as much as possible.
+    Be thorough and capture all details from the pages.
+    Start the markdown of every page with the delimiter line <!-- page N -->, where N is its page number.
+    Return only the markdown of the pages in the given order, without any comments.
     """
 
 DETECTION_SYSTEM_PROMPT: str = """
@@ -36,3 +33,17 @@ REDACTED_SYSTEM_PROMPT: str = """
     3. Return the modified document
     4. Save the result using save_file
     """
+
+# Task prompt prefix, identical for every document so that Bedrock can serve it from the prompt cache.
+# Per-document details follow after the cache point.
+
+WORKFLOW_TASK_PROMPT: str = """
+    Process one contract document in two steps. The document section after these instructions contains
+    the converted markdown of the document and names all output files.
+
+    1. Detect sensitive data in the markdown. Return the results as structured_output following this
+       SensitiveData JSON schema: {schema}
+       Save the result to the detection output file.
+    2. Redact all information provided in detector_result except for the document_analysis field.
+       Save the result to the redaction output file.
+    """
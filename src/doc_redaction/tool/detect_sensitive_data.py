@@ -197,7 +197,8 @@ def detect_sensitive_data(markdown_content: str) -> dict[str, list[str]]:
                     continue
                 matches.add(match)
         if matches:
-            results[key] = list(matches)
+            # Sorted, so the tool result is identical across processes (set order depends on hash randomization)
+            results[key] = sorted(matches)
 
     # Add German & English number words
     numbers_set = set(results.get("numbers", []))
@@ -206,7 +207,7 @@ def detect_sensitive_data(markdown_content: str) -> dict[str, list[str]]:
         if clean_word in GERMAN_NUMBER_WORDS or clean_word in ENGLISH_NUMBER_WORDS:
             numbers_set.add(clean_word)
     if numbers_set:
-        results["numbers"] = list(numbers_set)
+        results["numbers"] = sorted(numbers_set)
 
     return results
 
@@ -0,0 +1,152 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+import typer
+from loguru import logger
+
+from doc_redaction.utils.commons import CacheStats, Dir, Prefix, atomic_write, file_sha256, save_as_json
+from doc_redaction.utils.doc_assessment import ASSESSMENT_VERSION, DEFAULT_SAMPLE_SIZE, assess_doc_quality
+from doc_redaction.utils.doc_session import DocumentSession
+
+
+class AssessmentCache:
+    """
+    Content-addressed store of assessment reports.
+
+    Entries are keyed by the SHA-256 of the PDF bytes and the assessment variant, and stamped with
+    the assessment version. An entry written by another version is treated as a miss, so upgrading
+    the assessment logic invalidates old reports without clearing the directory.
+
+    Args:
+        cache_dir: Root directory of the cache.
+        version: Version stamp of the assessment logic.
+    """
+
+    def __init__(self, cache_dir: str = f"{Dir.Data}{Prefix.ASSESSMENT_CACHE}", version: str = ASSESSMENT_VERSION) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def path(self, pdf_hash: str, variant: str) -> Path:
+        """Return the cache file path of an entry; the first two hash characters shard the directory."""
+        return self.cache_dir / pdf_hash[:2] / f"{pdf_hash}_{variant}.json"
+
+    def get(self, pdf_hash: str, variant: str) -> dict[str, Any] | None:
+        """Return the cached report or None on a miss or version mismatch."""
+        try:
+            entry: dict[str, Any] = json.loads(self.path(pdf_hash, variant).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = {}
+
+        hit = entry.get("version") == self.version
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+        return entry["assessment"] if hit else None
+
+    def put(self, pdf_hash: str, variant: str, assessment: dict[str, Any]) -> None:
+        """Store a report, replacing any entry of the same key atomically."""
+        atomic_write(self.path(pdf_hash, variant), json.dumps({"version": self.version, "assessment": assessment}).encode("utf-8"))
+
+
+def assessment_variant(mode: str = "full", sample_size: int = DEFAULT_SAMPLE_SIZE, seed: int = 0) -> str:
+    """Name the assessment settings that change the report. Full and parallel mode produce the same report."""
+    return f"sampled-{sample_size}-{seed}" if mode == "sampled" else "full"
+
+
+def cached_assess_doc_quality(
+    file_path: str,
+    output_path: str | None = None,
+    session: DocumentSession | None = None,
+    cache: AssessmentCache | None = None,
+    mode: str = "full",
+    max_workers: int | None = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Return the assessment of a PDF, computing it only if the file content was not assessed before.
+
+    On a hit the PDF is hashed but never parsed, and the report at ``output_path`` is only written
+    if it is missing or differs from the cached one.
+
+    Args:
+        file_path: Local path to the PDF document.
+        output_path: Optional path to write the JSON assessment.
+        session: Optional open session on the same PDF. Its content hash is reused.
+        cache: Assessment cache. Defaults to the cache below ``data/cache/assessment/``.
+        mode: Assessment mode, see ``assess_doc_quality``.
+        max_workers: Number of worker processes in parallel mode.
+        sample_size: Number of pages analysed in sampled mode.
+        seed: Random seed of the page sample.
+
+    Returns:
+        Assessment dictionary as returned by ``assess_doc_quality``.
+
+    Example:
+        report = cached_assess_doc_quality("data/contract/spielbank_rocketbase_vertrag.pdf", "data/quality/spielbank_rocketbase_vertrag.json")
+    """
+    cache = AssessmentCache() if cache is None else cache
+    pdf_hash = session.sha256 if session is not None else file_sha256(file_path)
+    variant = assessment_variant(mode, sample_size, seed)
+
+    assessment = cache.get(pdf_hash, variant)
+    if assessment is None:
+        assessment = assess_doc_quality(
+            file_path=file_path,
+            output_path=output_path,
+            session=session,
+            mode=mode,
+            max_workers=max_workers,
+            sample_size=sample_size,
+            seed=seed,
+        )
+        cache.put(pdf_hash, variant, assessment)
+        return assessment
+
+    logger.info(f"Assessment cache hit for {file_path}")
+    if output_path and _stored_report(output_path) != assessment:
+        save_as_json(data=json.dumps(assessment, indent=2), filename=output_path)
+    return assessment
+
+
+def _stored_report(output_path: str) -> dict[str, Any] | None:
+    try:
+        return json.loads(Path(output_path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def warm_assessment_cache(directory: str = f"{Dir.Data}{Prefix.CONTRACT}", pattern: str = "*.pdf", mode: str = "full") -> dict[str, bool]:
+    """
+    Assess every PDF in a directory that is not cached yet.
+
+    Args:
+        directory: Directory to scan.
+        pattern: Glob pattern of the documents, relative to directory.
+        mode: Assessment mode, see ``assess_doc_quality``.
+
+    Returns:
+        Mapping of document path to whether its report was already cached.
+
+    Example:
+        python -m doc_redaction.utils.assessment_cache --directory data/contract
+    """
+    cache = AssessmentCache()
+    cached: dict[str, bool] = {}
+    for pdf in sorted(Path(directory).glob(pattern)):
+        hits = cache.stats.hits
+        cached_assess_doc_quality(str(pdf), cache=cache, mode=mode)
+        cached[str(pdf)] = cache.stats.hits > hits
+
+    logger.info(f"Assessment cache warmed: {sum(cached.values())} cached, {len(cached) - sum(cached.values())} assessed")
+    return cached
+
+
+if __name__ == "__main__":
+    typer.run(warm_assessment_cache)
@@ -0,0 +1,128 @@
+import datetime
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from doc_redaction.utils.commons import Dir, Format, InvalidPipelineStageError, Prefix, atomic_write, file_sha256
+
+# Bump when the manifest layout or the meaning of a stage output changes
+CHECKPOINT_VERSION: str = "1"
+PIPELINE_STAGES: tuple[str, ...] = ("quality", "render", "markdown", "confidential", "redact")
+
+
+def stage_fingerprint(config: dict[str, Any]) -> str:
+    """Hash the settings a stage output depends on; dataclasses such as ModelConfig are hashed by value."""
+    payload = json.dumps(config, sort_keys=True, default=asdict)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class StageRecord:
+    """A completed stage: the fingerprint of its settings and the SHA-256 of every output file."""
+
+    config: str
+    outputs: dict[str, str] = field(default_factory=dict)
+    completed_at: str = ""
+
+
+class Checkpoint:
+    """
+    Stage manifest of one document, keyed by the PDF content hash.
+
+    Every completed stage records the fingerprint of its settings and the hashes of its output files in
+    ``data/checkpoint/<key>.json``. A re-run skips a stage only if the PDF, the checkpoint version and the
+    stage settings are unchanged and its outputs are still on disk untouched. Stages depend on all earlier
+    stages, so once a stage is recomputed, every later stage is recomputed as well. ``from_stage`` forces
+    recomputation from that stage on.
+
+    Args:
+        key: Document key.
+        pdf_hash: SHA-256 of the PDF bytes.
+        from_stage: First stage to recompute, or None to resume after the last valid stage.
+        checkpoint_dir: Directory of the manifests.
+
+    Raises:
+        InvalidPipelineStageError: If from_stage is not one of PIPELINE_STAGES.
+
+    Example:
+        checkpoint = Checkpoint("spielbank_rocketbase_vertrag", session.sha256, from_stage="markdown")
+        if not checkpoint.skip("markdown", config):
+            ...
+            checkpoint.complete("markdown", config, ["data/markdown/spielbank_rocketbase_vertrag.md"])
+    """
+
+    def __init__(self, key: str, pdf_hash: str, from_stage: str | None = None, checkpoint_dir: str = f"{Dir.Data}{Prefix.CHECKPOINT}") -> None:
+        if from_stage is not None and from_stage not in PIPELINE_STAGES:
+            raise InvalidPipelineStageError(from_stage, PIPELINE_STAGES)
+        self.path = Path(checkpoint_dir) / f"{key}{Format.JSON}"
+        self.pdf_hash = pdf_hash
+        self.stages: dict[str, StageRecord] = self._load()
+        if from_stage is not None:
+            for stage in PIPELINE_STAGES[PIPELINE_STAGES.index(from_stage) :]:
+                self.stages.pop(stage, None)
+        self._recomputing = False
+
+    def _load(self) -> dict[str, StageRecord]:
+        try:
+            manifest: dict[str, Any] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # A changed PDF or manifest layout invalidates every stage
+        if manifest.get("version") != CHECKPOINT_VERSION or manifest.get("pdf_sha256") != self.pdf_hash:
+            return {}
+        return {stage: StageRecord(**record) for stage, record in manifest.get("stages", {}).items()}
+
+    def skip(self, stage: str, config: dict[str, Any]) -> bool:
+        """
+        Return whether a stage can be skipped. Call in pipeline order: once a stage cannot be skipped, no later stage can.
+
+        Args:
+            stage: One of PIPELINE_STAGES.
+            config: Settings the stage output depends on.
+        """
+        valid = not self._recomputing and self._valid(stage, config)
+        if valid:
+            logger.info(f"Checkpoint: skipping completed stage {stage}")
+        else:
+            self._recomputing = True
+        return valid
+
+    def skippable_stages(self, configs: dict[str, dict[str, Any]]) -> list[str]:
+        """
+        Return the stages ``skip`` would skip from here on, in pipeline order, without recording anything.
+
+        Args:
+            configs: Settings per stage; a stage missing from configs ends the list.
+        """
+        stages: list[str] = []
+        for stage in PIPELINE_STAGES:
+            if self._recomputing or stage not in configs or not self._valid(stage, configs[stage]):
+                break
+            stages.append(stage)
+        return stages
+
+    def _valid(self, stage: str, config: dict[str, Any]) -> bool:
+        record = self.stages.get(stage)
+        return (
+            record is not None
+            and record.config == stage_fingerprint(config)
+            and all(Path(path).is_file() and file_sha256(path) == digest for path, digest in record.outputs.items())
+        )
+
+    def complete(self, stage: str, config: dict[str, Any], outputs: list[str]) -> None:
+        """Record a completed stage with its output files and write the manifest atomically."""
+        self.stages[stage] = StageRecord(
+            config=stage_fingerprint(config),
+            outputs={path: file_sha256(path) for path in outputs},
+            completed_at=datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        )
+        manifest = {
+            "version": CHECKPOINT_VERSION,
+            "pdf_sha256": self.pdf_hash,
+            "stages": {name: asdict(self.stages[name]) for name in PIPELINE_STAGES if name in self.stages},
+        }
+        atomic_write(self.path, json.dumps(manifest, indent=2).encode("utf-8"))
@@ -1,8 +1,12 @@
+import hashlib
+import multiprocessing
 import os
+import tempfile
+import threading
 from dataclasses import dataclass
+from multiprocessing.context import BaseContext
 from pathlib import Path
 
-import pypdf
 from loguru import logger
 
 
@@ -13,8 +17,13 @@ class Dir:
 
 @dataclass
 class Prefix:
+    ASSESSMENT_CACHE: str = "cache/assessment/"
+    BATCH: str = "batch/"
+    CHECKPOINT: str = "checkpoint/"
     CONFIDENTIAL: str = "confidential/"
     CONTRACT: str = "contract/"
+    RENDER_CACHE: str = "cache/render/"
+    RESPONSE_CACHE: str = "cache/response/"
     MARKDOWN: str = "markdown/"
     QUALITY: str = "quality/"
     REDACT: str = "redact/"
@@ -25,8 +34,24 @@ class Prefix:
 @dataclass
 class Format:
     JSON: str = ".json"
+    JSONL: str = ".jsonl"
     MD: str = ".md"
     PDF: str = ".pdf"
+    SQLITE: str = ".sqlite"
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
 
 class MissingArgumentError(ValueError):
@@ -50,6 +75,65 @@ class InvalidDocumentFormatError(ValueError):
         super().__init__(f"Invalid document format: {doc_format}")
 
 
+class InvalidAssessmentModeError(ValueError):
+    """Raised when an unknown document assessment mode is requested."""
+
+    def __init__(self, mode: str, modes: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid assessment mode: {mode}. Supported modes are: {', '.join(modes)}")
+
+
+class InvalidTokenCountMethodError(ValueError):
+    """Raised when an unknown token counting method is requested."""
+
+    def __init__(self, method: str, methods: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid token count method: {method}. Supported methods are: {', '.join(methods)}")
+
+
+class InvalidLedgerGroupingError(ValueError):
+    """Raised when token ledger rows are aggregated by an unknown grouping."""
+
+    def __init__(self, grouping: str, groupings: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid ledger grouping: {grouping}. Supported groupings are: {', '.join(groupings)}")
+
+
+class InvalidWorkflowModeError(ValueError):
+    """Raised when an unknown workflow mode is requested."""
+
+    def __init__(self, mode: str, modes: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid workflow mode: {mode}. Supported modes are: {', '.join(modes)}")
+
+
+class InvalidPipelineStageError(ValueError):
+    """Raised when an unknown pipeline stage is requested."""
+
+    def __init__(self, stage: str, stages: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid pipeline stage: {stage}. Supported stages are: {', '.join(stages)}")
+
+
+class InvalidResponseCacheModeError(ValueError):
+    """Raised when an unknown response cache mode is requested."""
+
+    def __init__(self, mode: str, modes: tuple[str, ...]) -> None:
+        super().__init__(f"Invalid response cache mode: {mode}. Supported modes are: {', '.join(modes)}")
+
+
+class ResponseCacheMissError(LookupError):
+    """Raised in replay mode when a model request has no recorded response."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__(f"No recorded model response for request {key}")
+        self.key = key
+
+
+class UnpricedModelError(ValueError):
+    """Raised when a stage is routed to a model without token cost rates."""
+
+    def __init__(self, stage: str, model_id: str) -> None:
+        super().__init__(f"Model {model_id} of stage {stage} has no token cost rates")
+        self.stage = stage
+        self.model_id = model_id
+
+
 class InvalidDocumentKeyError(ValueError):
     """Raised when the provided document key is missing or invalid."""
 
@@ -57,6 +141,45 @@ class InvalidDocumentKeyError(ValueError):
         super().__init__("A document key must be provided as a non-empty string.")
 
 
+class DocumentOutsideContractDirError(ValueError):
+    """Raised when a batch input names a PDF outside the directory the workflow reads documents from."""
+
+    def __init__(self, path: str, directory: str) -> None:
+        super().__init__(f"{path} is not in {directory}; the workflow only reads documents from there, copy the file first")
+
+
+class BudgetExceededError(Exception):
+    """Raised when a document's predicted cost does not fit the budget, even on the cheapest models."""
+
+    def __init__(self, file_path: str, cost: float) -> None:
+        super().__init__(f"Predicted cost {cost:.4f} of {file_path} exceeds the budget")
+        self.file_path = file_path
+        self.cost = cost
+
+
+class UnconvertedPagesError(Exception):
+    """Raised when pages are still missing after the text layer, OCR and the vision model have run."""
+
+    def __init__(self, pages: list[int]) -> None:
+        super().__init__(f"Pages {[page + 1 for page in pages]} were not converted to markdown")
+        self.pages = pages
+
+
+class PageConversionError(Exception):
+    """Raised when pages could not be converted to markdown, even after retries."""
+
+    def __init__(self, pages: list[int], e: Exception) -> None:
+        super().__init__(f"Could not convert pages {[page + 1 for page in pages]}: {e}")
+        self.pages = pages
+
+
+class PageSplitError(Exception):
+    """Raised when the markdown of a multi-page request does not contain the delimiter of every requested page."""
+
+    def __init__(self, expected: list[int], found: list[int]) -> None:
+        super().__init__(f"Expected page delimiters of pages {[page + 1 for page in expected]}, found {[page + 1 for page in found]}")
+
+
 class PDFProcessingError(Exception):
     """Raised when PDF processing fails."""
 
@@ -65,6 +188,23 @@ class PDFProcessingError(Exception):
         self.file_path = file_path
 
 
+class PDFNotFoundError(FileNotFoundError):
+    """Raised when the specified PDF file does not exist."""
+
+    def __init__(self, pdf_path: Path) -> None:
+        super().__init__(f"PDF not found: {pdf_path}")
+        self.pdf_path = pdf_path
+
+
+class PDFOpenError(ValueError):
+    """Raised when a PDF cannot be opened with PyMuPDF."""
+
+    def __init__(self, pdf_path: str | Path, original_error: Exception) -> None:
+        super().__init__(f"Cannot open PDF '{pdf_path}': {original_error}")
+        self.pdf_path = pdf_path
+        self.original_error = original_error
+
+
 class ParameterTypeError(TypeError):
     def __init__(self, name: str, expected: str):
         super().__init__(f"Parameter {name!r} must be {expected}")
@@ -108,18 +248,18 @@ def get_pdf_page_count(file_path: str) -> int:
         int: Total number of pages in the PDF.
 
     Raises:
-        PDFProcessingError: If the file cannot be opened, is not a valid PDF, or the page count cannot be determined.
+        PDFNotFoundError: If the file does not exist.
+        PDFOpenError: If the file cannot be opened as a PDF.
 
     Example:
         page_count = get_pdf_page_count("path/to/file.pdf")
         print(f"The document has {page_count} pages.")
     """
-    try:
-        with open(file_path, "rb") as file:
-            pdf_reader = pypdf.PdfReader(file)
-            return len(pdf_reader.pages)
-    except Exception as e:
-        raise PDFProcessingError(file_path, e) from e
+    # doc_session imports this module
+    from doc_redaction.utils.doc_session import DocumentSession
+
+    with DocumentSession(file_path) as session:
+        return session.page_count
 
 
 def get_file_size(file_path: str) -> int:
@@ -141,3 +281,84 @@ def get_file_size(file_path: str) -> int:
             print(f"File size: {size} bytes")
     """
     return os.path.getsize(file_path)
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Return the SHA-256 hex digest of a file's content.
+
+    Parameters:
+        file_path (str): Path to the file.
+        chunk_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file bytes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+
+    Example:
+        digest = file_sha256("data/contract/spielbank_rocketbase_vertrag.pdf")
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _current_umask() -> int:
+    # os.umask can only be read by setting it; done once at import, before worker threads create files
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK: int = _current_umask()
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write a file through a temporary file in the same directory that is renamed into place.
+
+    Concurrent readers never observe a partial file and concurrent writers of the same path are harmless;
+    the temporary file is removed if the write fails. The file gets the permissions of a regular
+    ``open(path, "w")``, not the owner-only mode of temporary files.
+
+    Args:
+        path: Destination file; missing parent directories are created.
+        data: File content.
+
+    Example:
+        atomic_write(Path("data/checkpoint/spielbank_rocketbase_vertrag.json"), json.dumps(manifest).encode("utf-8"))
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        Path(tmp_name).chmod(0o666 & ~UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def process_pool_context() -> BaseContext | None:
+    """
+    Return the start method context for a ProcessPoolExecutor created by the calling thread.
+
+    Forking while other threads run (e.g. the document workers of a batch) copies locks they hold into
+    the child, which can deadlock it. With other threads running, worker processes are started by a
+    forkserver, or spawned where forkservers are not available; otherwise the platform default is kept.
+
+    Returns:
+        Multiprocessing context for ``mp_context``, or None for the default.
+
+    Example:
+        with ProcessPoolExecutor(max_workers=4, mp_context=process_pool_context()) as executor:
+            pages = list(executor.map(ocr_page, image_paths))
+    """
+    if threading.active_count() == 1:
+        return None
+    return multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
@@ -1,11 +1,84 @@
 import json
+import math
+import os
+import random
+import statistics
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import fitz  # PyMuPDF
 from loguru import logger
 
+from doc_redaction.utils.commons import InvalidAssessmentModeError, PDFOpenError, process_pool_context
+from doc_redaction.utils.doc_session import DocumentSession
+
+# Bump whenever the report layout or any metric changes, so cached assessments are recomputed
+ASSESSMENT_VERSION: str = "3"
+SPECIAL_CHARS: str = "€$%@#&*"
+ASSESSMENT_MODES: tuple[str, ...] = ("full", "parallel", "sampled")
+PARALLEL_MIN_PAGES: int = 64
+DEFAULT_SAMPLE_SIZE: int = 50
+Z_95: float = 1.96
+
+
+@dataclass
+class _TextStats:
+    """Constant-size summary of a text, mergeable in order, that replaces keeping the full document text."""
+
+    characters: int = 0
+    words: int = 0
+    newlines: int = 0
+    leading_whitespace: int = 0
+    trailing_whitespace: int = 0
+    has_content: bool = False
+    starts_in_word: bool = False
+    ends_in_word: bool = False
+    has_digits: bool = False
+    has_special_chars: bool = False
+
+    @classmethod
+    def of(cls, text: str) -> "_TextStats":
+        stripped = text.strip()
+        return cls(
+            characters=len(text),
+            words=len(text.split()),
+            newlines=text.count("\n"),
+            leading_whitespace=len(text) - len(text.lstrip()) if stripped else len(text),
+            trailing_whitespace=len(text) - len(text.rstrip()) if stripped else len(text),
+            has_content=bool(stripped),
+            starts_in_word=bool(text) and not text[0].isspace(),
+            ends_in_word=bool(text) and not text[-1].isspace(),
+            has_digits=any(ch.isdigit() for ch in text),
+            has_special_chars=any(ch in SPECIAL_CHARS for ch in text),
+        )
+
+    def merge(self, other: "_TextStats") -> "_TextStats":
+        """Return the stats of this text directly followed by ``other``."""
+        return _TextStats(
+            characters=self.characters + other.characters,
+            # a word split across the boundary is counted once
+            words=self.words + other.words - (self.ends_in_word and other.starts_in_word),
+            newlines=self.newlines + other.newlines,
+            leading_whitespace=self.leading_whitespace if self.has_content else self.characters + other.leading_whitespace,
+            trailing_whitespace=other.trailing_whitespace if other.has_content else self.trailing_whitespace + other.characters,
+            has_content=self.has_content or other.has_content,
+            starts_in_word=self.starts_in_word if self.characters else other.starts_in_word,
+            ends_in_word=other.ends_in_word if other.characters else self.ends_in_word,
+            has_digits=self.has_digits or other.has_digits,
+            has_special_chars=self.has_special_chars or other.has_special_chars,
+        )
+
+    @property
+    def lines(self) -> int:
+        return self.newlines + 1
+
+    @property
+    def stripped_length(self) -> int:
+        return self.characters - self.leading_whitespace - self.trailing_whitespace if self.has_content else 0
+
 
 def _basic_file_info(doc: fitz.Document, file_path: str) -> dict[str, Any]:
     return {
@@ -29,20 +102,28 @@ def _fonts_used(text_dict: dict[str, Any]) -> set[str]:
     return fonts
 
 
-def _analyze_page(page: fitz.Page, index: int) -> tuple[dict[str, Any], str, int, int]:
-    page_text = page.get_text()
-    blocks = page.get_text("blocks")
+def _plain_text(text_blocks: list[dict[str, Any]]) -> str:
+    # same layout as page.get_text(): every line is terminated by a newline
+    return "".join("".join(span.get("text", "") for span in line.get("spans", [])) + "\n" for block in text_blocks for line in block.get("lines", []))
+
+
+def _analyze_page(page: fitz.Page, index: int, textpage: fitz.TextPage | None = None) -> tuple[dict[str, Any], str, int, int]:
+    # a single extraction; plain text, block count and fonts are all derived from the same dict
+    if textpage is None:
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    text_dict = page.get_text("dict", textpage=textpage)
+    text_blocks = [block for block in text_dict.get("blocks", []) if block.get("type") == 0]
+    page_text = _plain_text(text_blocks)
     images = page.get_images()
     rect = page.rect
     text_area = len(page_text.replace(" ", "").replace("\n", ""))
     page_area = rect.width * rect.height or 1
     density = text_area / page_area
-    text_dict = page.get_text("dict")
 
     page_info: dict[str, Any] = {
         "page_number": index + 1,
         "text_length": len(page_text),
-        "text_blocks_count": len(blocks),
+        "text_blocks_count": len(text_blocks),
         "image_count": len(images),
         "character_count": text_area,
         "word_count": len(page_text.split()),
@@ -62,23 +143,23 @@ def _analyze_page(page: fitz.Page, index: int) -> tuple[dict[str, Any], str, int
     elif len(images) > 5:
         page_info["note"] = "High image count - complex layout"
 
-    return page_info, page_text, len(blocks), len(images)
+    return page_info, page_text, len(text_blocks), len(images)
 
 
 def _aggregate_metrics(
-    text: str,
+    text: _TextStats,
     blocks: int,
     images: int,
     page_details: list[dict[str, Any]],
     page_count: int,
 ) -> dict[str, Any]:
     return {
-        "total_characters": len(text),
-        "total_words": len(text.split()),
-        "total_lines": len(text.split("\n")),
+        "total_characters": text.characters,
+        "total_words": text.words,
+        "total_lines": text.lines,
         "total_text_blocks": blocks,
         "total_images": images,
-        "average_chars_per_page": (len(text) / page_count) if page_count else 0,
+        "average_chars_per_page": (text.characters / page_count) if page_count else 0,
         "pages_with_content": sum(p["text_length"] > 10 for p in page_details),
         "pages_without_content": sum(p["text_length"] <= 10 for p in page_details),
         "image_only_pages": sum(p.get("is_image_page", False) for p in page_details),
@@ -86,11 +167,97 @@ def _aggregate_metrics(
     }
 
 
-def _content_analysis(text: str, pages: list[dict[str, Any]]) -> dict[str, Any]:
+def _accumulate(results: Iterable[tuple[dict[str, Any], str, int, int]]) -> tuple[list[dict[str, Any]], _TextStats, int, int]:
+    page_details: list[dict[str, Any]] = []
+    total_text = _TextStats()
+    total_blocks = 0
+    total_images = 0
+    for page_info, page_text, block_count, image_count in results:
+        page_details.append(page_info)
+        total_text = total_text.merge(_TextStats.of(page_text))
+        total_blocks += block_count
+        total_images += image_count
+    return page_details, total_text, total_blocks, total_images
+
+
+def _analyze_page_range(file_path: str, start: int, stop: int) -> tuple[list[dict[str, Any]], _TextStats, int, int]:
+    # runs in a worker process, which has to open its own document handle
+    with fitz.open(file_path) as document:
+        return _accumulate(_analyze_page(document[idx], idx) for idx in range(start, stop))
+
+
+def _analyze_parallel(file_path: str, page_count: int, max_workers: int | None) -> tuple[list[dict[str, Any]], _TextStats, int, int]:
+    workers = min(max_workers or os.cpu_count() or 1, page_count)
+    step = math.ceil(page_count / workers)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+        parts = list(executor.map(_analyze_page_range, [file_path] * len(starts), starts, stops))
+
+    page_details: list[dict[str, Any]] = []
+    total_text = _TextStats()
+    total_blocks = 0
+    total_images = 0
+    for details, text, blocks, images in parts:
+        page_details.extend(details)
+        total_text = total_text.merge(text)
+        total_blocks += blocks
+        total_images += images
+    logger.info(f"Assessed {page_count} pages with {workers} worker processes")
+    return page_details, total_text, total_blocks, total_images
+
+
+def _stratified_sample(page_count: int, sample_size: int, seed: int) -> list[int]:
+    # one random page out of each of sample_size equally sized, contiguous strata
+    rng = random.Random(seed)  # noqa: S311 - sampling, not cryptography
+    edges = [round(i * page_count / sample_size) for i in range(sample_size + 1)]
+    return [rng.randrange(edges[i], edges[i + 1]) for i in range(sample_size)]
+
+
+def _estimate_total(values: list[float], page_count: int) -> tuple[float, list[float]]:
+    n = len(values)
+    mean = statistics.fmean(values)
+    variance = statistics.variance(values) if n > 1 else 0.0
+    # standard error of the extrapolated total with finite population correction
+    margin = Z_95 * page_count * math.sqrt((1 - n / page_count) * variance / n)
+    total = mean * page_count
+    return total, [max(total - margin, 0.0), total + margin]
+
+
+def _extrapolate_metrics(page_details: list[dict[str, Any]], page_count: int) -> dict[str, Any]:
+    series: dict[str, list[float]] = {
+        "total_characters": [p["text_length"] for p in page_details],
+        "total_words": [p["word_count"] for p in page_details],
+        "total_lines": [p["line_count"] - 1 for p in page_details],
+        "total_text_blocks": [p["text_blocks_count"] for p in page_details],
+        "total_images": [p["image_count"] for p in page_details],
+        "pages_with_content": [p["text_length"] > 10 for p in page_details],
+        "pages_without_content": [p["text_length"] <= 10 for p in page_details],
+        "image_only_pages": [p.get("is_image_page", False) for p in page_details],
+    }
+    estimates = {name: _estimate_total(values, page_count) for name, values in series.items()}
+    # a document has one line more than it has line breaks
+    total_lines, lines_bounds = estimates["total_lines"]
+    estimates["total_lines"] = (total_lines + 1, [bound + 1 for bound in lines_bounds])
+
+    metrics: dict[str, Any] = {name: round(total) for name, (total, _) in estimates.items()}
+    metrics["average_chars_per_page"] = estimates["total_characters"][0] / page_count
+    metrics["average_text_density"] = statistics.fmean(p["text_density"] for p in page_details)
+    metrics["sampling"] = {
+        "sample_size": len(page_details),
+        "population": page_count,
+        "confidence_level": 0.95,
+        "bounds": {name: bounds for name, (_, bounds) in estimates.items()},
+    }
+    return metrics
+
+
+def _content_analysis(text: _TextStats, pages: list[dict[str, Any]]) -> dict[str, Any]:
     return {
-        "has_meaningful_content": len(text.strip()) > 100,
-        "contains_numbers": any(ch.isdigit() for ch in text),
-        "contains_special_chars": any(ch in "€$%@#&*" for ch in text),
+        "has_meaningful_content": text.stripped_length > 100,
+        "contains_numbers": text.has_digits,
+        "contains_special_chars": text.has_special_chars,
         "page_details": pages,
     }
 
@@ -146,42 +313,66 @@ def _save_report(assessment: dict[str, Any], output_path: str) -> None:
 def assess_doc_quality(
     file_path: str,
     output_path: str | None = None,
+    session: DocumentSession | None = None,
+    mode: str = "full",
+    max_workers: int | None = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = 0,
 ) -> dict[str, Any]:
     """
     Assess document extraction quality (text density, images, structure) for an PDF.
 
+    Modes:
+        full: Analyse every page in this process.
+        parallel: Split the pages into contiguous ranges analysed by worker processes; page details are merged in page order.
+            Documents with fewer than PARALLEL_MIN_PAGES pages are analysed serially.
+        sampled: Analyse a stratified random sample of ``sample_size`` pages and extrapolate the aggregate metrics. The
+            metrics get a ``sampling`` entry with 95% confidence bounds and ``page_details`` only lists the sampled pages.
+            Documents with at most ``sample_size`` pages are analysed completely.
+
     Args:
         file_path: Local path to the PDF document.
         output_path: Optional path to write JSON assessment.
+        session: Optional open session on the same PDF. The extracted text pages stay cached in it for later stages.
+        mode: One of ASSESSMENT_MODES.
+        max_workers: Number of worker processes in parallel mode. Defaults to the number of CPUs.
+        sample_size: Number of pages analysed in sampled mode.
+        seed: Random seed of the page sample.
 
     Returns:
         Assessment dictionary (file_info, extraction_metrics, content_analysis, potential_issues, recommendations, document_quality).
+
+    Raises:
+        InvalidAssessmentModeError: If mode is not one of ASSESSMENT_MODES.
     """
-    document: fitz.Document | None = None
+    if mode not in ASSESSMENT_MODES:
+        raise InvalidAssessmentModeError(mode, ASSESSMENT_MODES)
+
+    own_session = session is None
+    session = DocumentSession(file_path) if session is None else session
     try:
-        document: fitz.Document = fitz.open(file_path)
+        document: fitz.Document = session.document
 
         file_info = _basic_file_info(document, file_path)
-
-        page_details: list[dict[str, Any]] = []
-        total_text = ""
-        total_blocks = 0
-        total_images = 0
-
-        for idx, page in enumerate(document.pages()):
-            page_info, page_text, block_count, image_count = _analyze_page(page, idx)
-            page_details.append(page_info)
-            total_text += page_text
-            total_blocks += block_count
-            total_images += image_count
-
-        metrics = _aggregate_metrics(
-            total_text,
-            total_blocks,
-            total_images,
-            page_details,
-            len(document),
-        )
+        page_count = session.page_count
+
+        if mode == "sampled" and sample_size < page_count:
+            sample = _stratified_sample(page_count, sample_size, seed)
+            page_details, total_text, _, _ = _accumulate(_analyze_page(session.page(idx), idx, session.text_page(idx)) for idx in sample)
+            metrics = _extrapolate_metrics(page_details, page_count)
+        else:
+            if mode == "parallel" and page_count >= PARALLEL_MIN_PAGES:
+                page_details, total_text, total_blocks, total_images = _analyze_parallel(file_path, page_count, max_workers)
+            else:
+                page_details, total_text, total_blocks, total_images = _accumulate(_analyze_page(session.page(idx), idx, session.text_page(idx)) for idx in range(page_count))
+
+            metrics = _aggregate_metrics(
+                total_text,
+                total_blocks,
+                total_images,
+                page_details,
+                len(document),
+            )
         content = _content_analysis(total_text, page_details)
         issues = _detect_issues(file_info, metrics)
         recs = _recommendations(issues, metrics)
@@ -204,6 +395,9 @@ def assess_doc_quality(
     except FileNotFoundError as err:
         logger.error("File access error for %s: %s", file_path, err)
         raise
-    except fitz.FileDataError as err:
+    except (fitz.FileDataError, PDFOpenError) as err:
         logger.error("Corrupted or invalid PDF (%s): %s", file_path, err)
         raise
+    finally:
+        if own_session:
+            session.close()
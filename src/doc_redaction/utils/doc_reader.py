@@ -1,11 +1,27 @@
 import mimetypes
 import pathlib
+from collections.abc import Iterable
 from pathlib import Path
 
 import fitz  # via PyMuPDF
 from loguru import logger
 
-from doc_redaction.utils.commons import InvalidDocumentFormatError
+from doc_redaction.utils.commons import InvalidDocumentFormatError, PDFNotFoundError, PDFOpenError
+from doc_redaction.utils.doc_session import COLORSPACES, DocumentSession
+from doc_redaction.utils.render_cache import RenderCache
+
+# The PDF errors are re-exported for callers of pdf_to_png, which opens the file through DocumentSession
+__all__ = [
+    "MIME_TYPE_MAP",
+    "SUPPORTED_DOCUMENT_FORMATS",
+    "SUPPORTED_IMAGE_FORMATS",
+    "PDFNotFoundError",
+    "PDFOpenError",
+    "get_file_type",
+    "get_mime_type",
+    "merge_markdown_strings",
+    "pdf_to_png",
+]
 
 SUPPORTED_DOCUMENT_FORMATS: set = {".pdf", ".doc", ".docx", ".xls", ".xlsx", ".csv", ".html", ".md", ".txt"}
 SUPPORTED_IMAGE_FORMATS: set = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
@@ -19,23 +35,6 @@ MIME_TYPE_MAP: dict[str, str] = {
 }
 
 
-class PDFNotFoundError(FileNotFoundError):
-    """Raised when the specified PDF file does not exist."""
-
-    def __init__(self, pdf_path: Path) -> None:
-        super().__init__(f"PDF not found: {pdf_path}")
-        self.pdf_path = pdf_path
-
-
-class PDFOpenError(ValueError):
-    """Raised when a PDF cannot be opened with PyMuPDF."""
-
-    def __init__(self, pdf_path: str | pathlib.Path, original_error: Exception) -> None:
-        super().__init__(f"Cannot open PDF '{pdf_path}': {original_error}")
-        self.pdf_path = pdf_path
-        self.original_error = original_error
-
-
 def get_file_type(object_key: str) -> str:
     """
     Return the file category inferred from an object's extension.
@@ -102,6 +101,11 @@ def pdf_to_png(
     output_dir: str | pathlib.Path,
     dpi: int = 200,
     prefix: str = "page",
+    pages: Iterable[int] | None = None,
+    colorspace: str = "RGB",
+    cache: RenderCache | None = None,
+    session: DocumentSession | None = None,
+    clips: dict[int, tuple[float, float, float, float]] | None = None,
 ) -> list[str]:
     """
     Convert each page of *pdf_path* into a PNG file in *output_dir*.
@@ -116,6 +120,16 @@ def pdf_to_png(
         Rendering resolution.  Higher DPI → larger, sharper images.
     prefix : str, optional
         Prefix for the output file names (default "page").
+    pages : Iterable[int] | None, optional
+        Zero-based page indices to render.  Renders every page if None.
+    colorspace : str, optional
+        "RGB" (default) or "GRAY".
+    cache : RenderCache | None, optional
+        Render cache.  Pages found in the cache are copied instead of rendered.
+    session : DocumentSession | None, optional
+        Open session on the same PDF.  Avoids parsing the file again.
+    clips : dict[int, tuple[float, float, float, float]] | None, optional
+        Clip rectangle in points per zero-based page index.  Other pages are rendered whole.
 
     Returns
     -------
@@ -124,10 +138,10 @@ def pdf_to_png(
 
     Raises
     ------
-    FileNotFoundError
-        If *pdf_path* does not exist.
-    ValueError
-        If the PDF cannot be opened.
+    PDFNotFoundError
+        If *pdf_path* does not exist (a FileNotFoundError).
+    PDFOpenError
+        If the PDF cannot be opened (a ValueError).
     """
     pdf_path = pathlib.Path(pdf_path).expanduser().resolve()
     output_dir = pathlib.Path(output_dir).expanduser().resolve()
@@ -138,30 +152,38 @@ def pdf_to_png(
     # create the output folder if necessary
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        doc = fitz.open(pdf_path)  # PyMuPDF opens the file
-    except Exception as exc:
-        raise PDFOpenError(pdf_path, exc) from exc
+    # reuse the caller's session or open the document only if a page is not in the render cache
+    own_session = session is None
+    doc = DocumentSession(pdf_path) if session is None else session
 
     png_paths = []
 
     # iterate pages
-    for page_number in range(len(doc)):
-        page = doc[page_number]
-
-        # Render page to a pixmap at the requested DPI
-        # (transform: zoom factor = dpi / 72)
-        zoom = dpi / 72.0
-        mat = fitz.Matrix(zoom, zoom)  # scaling matrix
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-
+    page_numbers = range(doc.page_count) if pages is None else sorted(set(pages))
+    for page_number in page_numbers:
         # Build the output file name
         out_file = output_dir / f"{prefix}_{str(page_number + 1).zfill(2)}.png"
-        pix.save(out_file)
+
+        clip = (clips or {}).get(page_number)
+        data = cache.get(doc.sha256, page_number, dpi, colorspace, "png", clip) if cache else None
+        if data is None:
+            page = doc.page(page_number)
+
+            # Render page to a pixmap at the requested DPI
+            # (transform: zoom factor = dpi / 72)
+            zoom = dpi / 72.0
+            mat = fitz.Matrix(zoom, zoom)  # scaling matrix
+            pix = page.get_pixmap(matrix=mat, colorspace=COLORSPACES[colorspace], alpha=False, clip=fitz.Rect(clip) if clip else None)
+            data = pix.tobytes("png")
+            if cache:
+                cache.put(doc.sha256, page_number, dpi, colorspace, "png", data, clip)
+
+        out_file.write_bytes(data)
         png_paths.append(str(out_file))
 
     # cleanup
-    doc.close()
+    if own_session:
+        doc.close()
 
     return png_paths
 
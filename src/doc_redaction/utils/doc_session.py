@@ -0,0 +1,104 @@
+from pathlib import Path
+from types import TracebackType
+
+import fitz  # PyMuPDF
+from loguru import logger
+
+from doc_redaction.utils.commons import PDFNotFoundError, PDFOpenError, file_sha256
+
+COLORSPACES: dict[str, fitz.Colorspace] = {"RGB": fitz.csRGB, "GRAY": fitz.csGRAY}
+
+
+class DocumentSession:
+    """
+    Shared handle on a single PDF for the duration of one workflow run.
+
+    The document is parsed once on first use. Per-page ``TextPage`` objects and rendered
+    pixmaps are created lazily and cached, so assessment, text extraction, deduplication and
+    rendering all reuse the same parse. Leaving the context manager closes the document and
+    drops every cached page.
+
+    Args:
+        file_path: Local path to the PDF document.
+
+    Example:
+        with DocumentSession("data/contract/spielbank_rocketbase_vertrag.pdf") as session:
+            assessment = assess_doc_quality(session.file_path, session=session)
+            text = session.text(0)
+    """
+
+    def __init__(self, file_path: str | Path) -> None:
+        self.file_path = str(file_path)
+        self._document: fitz.Document | None = None
+        self._sha256: str | None = None
+        self._pages: dict[int, fitz.Page] = {}
+        self._text_pages: dict[int, fitz.TextPage] = {}
+        self._pixmaps: dict[tuple[int, int, str], fitz.Pixmap] = {}
+
+    def __enter__(self) -> "DocumentSession":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    @property
+    def document(self) -> fitz.Document:
+        """The opened PyMuPDF document. Opens the file on first access."""
+        if self._document is None:
+            if not Path(self.file_path).is_file():
+                raise PDFNotFoundError(Path(self.file_path))
+            try:
+                self._document = fitz.open(self.file_path)
+            except Exception as exc:
+                raise PDFOpenError(self.file_path, exc) from exc
+            logger.info(f"Opened document session for {self.file_path}")
+        return self._document
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 hex digest of the file content, computed once."""
+        if self._sha256 is None:
+            self._sha256 = file_sha256(self.file_path)
+        return self._sha256
+
+    @property
+    def page_count(self) -> int:
+        return len(self.document)
+
+    def page(self, index: int) -> fitz.Page:
+        """Return the page at a zero-based index. Pages are kept alive because their ``TextPage`` refers back to them."""
+        if index not in self._pages:
+            self._pages[index] = self.document[index]
+        return self._pages[index]
+
+    def text_page(self, index: int) -> fitz.TextPage:
+        """Return the cached ``TextPage`` of a page, extracting it on first use."""
+        if index not in self._text_pages:
+            # plain-text flags keep whitespace and ligatures like page.get_text() and skip image data
+            self._text_pages[index] = self.page(index).get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+        return self._text_pages[index]
+
+    def text(self, index: int, option: str = "text") -> str | list | dict:
+        """Extract text from a page in any ``get_text`` format, reusing the cached ``TextPage``."""
+        return self.page(index).get_text(option, textpage=self.text_page(index))
+
+    def pixmap(self, index: int, dpi: int = 200, colorspace: str = "RGB") -> fitz.Pixmap:
+        """Render a page once per (dpi, colour mode) and cache the pixmap."""
+        key = (index, dpi, colorspace)
+        if key not in self._pixmaps:
+            zoom = dpi / 72.0
+            self._pixmaps[key] = self.page(index).get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=COLORSPACES[colorspace], alpha=False)
+        return self._pixmaps[key]
+
+    def release_pixmaps(self) -> None:
+        """Drop cached pixmaps while keeping the document open."""
+        self._pixmaps.clear()
+
+    def close(self) -> None:
+        """Close the document and release all cached page data."""
+        self._text_pages.clear()
+        self._pixmaps.clear()
+        self._pages.clear()
+        if self._document is not None:
+            self._document.close()
+            self._document = None
@@ -0,0 +1,203 @@
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import fitz  # PyMuPDF
+from loguru import logger
+
+from doc_redaction.utils.commons import PDFNotFoundError, PDFOpenError
+
+MAX_PAGES: int = 500
+MAX_FILE_SIZE_MB: float = 100.0
+MAX_PARENT_DEPTH: int = 32
+XREF_RE = re.compile(r"(\d+)\s+\d+\s+R")
+
+
+@dataclass
+class Route:
+    DIGITAL: str = "digital"
+    SCANNED: str = "scanned"
+    MIXED: str = "mixed"
+    ENCRYPTED: str = "encrypted"
+    OVERSIZED: str = "oversized"
+
+
+@dataclass
+class TriageRecord:
+    """Compact routing record built from the PDF object structure only.
+
+    Attributes:
+        route: One of the Route values.
+        page_count: Number of pages.
+        file_size_mb: File size in MiB.
+        is_encrypted: Whether the document is encrypted.
+        needs_password: Whether a password is required to read it.
+        metadata: Document information dictionary.
+        image_counts: Image XObjects referenced by each page's resources, including its Form XObjects.
+        text_layer_pages: Zero-based indices of pages with font resources (directly or in a Form XObject) and a non-empty content stream.
+    """
+
+    route: str
+    page_count: int
+    file_size_mb: float
+    is_encrypted: bool
+    needs_password: bool
+    metadata: dict[str, Any] = field(default_factory=dict)
+    image_counts: list[int] = field(default_factory=list)
+    text_layer_pages: list[int] = field(default_factory=list)
+
+    @property
+    def has_text_layer(self) -> bool:
+        return bool(self.text_layer_pages)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _xrefs(value: str) -> list[int]:
+    return [int(xref) for xref in XREF_RE.findall(value)]
+
+
+def _inherited_resources(doc: fitz.Document, page_xref: int) -> tuple[int, str, str]:
+    # Resources may be inherited from an ancestor of the page tree; returns the owning object as well
+    xref = page_xref
+    for _ in range(MAX_PARENT_DEPTH):
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return xref, kind, value
+        kind, parent = doc.xref_get_key(xref, "Parent")
+        if kind != "xref":
+            break
+        xref = _xrefs(parent)[0]
+    return xref, "null", "null"
+
+
+def _resource_refs(doc: fitz.Document, owner_xref: int, key: str) -> tuple[str, list[int]]:
+    kind, value = doc.xref_get_key(owner_xref, key)
+    if kind == "xref":
+        value = doc.xref_object(_xrefs(value)[0], compressed=True)
+    return kind, _xrefs(value)
+
+
+def _resource_summary(doc: fitz.Document, owner_xref: int, prefix: str, seen: set[int] | None = None) -> tuple[int, int]:
+    """Count fonts and image XObjects of the resource dictionary at ``prefix`` inside ``owner_xref``, including those of its Form XObjects."""
+    seen = set() if seen is None else seen
+    fonts_kind, fonts = _resource_refs(doc, owner_xref, f"{prefix}Font")
+    _, xobjects = _resource_refs(doc, owner_xref, f"{prefix}XObject")
+    # a font dictionary holding only inline fonts has no references but still defines fonts
+    font_count, images = len(fonts) or int(fonts_kind == "dict"), 0
+    for xref in xobjects:
+        subtype = doc.xref_get_key(xref, "Subtype")[1]
+        if subtype == "/Image":
+            images += 1
+        elif subtype == "/Form" and xref not in seen:
+            # e.g. pages placed with show_pdf_page keep their text inside a Form XObject
+            seen.add(xref)
+            form_fonts, form_images = _form_summary(doc, xref, seen)
+            font_count += form_fonts
+            images += form_images
+    return font_count, images
+
+
+def _form_summary(doc: fitz.Document, form_xref: int, seen: set[int]) -> tuple[int, int]:
+    kind, value = doc.xref_get_key(form_xref, "Resources")
+    if kind == "xref":
+        return _resource_summary(doc, _xrefs(value)[0], "", seen)
+    if kind == "dict":
+        return _resource_summary(doc, form_xref, "Resources/", seen)
+    return 0, 0
+
+
+def _page_resources(doc: fitz.Document, page_xref: int, shared: dict[int, tuple[int, int]]) -> tuple[int, int]:
+    owner_xref, kind, value = _inherited_resources(doc, page_xref)
+    if kind == "xref":
+        # resource dictionaries are usually shared between pages, so summarise each one once
+        resources_xref = _xrefs(value)[0]
+        if resources_xref not in shared:
+            shared[resources_xref] = _resource_summary(doc, resources_xref, "")
+        return shared[resources_xref]
+    if kind == "dict":
+        return _resource_summary(doc, owner_xref, "Resources/")
+    return 0, 0
+
+
+def _content_length(doc: fitz.Document, page_xref: int) -> int:
+    kind, value = doc.xref_get_key(page_xref, "Contents")
+    if kind not in ("xref", "array"):
+        return 0
+    length = 0
+    for xref in _xrefs(value):
+        kind, size = doc.xref_get_key(xref, "Length")
+        if kind == "xref":
+            size = doc.xref_object(_xrefs(size)[0], compressed=True)
+        length += int(size) if size.strip().isdigit() else 0
+    return length
+
+
+def _route(record: TriageRecord) -> str:
+    if record.needs_password:
+        return Route.ENCRYPTED
+    if record.page_count > MAX_PAGES or record.file_size_mb > MAX_FILE_SIZE_MB:
+        return Route.OVERSIZED
+    if len(record.text_layer_pages) == record.page_count:
+        return Route.DIGITAL
+    if not record.text_layer_pages:
+        return Route.SCANNED
+    return Route.MIXED
+
+
+def triage_document(file_path: str) -> TriageRecord:
+    """
+    Decide how a PDF should be processed without extracting any text.
+
+    Only the cross-reference table and object dictionaries are read: page count, encryption,
+    metadata, image XObjects and font resources per page, and the declared content-stream length.
+    A page counts as having a text layer if it references at least one font, directly or through a
+    Form XObject, and has a non-empty content stream. Nothing is rendered or decoded, so the cost is
+    close to a page-count lookup.
+
+    Args:
+        file_path: Local path to the PDF document.
+
+    Returns:
+        TriageRecord with the chosen route.
+
+    Raises:
+        PDFNotFoundError: If the file does not exist.
+        PDFOpenError: If the file cannot be opened as a PDF.
+
+    Example:
+        record = triage_document("data/contract/spielbank_rocketbase_vertrag.pdf")
+        record.route
+        'digital'
+    """
+    path = Path(file_path)
+    if not path.is_file():
+        raise PDFNotFoundError(path)
+    try:
+        doc = fitz.open(path)
+    except Exception as exc:
+        raise PDFOpenError(file_path, exc) from exc
+
+    with doc:
+        record = TriageRecord(
+            route="",
+            page_count=doc.page_count,
+            file_size_mb=path.stat().st_size / (1024 * 1024),
+            is_encrypted=bool(doc.is_encrypted),
+            needs_password=bool(doc.needs_pass),
+            metadata=doc.metadata or {},
+        )
+        if not record.needs_password:
+            shared: dict[int, tuple[int, int]] = {}
+            for pno in range(doc.page_count):
+                page_xref = doc.page_xref(pno)
+                fonts, images = _page_resources(doc, page_xref, shared)
+                record.image_counts.append(images)
+                if fonts and _content_length(doc, page_xref) > 0:
+                    record.text_layer_pages.append(pno)
+
+    record.route = _route(record)
+    logger.info(f"Triage {file_path}: {record.route} ({record.page_count} pages, {len(record.text_layer_pages)} with text layer)")
+    return record
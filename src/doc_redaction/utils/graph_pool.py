@@ -0,0 +1,91 @@
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Generator, Hashable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from loguru import logger
+from strands import Agent
+from strands.multiagent.graph import Graph
+from strands.telemetry.metrics import EventLoopMetrics
+
+from doc_redaction.utils.commons import CacheStats
+
+DEFAULT_POOL_SIZE: int = 4
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass
+class WorkflowGraph:
+    """A built workflow graph and its agents, keyed by graph node name."""
+
+    graph: Graph
+    agents: dict[str, Agent]
+
+    def reset(self) -> None:
+        """Restore every agent's conversation and state to how it was built and clear its metrics."""
+        for node in self.graph.nodes.values():
+            node.reset_executor_state()
+        for agent in self.agents.values():
+            agent.event_loop_metrics = EventLoopMetrics()
+
+
+class GraphPool(Generic[K]):
+    """
+    Pool of pre-built workflow graphs, reused across documents.
+
+    Graphs are grouped by a hashable key of type ``K`` describing their topology and models. ``acquire``
+    hands out an idle graph of the key or builds a new one, so the pool never blocks; ``release`` resets the graph's
+    conversation state and keeps it for the next document, up to ``max_idle`` graphs per key.
+    Concurrent workers each lease their own graph, so ``max_idle`` should match the number of workers.
+
+    Args:
+        factory: Builds a new WorkflowGraph for a key.
+        max_idle: Maximum number of idle graphs kept per key.
+
+    Example:
+        with pool.lease(key) as workflow_graph:
+            result = workflow_graph.graph(task)
+    """
+
+    def __init__(self, factory: Callable[[K], WorkflowGraph], max_idle: int = DEFAULT_POOL_SIZE) -> None:
+        self.factory = factory
+        self.max_idle = max_idle
+        self.stats = CacheStats()
+        self._idle: dict[K, list[WorkflowGraph]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: K) -> WorkflowGraph:
+        """Return an idle graph of the key, or build a new one."""
+        with self._lock:
+            if self._idle[key]:
+                self.stats.hits += 1
+                return self._idle[key].pop()
+            self.stats.misses += 1
+        return self.factory(key)
+
+    def release(self, key: K, workflow_graph: WorkflowGraph) -> None:
+        """Reset a graph and keep it for reuse, unless max_idle graphs of the key are already idle."""
+        workflow_graph.reset()
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle:
+                self._idle[key].append(workflow_graph)
+            else:
+                self.stats.evictions += 1
+
+    @contextmanager
+    def lease(self, key: K) -> Generator[WorkflowGraph]:
+        """Acquire a graph for the duration of a block. Graphs of a failed block are dropped, not reused."""
+        workflow_graph = self.acquire(key)
+        yield workflow_graph
+        self.release(key, workflow_graph)
+
+    def warm(self, key: K, count: int = 1) -> None:
+        """Build graphs of a key ahead of time, up to max_idle idle graphs."""
+        with self._lock:
+            missing = max(0, min(count, self.max_idle) - len(self._idle[key]))
+        for _ in range(missing):
+            self.release(key, self.factory(key))
+        logger.info(f"Graph pool warmed with {missing} graphs")
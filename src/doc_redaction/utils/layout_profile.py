@@ -0,0 +1,205 @@
+import pathlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import fitz  # PyMuPDF
+import numpy as np
+from loguru import logger
+
+from doc_redaction.utils.doc_session import DocumentSession
+
+HEATMAP_SIZE: int = 16
+PROFILE_BINS: int = 64
+MIN_GUTTER_BINS: int = 2
+ROW_TOLERANCE: float = 2.0
+CELL_GAP_RATIO: float = 2.0
+FONT_SIZE_BINS: tuple[float, ...] = (0.0, 6.0, 8.0, 10.0, 12.0, 14.0, 18.0, 24.0, 36.0, float("inf"))
+# The text-layer converter reads blocks top to bottom, which interleaves the lines of side-by-side columns
+MAX_TEXT_LAYER_COLUMNS: int = 1
+CLIP_MARGIN: float = 12.0
+
+
+@dataclass
+class LayoutProfile:
+    """Vectorised layout features of a single page.
+
+    Attributes:
+        page_number: One-based page number.
+        coverage: HEATMAP_SIZE x HEATMAP_SIZE grid with the share of each cell covered by text spans (rows top to bottom).
+        column_count: Number of text columns separated by vertical gutters.
+        table_likeness: Share of text rows that are split into three or more cells by wide horizontal gaps.
+        margins: Distance of the text from the left, top, right and bottom page edge in points.
+        content_box: Bounding box (x0, y0, x1, y1) of all text, usable as render clip. None for pages without text.
+        font_size_histogram: Characters per FONT_SIZE_BINS interval.
+    """
+
+    page_number: int
+    coverage: np.ndarray = field(default_factory=lambda: np.zeros((HEATMAP_SIZE, HEATMAP_SIZE)))
+    column_count: int = 0
+    table_likeness: float = 0.0
+    margins: tuple[float, float, float, float] | None = None
+    content_box: tuple[float, float, float, float] | None = None
+    font_size_histogram: list[int] = field(default_factory=lambda: [0] * (len(FONT_SIZE_BINS) - 1))
+
+    @property
+    def text_coverage(self) -> float:
+        """Mean coverage over the whole page."""
+        return float(self.coverage.mean())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "page_number": self.page_number,
+            "coverage": np.round(self.coverage, 3).tolist(),
+            "text_coverage": round(self.text_coverage, 4),
+            "column_count": self.column_count,
+            "table_likeness": round(self.table_likeness, 3),
+            "margins": self.margins,
+            "content_box": self.content_box,
+            "font_size_histogram": self.font_size_histogram,
+        }
+
+
+def _span_arrays(text_dict: dict[str, Any]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # one pass over the dict: span bboxes (N, 4), font sizes and character counts
+    spans = [span for block in text_dict.get("blocks", []) if block.get("type") == 0 for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+    if not spans:
+        return np.empty((0, 4)), np.empty(0), np.empty(0)
+    bboxes = np.array([span["bbox"] for span in spans], dtype=np.float64)
+    sizes = np.array([span["size"] for span in spans], dtype=np.float64)
+    chars = np.array([len(span["text"].strip()) for span in spans], dtype=np.float64)
+    return bboxes, sizes, chars
+
+
+def _overlaps(starts: np.ndarray, ends: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Length of the overlap of every interval with every bin, shape (intervals, bins)."""
+    return np.clip(np.minimum(ends[:, None], edges[None, 1:]) - np.maximum(starts[:, None], edges[None, :-1]), 0, None)
+
+
+def _coverage(bboxes: np.ndarray, width: float, height: float) -> np.ndarray:
+    x_overlap = _overlaps(bboxes[:, 0], bboxes[:, 2], np.linspace(0, width, HEATMAP_SIZE + 1))
+    y_overlap = _overlaps(bboxes[:, 1], bboxes[:, 3], np.linspace(0, height, HEATMAP_SIZE + 1))
+    cell_area = (width / HEATMAP_SIZE) * (height / HEATMAP_SIZE)
+    return np.clip(y_overlap.T @ x_overlap / cell_area, 0, 1)
+
+
+def _column_count(bboxes: np.ndarray, width: float) -> int:
+    occupied = _overlaps(bboxes[:, 0], bboxes[:, 2], np.linspace(0, width, PROFILE_BINS + 1)).sum(axis=0) > 0
+    # runs of occupied bins, split wherever the gap between them is a gutter of at least MIN_GUTTER_BINS
+    run_starts = np.flatnonzero(occupied & ~np.concatenate(([False], occupied[:-1])))
+    run_ends = np.flatnonzero(occupied & ~np.concatenate((occupied[1:], [False])))
+    gaps = run_starts[1:] - run_ends[:-1] - 1
+    return int(np.count_nonzero(gaps >= MIN_GUTTER_BINS)) + 1 if run_starts.size else 0
+
+
+def _table_likeness(bboxes: np.ndarray, sizes: np.ndarray) -> float:
+    # group spans into rows by baseline, then look for rows with at least two wide gaps
+    order = np.lexsort((bboxes[:, 0], np.round(bboxes[:, 3] / ROW_TOLERANCE)))
+    boxes, rows = bboxes[order], np.round(bboxes[order, 3] / ROW_TOLERANCE)
+    same_row = rows[1:] == rows[:-1]
+    wide = same_row & (boxes[1:, 0] - boxes[:-1, 2] > CELL_GAP_RATIO * sizes[order][1:])
+    row_ids = np.unique(rows, return_inverse=True)[1]
+    wide_per_row = np.bincount(row_ids[1:][wide], minlength=row_ids.max() + 1)
+    return float(np.mean(wide_per_row >= 2))
+
+
+def profile_text_dict(text_dict: dict[str, Any], rect: fitz.Rect, page_number: int) -> LayoutProfile:
+    """
+    Compute the layout profile from an already extracted ``dict`` of a page.
+
+    Args:
+        text_dict: Output of ``page.get_text("dict")``.
+        rect: Page rectangle.
+        page_number: One-based page number.
+
+    Returns:
+        LayoutProfile of the page.
+    """
+    profile = LayoutProfile(page_number=page_number)
+    bboxes, sizes, chars = _span_arrays(text_dict)
+    if not len(bboxes):
+        return profile
+
+    width, height = rect.width, rect.height
+    x0, y0 = bboxes[:, :2].min(axis=0)
+    x1, y1 = bboxes[:, 2:].max(axis=0)
+    profile.coverage = _coverage(bboxes, width, height)
+    profile.column_count = _column_count(bboxes, width)
+    profile.table_likeness = _table_likeness(bboxes, sizes)
+    profile.margins = (float(x0), float(y0), float(width - x1), float(height - y1))
+    profile.content_box = (float(x0), float(y0), float(x1), float(y1))
+    profile.font_size_histogram = np.histogram(sizes, bins=FONT_SIZE_BINS, weights=chars)[0].astype(int).tolist()
+    return profile
+
+
+def profile_page(page: fitz.Page, textpage: fitz.TextPage | None = None) -> LayoutProfile:
+    """
+    Compute the layout profile of a page from a single ``dict`` text extraction.
+
+    Args:
+        page: PyMuPDF page.
+        textpage: Optional cached TextPage of the page.
+
+    Returns:
+        LayoutProfile of the page.
+    """
+    # a page that does not belong to a document has no number
+    return profile_text_dict(page.get_text("dict", textpage=textpage), page.rect, (page.number or 0) + 1)
+
+
+def is_text_layer_layout(profile: LayoutProfile) -> bool:
+    """Whether the text-layer converter keeps the reading order of the page; multi-column pages go to OCR or the vision model."""
+    return profile.column_count <= MAX_TEXT_LAYER_COLUMNS
+
+
+def render_clip(profile: LayoutProfile, margin: float = CLIP_MARGIN) -> tuple[float, float, float, float] | None:
+    """
+    Return the content box of a page widened by a margin, for rendering only the text area.
+
+    Args:
+        profile: Layout profile of the page.
+        margin: Margin around the text in points.
+
+    Returns:
+        Clip rectangle (x0, y0, x1, y1) in points, or None for pages without text.
+    """
+    if profile.content_box is None:
+        return None
+    x0, y0, x1, y1 = profile.content_box
+    return max(x0 - margin, 0.0), max(y0 - margin, 0.0), x1 + margin, y1 + margin
+
+
+def profile_layout(
+    pdf_path: str | pathlib.Path,
+    pages: Iterable[int] | None = None,
+    session: DocumentSession | None = None,
+) -> list[LayoutProfile]:
+    """
+    Compute layout profiles of the pages of a PDF.
+
+    The column count routes pages between the text layer and OCR or vision conversion (see
+    ``is_text_layer_layout``) and the content box clips their renders (see ``render_clip``).
+
+    Args:
+        pdf_path: Path to the source PDF.
+        pages: Zero-based page indices to profile. All pages if None.
+        session: Optional open session on the same PDF. Its cached TextPages are reused.
+
+    Returns:
+        List of LayoutProfile in page order.
+
+    Example:
+        profiles = profile_layout("data/contract/spielbank_rocketbase_vertrag.pdf")
+        [profile.column_count for profile in profiles]
+    """
+    own_session = session is None
+    session = DocumentSession(pdf_path) if session is None else session
+    try:
+        page_numbers = range(session.page_count) if pages is None else sorted(set(pages))
+        profiles = [profile_page(session.page(idx), session.text_page(idx)) for idx in page_numbers]
+    finally:
+        if own_session:
+            session.close()
+
+    logger.info(f"Layout profiled for {len(profiles)} pages of {pdf_path}")
+    return profiles
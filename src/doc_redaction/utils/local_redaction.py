@@ -0,0 +1,196 @@
+import re
+
+from doc_redaction.output import (
+    ContractTerms,
+    DataProtectionCompliance,
+    DocumentAnalysis,
+    Party,
+    Representative,
+    RiskAssessment,
+    SensitiveData,
+)
+from doc_redaction.tool.detect_sensitive_data import ENGLISH_NUMBER_WORDS, GERMAN_NUMBER_WORDS, detect_sensitive_data, remove_markdown_formatting
+
+REDACTION_SYMBOL: str = "<REDACTED>"
+# Bare numbers and number words are reported but not redacted: they include section numbers, dates and articles like "eine"
+REDACTED_CATEGORIES: tuple[str, ...] = (
+    "email_addresses",
+    "phone_numbers",
+    "credit_card_numbers",
+    "iban_numbers",
+    "account_numbers",
+    "addresses",
+    "people_names",
+    "currency_amounts",
+    "percentages",
+)
+PERSONAL_CATEGORIES: tuple[str, ...] = ("email_addresses", "phone_numbers", "addresses", "people_names")
+FINANCIAL_CATEGORIES: tuple[str, ...] = ("credit_card_numbers", "iban_numbers", "account_numbers", "currency_amounts", "percentages")
+DATA_PROTECTION_RE = re.compile(r"datenschutz|dsgvo|gdpr|data protection", re.IGNORECASE)
+# Underscores at the edge of a word are emphasis markup; the detectors' \b would treat them as part of the word
+EDGE_UNDERSCORE_RE = re.compile(r"(?<![^\W_])_+|_+(?![^\W_])")
+
+# Two or three capitalised words on one line, e.g. "Lisa Schneider" or "Sandra König"
+_NAME_WORD: str = r"[A-ZÄÖÜ][a-zäöüß]+(?:-[A-ZÄÖÜ][a-zäöüß]+)?"
+NAME_CANDIDATE_RE = re.compile(rf"(?<![^\W\d_]){_NAME_WORD}(?:[ \t]+{_NAME_WORD}){{1,2}}(?![^\W\d_])")
+# A name follows a title, or it follows a label such as "Vertreten durch:" or starts a line and ends the line,
+# a table cell or the part before ", <role>" (but not ", Inc.")
+NAME_TITLE_RE = re.compile(r"(?:(?:Dr|Prof|Mr|Mrs|Ms)\.|\bHerrn?|\bFrau)[ \t]*$")
+NAME_LABEL_RE = re.compile(r"(?::|^[ \t|-]*)[ \t]*$")
+NAME_END_RE = re.compile(r"[ \t]*(?:;|,(?![ \t]*(?:Inc|Ltd|LLC|GmbH|AG|SE|KG)\b)|\||$)")
+# Capitalised sentence starts that are never the first word of a name
+NON_NAME_WORDS: frozenset[str] = frozenset(
+    {"Der", "Die", "Das", "Dem", "Den", "Des", "Dieser", "Diese", "Dieses", "Ein", "Eine", "Beide", "Alle", "Für", "Zwischen", "Und"}
+    | {"The", "This", "These", "Each", "For", "Between", "And", "All"}
+)
+# Spelled-out amounts such as "zehntausend Euro"; number words are only redacted next to a currency
+_NUMBER_WORD: str = "|".join(sorted(GERMAN_NUMBER_WORDS | ENGLISH_NUMBER_WORDS, key=len, reverse=True))
+SPELLED_AMOUNT_RE = re.compile(
+    rf"(?<![^\W_])(?:{_NUMBER_WORD})(?:(?:und)?(?:{_NUMBER_WORD}))*(?:[ \t-]+(?:{_NUMBER_WORD})(?:(?:und)?(?:{_NUMBER_WORD}))*)*[ \t]+(?:Euro|EUR|Dollars?|USD)(?![^\W_])",
+    re.IGNORECASE,
+)
+
+
+def to_sensitive_data(hits: dict[str, list[str]], document_name: str, text: str) -> SensitiveData:
+    """
+    Map regex detector hits into the SensitiveData shape of the detector agent.
+
+    Regexes cannot tell which name, email and phone number belong together or to which party an address
+    belongs, so every hit becomes its own entry and fields the regexes cannot fill stay empty.
+
+    Args:
+        hits: Result of ``detect_sensitive_data``.
+        document_name: Name of the document, e.g. its key.
+        text: Text the hits were detected in.
+
+    Returns:
+        SensitiveData with the hits, sorted for deterministic output.
+    """
+
+    def found(category: str) -> list[str]:
+        return sorted(hits.get(category, []))
+
+    number_words = [word for word in found("numbers") if word in GERMAN_NUMBER_WORDS or word in ENGLISH_NUMBER_WORDS]
+    representatives = [Representative(people_names=name, email_addresses="", phone_numbers="", job_title="") for name in found("people_names")]
+    representatives += [Representative(people_names="", email_addresses=email, phone_numbers="", job_title="") for email in found("email_addresses")]
+    representatives += [Representative(people_names="", email_addresses="", phone_numbers=phone, job_title="") for phone in found("phone_numbers")]
+
+    return SensitiveData(
+        document_analysis=DocumentAnalysis(
+            document_name=document_name, document_type="contract", sensitive_data_detected=any(hits.get(category) for category in REDACTED_CATEGORIES)
+        ),
+        parties=[Party(company_name="", address=address, company_registration_numbers=[]) for address in found("addresses")],
+        representative=representatives,
+        contract_terms=ContractTerms(
+            initial_term="",
+            renewal_period="",
+            auto_renewal=False,
+            notice_period="",
+            termination_notice="",
+            payment_terms="",
+            payments="",
+            iban_numbers=found("iban_numbers"),
+            credit_card_numbers=found("credit_card_numbers"),
+            account_numbers=found("account_numbers"),
+            currency_amounts=found("currency_amounts"),
+            number_words=number_words,
+            percentages=found("percentages"),
+        ),
+        risk_assessment=RiskAssessment(
+            contains_personal_data=any(hits.get(category) for category in PERSONAL_CATEGORIES),
+            contains_business_sensitive_info=any(hits.get(category) for category in FINANCIAL_CATEGORIES),
+            contains_financial_terms=bool(hits.get("currency_amounts") or hits.get("percentages")),
+            contains_legal_obligations=False,
+        ),
+        data_protection_compliance=DataProtectionCompliance(mentioned=bool(DATA_PROTECTION_RE.search(text))),
+    )
+
+
+def detect_names(markdown: str) -> list[str]:
+    """
+    Find names of people line by line, in name positions only.
+
+    The regex detector reports every pair of capitalised words, including German nouns ("Der Vertrag") and
+    hits across line breaks. A name candidate is only kept if it follows a title ("Dr.", "Frau"), or if it
+    follows a label ("Vertreten durch:") or starts a line and stands alone or before ", <role>" or ";", as in
+    signature and party blocks. Headings are skipped.
+
+    Args:
+        markdown: Markdown document.
+
+    Returns:
+        Sorted, distinct names.
+    """
+    names: set[str] = set()
+    for raw_line in markdown.splitlines():
+        if raw_line.lstrip().startswith("#"):
+            continue
+        line = remove_markdown_formatting(EDGE_UNDERSCORE_RE.sub(" ", raw_line.replace("*", "")))
+        for match in NAME_CANDIDATE_RE.finditer(line):
+            if match.group().split()[0] in NON_NAME_WORDS:
+                continue
+            before = line[: match.start()]
+            if NAME_TITLE_RE.search(before) or (NAME_LABEL_RE.search(before) and NAME_END_RE.match(line, match.end())):
+                names.add(match.group())
+    return sorted(names)
+
+
+def redaction_spans(markdown: str, values: list[str]) -> list[tuple[int, int]]:
+    """
+    Find the character spans of detected values in a markdown document.
+
+    All values are matched in a single pass, longest first, so a value contained in a longer one
+    (e.g. a number inside an IBAN) never splits the longer span. The detectors run on text with
+    collapsed whitespace and without emphasis markers, so a space in a value matches any run of spaces,
+    tabs, ``*`` and ``_`` (e.g. ``**Lisa** Schneider``). Values only match as whole words, so a detector
+    hit that ends inside a word does not cut the word apart; ``_`` counts as markup, not as a word character.
+
+    Args:
+        markdown: Markdown document.
+        values: Literal values to find.
+
+    Returns:
+        Sorted, non-overlapping (start, end) spans.
+    """
+    literals = sorted({value for value in values if value.strip()}, key=len, reverse=True)
+    if not literals:
+        return []
+    alternatives = "|".join(re.escape(value).replace(r"\ ", r"[*_ \t]+") for value in literals)
+    pattern = re.compile(rf"(?<![^\W_])(?:{alternatives})(?![^\W_])")
+    return [match.span() for match in pattern.finditer(markdown)]
+
+
+def redact_spans(markdown: str, spans: list[tuple[int, int]], symbol: str = REDACTION_SYMBOL) -> str:
+    """Replace sorted, non-overlapping spans of a document with the redaction symbol."""
+    parts: list[str] = []
+    position = 0
+    for start, end in spans:
+        parts.append(markdown[position:start])
+        parts.append(symbol)
+        position = end
+    parts.append(markdown[position:])
+    return "".join(parts)
+
+
+def redact_locally(markdown: str, document_name: str, symbol: str = REDACTION_SYMBOL) -> tuple[SensitiveData, str]:
+    """
+    Detect and redact sensitive data with the regex detectors only, without any model call.
+
+    Args:
+        markdown: Converted markdown document.
+        document_name: Name of the document, e.g. its key.
+        symbol: Replacement of every redacted value.
+
+    Returns:
+        The detected data in the SensitiveData shape and the redacted markdown.
+
+    Example:
+        sensitive_data, redacted = redact_locally(Path("data/markdown/spielbank_rocketbase_vertrag.md").read_text(), "spielbank_rocketbase_vertrag")
+    """
+    hits: dict[str, list[str]] = detect_sensitive_data(EDGE_UNDERSCORE_RE.sub(" ", markdown))
+    # The regex name hits are far too broad to redact, see detect_names
+    hits["people_names"] = detect_names(markdown)
+    hits["currency_amounts"] = sorted({*hits.get("currency_amounts", []), *(match.group() for match in SPELLED_AMOUNT_RE.finditer(markdown))})
+    values = [value for category in REDACTED_CATEGORIES for value in hits.get(category, [])]
+    redacted = redact_spans(markdown, redaction_spans(markdown, values), symbol)
+    return to_sensitive_data(hits, document_name, remove_markdown_formatting(markdown)), redacted
@@ -0,0 +1,133 @@
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from strands import Agent
+from strands.agent import AgentResult
+from strands.multiagent.base import NodeResult
+
+
+@dataclass
+class NodeMetrics:
+    """Timing and token usage of one graph node in one run.
+
+    Attributes:
+        node: Graph node name, e.g. "detector_result".
+        model_id: Model id of the node's agent.
+        status: Execution status of the node.
+        wall_time_ms: Wall-clock execution time of the node.
+        model_latency_ms: Time spent waiting for model responses.
+        tool_time_ms: Time spent executing tools.
+        tool_calls: Number of tool calls.
+        cycles: Number of agent event loop cycles.
+        input_tokens: Uncached input tokens.
+        output_tokens: Output tokens.
+        cache_read_tokens: Input tokens read from the prompt cache.
+        cache_write_tokens: Input tokens written to the prompt cache.
+    """
+
+    node: str
+    model_id: str
+    status: str
+    wall_time_ms: int = 0
+    model_latency_ms: int = 0
+    tool_time_ms: int = 0
+    tool_calls: int = 0
+    cycles: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def usage(self) -> dict[str, int]:
+        """Token usage in the Bedrock ``Usage`` format."""
+        return {
+            "inputTokens": self.input_tokens,
+            "outputTokens": self.output_tokens,
+            "cacheReadInputTokens": self.cache_read_tokens,
+            "cacheWriteInputTokens": self.cache_write_tokens,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def node_metrics(node: str, agent: Agent, node_result: NodeResult) -> NodeMetrics:
+    """
+    Collect the metrics of a single executed graph node.
+
+    Args:
+        node: Graph node name.
+        agent: Agent executed in the node.
+        node_result: Result of the node.
+
+    Returns:
+        NodeMetrics of the node.
+    """
+    usage = node_result.accumulated_usage
+    agent_metrics = [agent_result.metrics for agent_result in node_result.get_agent_results()]
+    tool_metrics = [tool for metrics in agent_metrics for tool in metrics.tool_metrics.values()]
+
+    return NodeMetrics(
+        node=node,
+        model_id=agent.model.get_config()["model_id"],
+        status=node_result.status.value,
+        wall_time_ms=node_result.execution_time,
+        model_latency_ms=node_result.accumulated_metrics.get("latencyMs", 0),
+        tool_time_ms=round(sum(tool.total_time for tool in tool_metrics) * 1000),
+        tool_calls=sum(tool.call_count for tool in tool_metrics),
+        cycles=sum(metrics.cycle_count for metrics in agent_metrics),
+        input_tokens=usage.get("inputTokens", 0),
+        output_tokens=usage.get("outputTokens", 0),
+        cache_read_tokens=usage.get("cacheReadInputTokens", 0),
+        cache_write_tokens=usage.get("cacheWriteInputTokens", 0),
+    )
+
+
+def agent_results_metrics(node: str, model_id: str, results: list[AgentResult], wall_time_ms: int, status: str = "completed") -> NodeMetrics:
+    """
+    Combine the metrics of agent calls made outside the graph into the metrics of one stage.
+
+    Args:
+        node: Stage name, e.g. "convert_result".
+        model_id: Model id of the agents.
+        results: Results of the agent calls.
+        wall_time_ms: Wall-clock time of the whole stage.
+        status: Status of the stage.
+
+    Returns:
+        NodeMetrics of the stage.
+    """
+    usage = [result.metrics.accumulated_usage for result in results]
+    tool_metrics = [tool for result in results for tool in result.metrics.tool_metrics.values()]
+
+    return NodeMetrics(
+        node=node,
+        model_id=model_id,
+        status=status,
+        wall_time_ms=wall_time_ms,
+        model_latency_ms=sum(result.metrics.accumulated_metrics.get("latencyMs", 0) for result in results),
+        tool_time_ms=round(sum(tool.total_time for tool in tool_metrics) * 1000),
+        tool_calls=sum(tool.call_count for tool in tool_metrics),
+        cycles=sum(result.metrics.cycle_count for result in results),
+        input_tokens=sum(item.get("inputTokens", 0) for item in usage),
+        output_tokens=sum(item.get("outputTokens", 0) for item in usage),
+        cache_read_tokens=sum(item.get("cacheReadInputTokens", 0) for item in usage),
+        cache_write_tokens=sum(item.get("cacheWriteInputTokens", 0) for item in usage),
+    )
+
+
+def collect_node_metrics(agents: dict[str, Agent], results: dict[str, NodeResult]) -> dict[str, NodeMetrics]:
+    """
+    Collect metrics of every executed node, keyed by graph node name.
+
+    Nodes sharing a model are kept apart, and nodes that did not run are skipped.
+
+    Args:
+        agents: Mapping of graph node name to the Agent object executed in that node.
+        results: Node results of a graph run, e.g. ``GraphResult.results``.
+
+    Returns:
+        Mapping of graph node name to NodeMetrics, in the order of agents.
+    """
+    return {node: node_metrics(node, agent, results[node]) for node, agent in agents.items() if node in results}
@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any
+
+import pytesseract
+from loguru import logger
+from PIL import Image
+
+from doc_redaction.utils.commons import process_pool_context
+
+OCR_LANGUAGES: str = "deu+eng"
+OCR_CONFIDENCE_THRESHOLD: float = 80.0
+
+
+@dataclass
+class OcrPage:
+    """OCR result for a single rendered page.
+
+    Attributes:
+        image_path: Path of the rendered page image.
+        markdown: Page content in the per-page format consumed by ``merge_markdown_strings``.
+        confidence: Mean Tesseract word confidence in the range 0-100. 0 if nothing was recognised.
+        word_count: Number of recognised words.
+    """
+
+    image_path: str
+    markdown: str
+    confidence: float
+    word_count: int
+
+
+def _words_to_markdown(data: dict[str, list[Any]]) -> tuple[str, list[float]]:
+    words = [
+        (data["block_num"][i], data["par_num"][i], data["line_num"][i], data["text"][i].strip(), float(data["conf"][i]))
+        for i in range(len(data["text"]))
+        if data["text"][i].strip() and float(data["conf"][i]) >= 0
+    ]
+
+    paragraphs: list[str] = []
+    for _, paragraph in groupby(words, key=lambda word: word[:2]):
+        lines = [" ".join(word[3] for word in line) for _, line in groupby(paragraph, key=lambda word: word[2])]
+        paragraphs.append("\n".join(lines))
+
+    return "\n\n".join(paragraphs), [word[4] for word in words]
+
+
+def ocr_page(image_path: str, lang: str = OCR_LANGUAGES) -> OcrPage:
+    """
+    Run Tesseract on a single page image.
+
+    Args:
+        image_path: Path to the rendered page image.
+        lang: Tesseract language codes, e.g. "deu+eng".
+
+    Returns:
+        OcrPage with the recognised markdown and mean word confidence.
+    """
+    with Image.open(image_path) as image:
+        data: dict[str, list[Any]] = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    markdown, confidences = _words_to_markdown(data)
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+
+    return OcrPage(image_path=image_path, markdown=markdown, confidence=confidence, word_count=len(confidences))
+
+
+def _ocr_page_or_error(image_path: str, lang: str) -> tuple[OcrPage, str | None]:
+    # e.g. missing traineddata of a language; the page is escalated instead of failing the whole document
+    try:
+        return ocr_page(image_path, lang), None
+    except pytesseract.TesseractError as e:
+        return OcrPage(image_path=image_path, markdown="", confidence=0.0, word_count=0), str(e.message)
+
+
+def ocr_pages(image_paths: list[str], lang: str = OCR_LANGUAGES, max_workers: int | None = None) -> list[OcrPage]:
+    """
+    OCR rendered pages in a process pool.
+
+    If the Tesseract binary is not available every page is returned with confidence 0,
+    so that callers escalate all pages to the vision model. Pages Tesseract fails on, e.g.
+    because the traineddata of a language is missing, are returned with confidence 0 as well.
+
+    Args:
+        image_paths: Rendered page images in page order.
+        lang: Tesseract language codes.
+        max_workers: Size of the process pool. Defaults to the number of CPUs, capped by the page count.
+
+    Returns:
+        List of OcrPage in the same order as image_paths.
+    """
+    if not image_paths:
+        return []
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        logger.warning("Tesseract is not installed, skipping OCR fallback")
+        return [OcrPage(image_path=path, markdown="", confidence=0.0, word_count=0) for path in image_paths]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(image_paths))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as executor:
+        results = list(executor.map(_ocr_page_or_error, image_paths, [lang] * len(image_paths)))
+
+    errors = [error for _, error in results if error is not None]
+    if errors:
+        logger.warning(f"Tesseract failed on {len(errors)} pages, escalating them to the vision model: {errors[0]}")
+    pages = [page for page, _ in results]
+
+    logger.info(f"OCR processed {len(pages)} pages with {workers} workers")
+    return pages
@@ -0,0 +1,232 @@
+import math
+import random
+import re
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from strands import Agent
+from strands.agent import AgentResult
+from strands.types.content import ContentBlock
+from strands.types.media import ImageFormat
+
+from doc_redaction.agent import STAGE_MODELS, ModelConfig, create_agent, create_model, resolve_model_id
+from doc_redaction.promt import PAGE_CONVERTER_SYSTEM_PROMPT
+from doc_redaction.utils.commons import InvalidDocumentFormatError, PageConversionError, PageSplitError
+from doc_redaction.utils.node_metrics import NodeMetrics, agent_results_metrics
+from doc_redaction.utils.preflight import IMAGE_PIXELS_PER_TOKEN, MAX_IMAGE_EDGE, RENDER_DPI, VISION_PAGE_TEXT_TOKENS, image_tokens
+from doc_redaction.utils.token_tracker import BYTES_PER_TOKEN
+
+DEFAULT_CONVERT_CONCURRENCY: int = 4
+PAGE_RETRIES: int = 3
+RETRY_BACKOFF_SECONDS: float = 1.0
+# Pages of average complexity packed into one request; complex pages count as several
+DEFAULT_PAGES_PER_REQUEST: int = 4
+# Bedrock accepts at most 20 images per Claude request
+MAX_IMAGES_PER_REQUEST: int = 20
+# Keeps a request well within the context window of every routed model
+MAX_REQUEST_IMAGE_TOKENS: int = 32000
+# Output estimates are rough, leave half of the model's output tokens as headroom
+OUTPUT_TOKEN_HEADROOM: float = 0.5
+IMAGE_FORMATS: dict[str, ImageFormat] = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".gif": "gif", ".webp": "webp"}
+PAGE_DELIMITER_RE = re.compile(r"^[ \t]*<!-- page (\d+) -->[ \t]*$", re.MULTILINE)
+
+
+@dataclass
+class PageConversion:
+    """Markdown of pages converted by the vision model, the metrics of the conversion stage and the number of requests."""
+
+    pages: dict[int, str]
+    metrics: NodeMetrics
+    requests: int = 0
+
+
+def image_block(image_path: str) -> ContentBlock:
+    """Build a Bedrock image content block from a rendered page image; raises InvalidDocumentFormatError for other files."""
+    path = Path(image_path)
+    image_format = IMAGE_FORMATS.get(path.suffix.lower())
+    if image_format is None:
+        raise InvalidDocumentFormatError(path.suffix)
+    return {"image": {"format": image_format, "source": {"bytes": path.read_bytes()}}}
+
+
+def page_output_tokens(page_info: dict[str, Any] | None) -> int:
+    """Predict the markdown tokens of a page from its assessment; pages with a dense (if unusable) text layer produce more."""
+    if page_info is None:
+        return VISION_PAGE_TEXT_TOKENS
+    return max(VISION_PAGE_TEXT_TOKENS, math.ceil(page_info.get("text_length", 0) / BYTES_PER_TOKEN))
+
+
+def plan_page_requests(
+    pages: list[int],
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    page_details: list[dict[str, Any]] | None = None,
+    max_output_tokens: int = STAGE_MODELS["convert_result"].max_tokens,
+    dpi: int = RENDER_DPI,
+) -> list[list[int]]:
+    """
+    Group pages into vision requests, adapting the group size to the complexity of the pages.
+
+    A page of average complexity counts as one unit of ``pages_per_request``, a page predicted to produce
+    more markdown counts as several, so dense pages get smaller requests. A request is also closed before
+    it exceeds MAX_IMAGES_PER_REQUEST images, MAX_REQUEST_IMAGE_TOKENS image tokens or the usable share of
+    the model's output tokens. A single page always gets a request of its own.
+
+    Args:
+        pages: Page indices to convert.
+        pages_per_request: Maximum pages of average complexity per request; 1 sends every page on its own.
+        page_details: ``content_analysis.page_details`` of the assessment. Pages without details count as average.
+        max_output_tokens: Output token limit of the conversion model.
+        dpi: Render resolution of the page images.
+
+    Returns:
+        Page index groups in page order.
+
+    Example:
+        requests = plan_page_requests(list(vision_pages), pages_per_request=4, page_details=doc_quality["content_analysis"]["page_details"])
+    """
+    details: dict[int, dict[str, Any]] = {page["page_number"] - 1: page for page in page_details or []}
+    output_budget: int = round(max_output_tokens * OUTPUT_TOKEN_HEADROOM)
+    # Pages without dimensions are assumed to use the largest image the model accepts
+    default_image: int = math.ceil(MAX_IMAGE_EDGE**2 / IMAGE_PIXELS_PER_TOKEN)
+
+    groups: list[list[int]] = []
+    group: list[int] = []
+    units = output = image = 0
+    for page_index in sorted(pages):
+        page_info = details.get(page_index)
+        page_output = page_output_tokens(page_info)
+        page_units = math.ceil(page_output / VISION_PAGE_TEXT_TOKENS)
+        page_image = image_tokens(page_info["page_dimensions"]["width"], page_info["page_dimensions"]["height"], dpi) if page_info else default_image
+
+        if group and (
+            units + page_units > pages_per_request or len(group) >= MAX_IMAGES_PER_REQUEST or output + page_output > output_budget or image + page_image > MAX_REQUEST_IMAGE_TOKENS
+        ):
+            groups.append(group)
+            group, units, output, image = [], 0, 0, 0
+        group.append(page_index)
+        units, output, image = units + page_units, output + page_output, image + page_image
+
+    if group:
+        groups.append(group)
+    return groups
+
+
+def split_pages(markdown: str, pages: list[int]) -> dict[int, str]:
+    """
+    Split the markdown of a multi-page request at its ``<!-- page N -->`` delimiters.
+
+    Text the model put before the first delimiter is kept at the start of the first returned page.
+
+    Args:
+        markdown: Model response.
+        pages: Page indices of the request.
+
+    Returns:
+        Markdown per page index, without the delimiters.
+
+    Raises:
+        PageSplitError: If the delimiters do not match the requested pages, or a page delimiter is repeated.
+    """
+    parts: list[str] = PAGE_DELIMITER_RE.split(markdown)
+    # A single page may come back without its delimiter
+    if len(pages) == 1 and len(parts) == 1:
+        return {pages[0]: markdown.strip()}
+    numbers: list[int] = [int(number) - 1 for number in parts[1::2]]
+    # A repeated delimiter would silently keep only its last block
+    if sorted(numbers) != sorted(pages):
+        raise PageSplitError(pages, sorted(numbers))
+    found: dict[int, str] = {number: text.strip() for number, text in zip(numbers, parts[2::2], strict=True)}
+    leading: str = parts[0].strip()
+    if leading:
+        first = numbers[0]
+        logger.warning(f"Text before the first page delimiter added to page {first + 1}")
+        found[first] = f"{leading}\n\n{found[first]}".strip()
+    return found
+
+
+def page_request(pages: list[int], images: dict[int, str]) -> list[ContentBlock]:
+    """Build the user message of a request: the page numbers, then every page image preceded by its number."""
+    content: list[ContentBlock] = [{"text": f"Convert pages {', '.join(str(page + 1) for page in pages)} to markdown."}]
+    for page_index in pages:
+        content += [{"text": f"Page {page_index + 1}:"}, image_block(images[page_index])]
+    return content
+
+
+def _convert_request(agent_factory: Callable[[], Agent], pages: list[int], images: dict[int, str], retries: int) -> tuple[dict[int, str], AgentResult]:
+    attempt = 0
+    while True:
+        try:
+            # A fresh agent per attempt, so a failed attempt leaves no partial conversation behind
+            result: AgentResult = agent_factory()(page_request(pages, images))
+            return split_pages(str(result), pages), result
+        except Exception as e:
+            if attempt >= retries:
+                raise PageConversionError(pages, e) from e
+            logger.warning(f"Conversion of pages {[page + 1 for page in pages]} failed ({e}), retrying")
+        # full jitter keeps concurrent requests from retrying in lockstep
+        time.sleep(random.uniform(0, RETRY_BACKOFF_SECONDS * 2**attempt))  # noqa: S311 - backoff jitter, not cryptography
+        attempt += 1
+
+
+def convert_pages(
+    images: dict[int, str],
+    config: ModelConfig = STAGE_MODELS["convert_result"],
+    max_concurrency: int = DEFAULT_CONVERT_CONCURRENCY,
+    retries: int = PAGE_RETRIES,
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    page_details: list[dict[str, Any]] | None = None,
+    agent_factory: Callable[[], Agent] | None = None,
+) -> PageConversion:
+    """
+    Convert rendered pages to markdown with parallel vision model calls.
+
+    Pages are packed into requests of up to ``pages_per_request`` pages, fewer for complex pages (see
+    ``plan_page_requests``), and each response is split back into pages at the page delimiters. At most
+    ``max_concurrency`` requests run at the same time. A failing request, including one whose response
+    cannot be split, is retried on its own with exponential backoff, without repeating the other requests.
+    All agents share one model instance, which is read-only during the calls.
+
+    Args:
+        images: Rendered page images keyed by page index.
+        config: Model settings of the conversion stage.
+        max_concurrency: Maximum number of concurrent model calls.
+        retries: Retries per request after the first attempt.
+        pages_per_request: Maximum pages of average complexity per request.
+        page_details: ``content_analysis.page_details`` of the assessment, used to size the requests.
+        agent_factory: Builds the agent of one call, e.g. a stub in tests. Defaults to a page converter agent.
+
+    Returns:
+        PageConversion with the markdown per page index and the combined metrics of all calls.
+
+    Raises:
+        PageConversionError: If a request still fails after all retries.
+
+    Example:
+        conversion = convert_pages({0: "data/temp/vertrag/page_1.png", 1: "data/temp/vertrag/page_2.png"}, pages_per_request=2)
+    """
+    if agent_factory is None:
+        model = create_model(config)
+        agent_factory = lambda: create_agent(system_prompt=PAGE_CONVERTER_SYSTEM_PROMPT, name="page_converter", model=model)
+
+    requests: list[list[int]] = plan_page_requests(list(images), pages_per_request, page_details, config.max_tokens)
+    start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="page-convert")
+    try:
+        futures = [executor.submit(_convert_request, agent_factory, pages, images, retries) for pages in requests]
+        converted: list[tuple[dict[int, str], AgentResult]] = [future.result() for future in futures]
+    finally:
+        # A failed request fails the document; requests that have not started yet are skipped
+        executor.shutdown(cancel_futures=True)
+
+    wall_time_ms = round((time.perf_counter() - start) * 1000)
+    logger.info(f"Converted {len(images)} pages in {len(requests)} vision requests in {wall_time_ms} ms")
+    return PageConversion(
+        pages={page_index: markdown for pages, _ in converted for page_index, markdown in sorted(pages.items())},
+        metrics=agent_results_metrics("convert_result", resolve_model_id(config.model_id), [result for _, result in converted], wall_time_ms),
+        requests=len(requests),
+    )
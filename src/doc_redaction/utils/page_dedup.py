@@ -0,0 +1,163 @@
+import hashlib
+import pathlib
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import fitz  # PyMuPDF
+import numpy as np
+from loguru import logger
+
+from doc_redaction.utils.doc_session import DocumentSession
+
+HASH_SIZE: int = 8
+HASH_DPI: int = 18
+# Pages with close dHashes only count as duplicates if their renders at this resolution are byte-identical
+EXACT_DPI: int = 72
+BLANK_STD_THRESHOLD: float = 2.0
+DUPLICATE_MAX_DISTANCE: int = 4
+
+
+@dataclass
+class DedupPlan:
+    """Grouping of pages into blank, unique and duplicate pages.
+
+    Attributes:
+        hashes: dHash per zero-based page index.
+        digests: Digest of the page render at EXACT_DPI per zero-based page index.
+        blank_pages: Pages without visible content.
+        representatives: Maps every non-blank page to the first identical page (unique pages map to themselves).
+    """
+
+    hashes: dict[int, int] = field(default_factory=dict)
+    digests: dict[int, str] = field(default_factory=dict)
+    blank_pages: list[int] = field(default_factory=list)
+    representatives: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def unique_pages(self) -> list[int]:
+        """Pages that have to be converted."""
+        return [page for page, representative in self.representatives.items() if page == representative]
+
+    @property
+    def duplicates(self) -> dict[int, int]:
+        """Maps each duplicate page to the unique page whose markdown it reuses."""
+        return {page: representative for page, representative in self.representatives.items() if page != representative}
+
+
+@dataclass
+class PageHashIndex:
+    """In-memory index of converted pages, shared across the documents of a batch. Safe to share between threads.
+
+    Pages are keyed by their exact digest: the markdown of a page may hold personal data, so it is only reused
+    for an identical page of another document, never for one that merely looks alike.
+    """
+
+    markdown: dict[str, str] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def find(self, digest: str) -> str | None:
+        """Return the markdown of a previously converted identical page, if any."""
+        with self._lock:
+            return self.markdown.get(digest)
+
+    def add(self, digest: str, markdown: str) -> None:
+        """Register the markdown of a converted page."""
+        with self._lock:
+            self.markdown.setdefault(digest, markdown)
+
+
+def hamming_distances(hashes: np.ndarray, other: np.ndarray | np.uint64) -> np.ndarray:
+    """Vectorised bit count of ``hashes XOR other`` for 64-bit hashes (broadcasts like NumPy)."""
+    xor = np.bitwise_xor(hashes, other)
+    return np.unpackbits(xor[..., np.newaxis].view(np.uint8), axis=-1).sum(axis=-1)
+
+
+def _gray_samples(pix: fitz.Pixmap) -> np.ndarray:
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, : pix.width].astype(np.float32)
+
+
+def page_digest(session: DocumentSession, index: int, dpi: int = EXACT_DPI) -> str:
+    """SHA-256 of the grayscale render of a page; not cached in the session since it is only needed once."""
+    pix = session.page(index).get_pixmap(matrix=fitz.Matrix(dpi / 72.0, dpi / 72.0), colorspace=fitz.csGRAY, alpha=False)
+    return hashlib.sha256(pix.samples).hexdigest()
+
+
+def _block_mean(samples: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    row_edges = np.linspace(0, samples.shape[0], rows + 1).astype(int)[:-1]
+    col_edges = np.linspace(0, samples.shape[1], cols + 1).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(samples, row_edges, axis=0), col_edges, axis=1)
+    counts = np.outer(np.diff(np.append(row_edges, samples.shape[0])), np.diff(np.append(col_edges, samples.shape[1])))
+    return sums / counts
+
+
+def dhash(samples: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the difference hash of a grayscale image.
+
+    Args:
+        samples: 2D grayscale pixel array.
+        hash_size: Edge length of the hash grid; the result has hash_size**2 bits.
+
+    Returns:
+        The hash as an integer.
+    """
+    grid = _block_mean(samples, hash_size, hash_size + 1)
+    bits = (grid[:, 1:] > grid[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def plan_page_dedup(
+    pdf_path: str | pathlib.Path,
+    pages: Iterable[int] | None = None,
+    max_distance: int = DUPLICATE_MAX_DISTANCE,
+    session: DocumentSession | None = None,
+) -> DedupPlan:
+    """
+    Fingerprint pages and group blank and duplicate pages.
+
+    Pages are rendered as small grayscale pixmaps, so this is much cheaper than ``pdf_to_png``. A dHash match
+    is confirmed by the digest of a render at EXACT_DPI, since pages that differ only in a name or an IBAN
+    have close dHashes.
+
+    Args:
+        pdf_path: Path to the source PDF.
+        pages: Zero-based page indices to consider. All pages if None.
+        max_distance: Maximum Hamming distance between two hashes to compare the pages' digests.
+        session: Optional open session on the same PDF.
+
+    Returns:
+        DedupPlan for the considered pages.
+    """
+    plan = DedupPlan()
+    own_session = session is None
+    session = DocumentSession(pdf_path) if session is None else session
+    try:
+        page_numbers = range(session.page_count) if pages is None else sorted(set(pages))
+        for page_number in page_numbers:
+            samples = _gray_samples(session.pixmap(page_number, dpi=HASH_DPI, colorspace="GRAY"))
+            if samples.std() < BLANK_STD_THRESHOLD:
+                plan.blank_pages.append(page_number)
+            else:
+                plan.hashes[page_number] = dhash(samples)
+                plan.digests[page_number] = page_digest(session, page_number)
+    finally:
+        if own_session:
+            session.close()
+
+    page_ids = list(plan.hashes)
+    if page_ids:
+        hashes = np.array([plan.hashes[page] for page in page_ids], dtype=np.uint64)
+        distances = hamming_distances(hashes[:, np.newaxis], hashes[np.newaxis, :])
+        unique_rows: list[int] = []
+        for row, page in enumerate(page_ids):
+            match = next(
+                (unique for unique in unique_rows if distances[row, unique] <= max_distance and plan.digests[page] == plan.digests[page_ids[unique]]),
+                None,
+            )
+            if match is None:
+                unique_rows.append(row)
+            plan.representatives[page] = page if match is None else page_ids[match]
+
+    logger.info(f"Page dedup: {len(plan.unique_pages)} unique, {len(plan.duplicates)} duplicate, {len(plan.blank_pages)} blank pages")
+    return plan
@@ -0,0 +1,249 @@
+import math
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import typer
+from loguru import logger
+
+from doc_redaction.agent import MODEL_IDS, STAGE_MODELS, ModelConfig, load_model_routing, resolve_model_id
+from doc_redaction.utils.assessment_cache import cached_assess_doc_quality
+from doc_redaction.utils.commons import BudgetExceededError, Dir, Prefix
+from doc_redaction.utils.text_layer import is_strong_page
+from doc_redaction.utils.token_tracker import BYTES_PER_TOKEN, check_model_pricing, count_tokens
+
+RENDER_DPI: int = 200
+# Claude downsizes images to a long edge of at most 1568 px and bills about one token per 750 px
+MAX_IMAGE_EDGE: int = 1568
+IMAGE_PIXELS_PER_TOKEN: int = 750
+# System prompt, task prompt prefix and tool specs sent with every request
+PROMPT_OVERHEAD_TOKENS: int = 2500
+VISION_PAGE_TEXT_TOKENS: int = 700
+DETECTION_OUTPUT_TOKENS: int = 2000
+# Each tool round trip resends the context, agents typically need two model calls per stage
+AGENT_CYCLES: int = 2
+
+# Models a stage can be downgraded to, most expensive first (keys of MODEL_IDS)
+FALLBACK_MODELS: tuple[str, ...] = ("default", "haiku", "nova_lite")
+
+
+@dataclass
+class StageEstimate:
+    """Predicted tokens and cost of one graph stage."""
+
+    stage: str
+    model_id: str
+    input_tokens: int
+    output_tokens: int
+    cost: float
+
+
+@dataclass
+class RoutingDecision:
+    """Models picked for a document and its predicted cost.
+
+    Attributes:
+        file_path: Path of the document.
+        page_count: Number of pages.
+        vision_pages: Pages predicted to need the vision model.
+        stages: Estimate per stage with the chosen model.
+        status: "accepted", "downgraded" or "refused".
+    """
+
+    file_path: str
+    page_count: int
+    vision_pages: int
+    stages: list[StageEstimate] = field(default_factory=list)
+    status: str = "accepted"
+
+    @property
+    def cost(self) -> float:
+        return sum(stage.cost for stage in self.stages)
+
+    @property
+    def models(self) -> dict[str, str]:
+        """Chosen model id per stage."""
+        return {stage.stage: stage.model_id for stage in self.stages}
+
+
+def image_tokens(width_pt: float, height_pt: float, dpi: int = RENDER_DPI) -> int:
+    """Predict the tokens of a page rendered at dpi after the model's downscaling."""
+    width, height = width_pt / 72 * dpi, height_pt / 72 * dpi
+    scale = min(1.0, MAX_IMAGE_EDGE / max(width, height, 1))
+    return math.ceil(width * scale * height * scale / IMAGE_PIXELS_PER_TOKEN)
+
+
+def predict_stage_tokens(assessment: dict[str, Any], dpi: int = RENDER_DPI) -> tuple[dict[str, tuple[int, int]], int]:
+    """
+    Predict input and output tokens per stage from an assessment report, without any model call.
+
+    Pages without a usable text layer are counted as vision pages (OCR may still rescue some of them,
+    so this is an upper bound). Sampled assessments are scaled to the full page count.
+
+    Args:
+        assessment: Report of ``assess_doc_quality``.
+        dpi: Render resolution of vision pages.
+
+    Returns:
+        Mapping of stage to (input tokens, output tokens), and the predicted number of vision pages.
+    """
+    page_details: list[dict[str, Any]] = assessment["content_analysis"]["page_details"]
+    page_count: int = assessment["file_info"]["page_count"]
+    scale = page_count / len(page_details) if page_details else 0.0
+
+    weak = [page for page in page_details if not is_strong_page(page)]
+    strong_chars = sum(page.get("text_length", 0) for page in page_details if is_strong_page(page))
+    vision_pages = round(len(weak) * scale)
+    image = sum(image_tokens(page["page_dimensions"]["width"], page["page_dimensions"]["height"], dpi) for page in weak) * scale
+    document = math.ceil(strong_chars * scale / BYTES_PER_TOKEN) + vision_pages * VISION_PAGE_TEXT_TOKENS
+
+    stages: dict[str, tuple[int, int]] = {}
+    if vision_pages:
+        stages["convert_result"] = (round((PROMPT_OVERHEAD_TOKENS + image + document) * AGENT_CYCLES), document)
+    stages["detector_result"] = ((PROMPT_OVERHEAD_TOKENS + document) * AGENT_CYCLES, DETECTION_OUTPUT_TOKENS)
+    stages["redact_result"] = ((PROMPT_OVERHEAD_TOKENS + document + DETECTION_OUTPUT_TOKENS) * AGENT_CYCLES, document)
+    return stages, vision_pages
+
+
+def _input_rate(model_id: str) -> float:
+    return count_tokens(1_000_000, model_id, "inputTokens")["costs"]
+
+
+def model_ladder(model_id: str) -> tuple[str, ...]:
+    """Return the routed model followed by the FALLBACK_MODELS that are cheaper than it, as Bedrock model ids."""
+    model_id = resolve_model_id(model_id)
+    rate = _input_rate(model_id)
+    return (model_id, *(MODEL_IDS[key] for key in FALLBACK_MODELS if _input_rate(MODEL_IDS[key]) < rate))
+
+
+def _stage_estimate(stage: str, model_id: str, tokens: tuple[int, int]) -> StageEstimate:
+    cost = count_tokens(tokens[0], model_id, "inputTokens")["costs"] + count_tokens(tokens[1], model_id, "outputTokens")["costs"]
+    return StageEstimate(stage=stage, model_id=model_id, input_tokens=tokens[0], output_tokens=tokens[1], cost=cost)
+
+
+class BudgetRouter:
+    """
+    Pick a model per stage within a per-document and a per-batch budget.
+
+    Every stage starts on its routed model (see ``model_ladder``). While the document's predicted cost
+    exceeds the smaller of the document budget and the remaining batch budget, the most expensive stage
+    that still has a cheaper fallback is downgraded; the other stages keep their routed model. If no downgrade fits, the document is refused.
+    Accepted documents reserve their predicted cost from the batch budget. The router is safe to share
+    between the threads of a batch.
+
+    Args:
+        document_budget: Maximum predicted cost per document. Unlimited if None.
+        batch_budget: Maximum predicted cost of all routed documents. Unlimited if None.
+        dpi: Render resolution of vision pages.
+    """
+
+    def __init__(self, document_budget: float | None = None, batch_budget: float | None = None, dpi: int = RENDER_DPI) -> None:
+        self.document_budget = document_budget
+        self.batch_budget = batch_budget
+        self.dpi = dpi
+        self.spent: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        return math.inf if self.batch_budget is None else self.batch_budget - self.spent
+
+    def route(self, file_path: str, assessment: dict[str, Any], models: dict[str, ModelConfig] | None = None) -> RoutingDecision:
+        """
+        Choose the models of a document and reserve its predicted cost.
+
+        Args:
+            file_path: Path of the document.
+            assessment: Report of ``assess_doc_quality`` for the document.
+            models: Routed model settings per stage, the first choice of every stage. Defaults to STAGE_MODELS.
+
+        Returns:
+            RoutingDecision; refused documents keep the cheapest estimate and reserve nothing.
+        """
+        tokens, vision_pages = predict_stage_tokens(assessment, self.dpi)
+        ladders = {stage: model_ladder(config.model_id) for stage, config in (models or STAGE_MODELS).items()}
+        with self._lock:
+            return self._route(file_path, assessment["file_info"]["page_count"], tokens, vision_pages, ladders)
+
+    def _route(self, file_path: str, page_count: int, tokens: dict[str, tuple[int, int]], vision_pages: int, ladders: dict[str, tuple[str, ...]]) -> RoutingDecision:
+        limit = min(self.remaining, math.inf if self.document_budget is None else self.document_budget)
+        levels = dict.fromkeys(tokens, 0)
+
+        decision = RoutingDecision(file_path=file_path, page_count=page_count, vision_pages=vision_pages)
+        while True:
+            decision.stages = [_stage_estimate(stage, ladders[stage][levels[stage]], tokens[stage]) for stage in tokens]
+            if decision.cost <= limit:
+                break
+            downgradable = [stage for stage in decision.stages if levels[stage.stage] + 1 < len(ladders[stage.stage])]
+            if not downgradable:
+                decision.status = "refused"
+                logger.warning(f"Preflight refused {file_path}: predicted cost {decision.cost:.4f} exceeds budget {limit:.4f}")
+                return decision
+            levels[max(downgradable, key=lambda stage: stage.cost).stage] += 1
+            decision.status = "downgraded"
+
+        self.spent += decision.cost
+        logger.info(f"Preflight {decision.status} {file_path}: {decision.models}, predicted cost {decision.cost:.4f}")
+        return decision
+
+
+def preflight(file_path: str, router: BudgetRouter, assessment: dict[str, Any] | None = None, models: dict[str, ModelConfig] | None = None) -> RoutingDecision:
+    """
+    Route a document before any model call and raise if it does not fit the budget.
+
+    Args:
+        file_path: Path of the PDF document.
+        router: Budget router shared by the documents of a batch.
+        assessment: Optional assessment report; looked up in the assessment cache otherwise.
+        models: Routed model settings per stage. Defaults to STAGE_MODELS.
+
+    Returns:
+        Accepted or downgraded RoutingDecision.
+
+    Raises:
+        BudgetExceededError: If the document is refused.
+    """
+    decision = router.route(file_path, assessment if assessment is not None else cached_assess_doc_quality(file_path), models)
+    if decision.status == "refused":
+        raise BudgetExceededError(file_path, decision.cost)
+    return decision
+
+
+def dry_run(
+    directory: str = f"{Dir.Data}{Prefix.CONTRACT}",
+    document_budget: float | None = None,
+    batch_budget: float | None = None,
+    pattern: str = "*.pdf",
+    routing: str | None = None,
+) -> list[RoutingDecision]:
+    """
+    Print the predicted models and cost of every document in a directory without calling a model.
+
+    Args:
+        directory: Directory to scan.
+        document_budget: Maximum predicted cost per document.
+        batch_budget: Maximum predicted cost of the whole directory.
+        pattern: Glob pattern of the documents, relative to directory.
+        routing: JSON file mapping graph stages to model settings, see ``load_model_routing``.
+
+    Returns:
+        RoutingDecision per document, in file name order.
+
+    Example:
+        python -m doc_redaction.utils.preflight --directory data/contract --document-budget 0.05 --batch-budget 1
+    """
+    router = BudgetRouter(document_budget=document_budget, batch_budget=batch_budget)
+    models = check_model_pricing(load_model_routing(routing))
+    decisions = [router.route(str(pdf), cached_assess_doc_quality(str(pdf)), models) for pdf in sorted(Path(directory).glob(pattern))]
+
+    for decision in decisions:
+        chosen = ", ".join(f"{stage}={model_id}" for stage, model_id in decision.models.items())
+        typer.echo(f"{Path(decision.file_path).name}: {decision.page_count} pages, {decision.vision_pages} vision, {decision.status}, ${decision.cost:.4f} ({chosen})")
+    accepted = [decision for decision in decisions if decision.status != "refused"]
+    typer.echo(f"Total: {len(accepted)}/{len(decisions)} documents accepted, predicted cost ${sum(decision.cost for decision in accepted):.4f}")
+    return decisions
+
+
+if __name__ == "__main__":
+    typer.run(dry_run)
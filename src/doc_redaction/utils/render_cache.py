@@ -0,0 +1,123 @@
+import contextlib
+import os
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+from doc_redaction.utils.commons import CacheStats, Dir, Prefix, atomic_write
+
+DEFAULT_MAX_BYTES: int = 1024 * 1024 * 1024
+
+
+class DiskCache:
+    """
+    Size-capped on-disk store of files in a directory sharded by the first two key characters.
+
+    Entries are written to a temporary file and atomically renamed into place, so concurrent
+    readers never observe partial files and concurrent writers of the same key are harmless.
+    Reads bump the file's modification time, which drives least-recently-used eviction once
+    the total size exceeds ``max_bytes``.
+
+    Args:
+        cache_dir: Root directory of the cache.
+        max_bytes: Size cap of the cache directory in bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._approx_size: int | None = None
+
+    def _read(self, entry: Path) -> bytes | None:
+        """Return the bytes of an entry or None on a miss."""
+        try:
+            data = entry.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        # a concurrent eviction may remove the entry between read and touch
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(entry)
+        with self._lock:
+            self.stats.hits += 1
+        return data
+
+    def _write(self, entry: Path, data: bytes) -> None:
+        """Store the bytes of an entry and evict the least recently used entries if the cache is over its size cap."""
+        atomic_write(entry, data)
+
+        # avoid a directory scan per write: track the size since the last scan and only evict when over the cap
+        with self._lock:
+            if self._approx_size is None:
+                self._approx_size = self.size()
+            else:
+                self._approx_size += len(data)
+            over_cap = self._approx_size > self.max_bytes
+        if over_cap:
+            self.evict()
+
+    def size(self) -> int:
+        """Total size of all cache entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits ``max_bytes``. Returns the number of removed entries."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # another process may have evicted the same entry already
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._approx_size = total
+            self.stats.evictions += removed
+        if removed:
+            logger.info(f"{type(self).__name__} evicted {removed} entries")
+        return removed
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        for entry in self.cache_dir.glob("*/*"):
+            if entry.suffix == ".tmp":
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        return entries
+
+
+class RenderCache(DiskCache):
+    """
+    On-disk cache of rendered pages keyed by PDF content hash, page index and render settings.
+
+    Args:
+        cache_dir: Root directory of the cache.
+        max_bytes: Size cap of the cache directory in bytes.
+    """
+
+    def __init__(self, cache_dir: str = f"{Dir.Data}{Prefix.RENDER_CACHE}", max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__(cache_dir, max_bytes)
+
+    def path(self, pdf_hash: str, page_index: int, dpi: int, colorspace: str, fmt: str, clip: tuple[float, ...] | None = None) -> Path:
+        """Return the cache file path of an entry; the first two hash characters shard the directory."""
+        clip_part = "_clip" + "-".join(f"{value:.1f}" for value in clip) if clip else ""
+        return self.cache_dir / pdf_hash[:2] / f"{pdf_hash}_{page_index}_{dpi}_{colorspace.lower()}{clip_part}.{fmt}"
+
+    def get(self, pdf_hash: str, page_index: int, dpi: int, colorspace: str, fmt: str, clip: tuple[float, ...] | None = None) -> bytes | None:
+        """Return the cached image bytes or None on a miss."""
+        return self._read(self.path(pdf_hash, page_index, dpi, colorspace, fmt, clip))
+
+    def put(self, pdf_hash: str, page_index: int, dpi: int, colorspace: str, fmt: str, data: bytes, clip: tuple[float, ...] | None = None) -> None:
+        """Store image bytes and evict the least recently used entries if the cache is over its size cap."""
+        self._write(self.path(pdf_hash, page_index, dpi, colorspace, fmt, clip), data)
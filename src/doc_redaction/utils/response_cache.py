@@ -0,0 +1,219 @@
+import hashlib
+import json
+from collections.abc import AsyncGenerator, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+from loguru import logger
+from pydantic import BaseModel
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from doc_redaction.utils.commons import Dir, InvalidResponseCacheModeError, Prefix, ResponseCacheMissError
+from doc_redaction.utils.render_cache import DEFAULT_MAX_BYTES, DiskCache
+
+T = TypeVar("T", bound=BaseModel)
+M = TypeVar("M", bound=Model)
+
+# "record" serves cached responses and stores new ones, "replay" serves cached responses only and fails on a miss
+RESPONSE_CACHE_MODES: tuple[str, ...] = ("off", "record", "replay")
+# Request arguments that identify a request; per-invocation state, cancel signals and agent metadata do not change the response
+REQUEST_KWARGS: tuple[str, ...] = ("tool_choice", "system_prompt_content")
+# Tools whose results differ between otherwise identical runs; their results are left out of request keys
+VOLATILE_TOOLS: tuple[str, ...] = ("current_time",)
+
+
+def _encode(value: Any) -> Any:
+    # Image bytes are represented by their hash, so the key stays small
+    if isinstance(value, bytes | bytearray):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    return str(value)
+
+
+def stable_messages(messages: Messages) -> Messages:
+    """Return the messages with the results of VOLATILE_TOOLS calls emptied, so a replayed run keys like the recorded one."""
+    volatile: set[str] = {
+        block["toolUse"]["toolUseId"] for message in messages for block in message["content"] if "toolUse" in block and block["toolUse"]["name"] in VOLATILE_TOOLS
+    }
+    if not volatile:
+        return messages
+    return [
+        {
+            **message,
+            "content": [
+                {"toolResult": {**block["toolResult"], "content": []}} if "toolResult" in block and block["toolResult"]["toolUseId"] in volatile else block
+                for block in message["content"]
+            ],
+        }
+        for message in messages
+    ]
+
+
+def request_key(config: Any, **request: Any) -> str:
+    """Return the SHA-256 of a model config and the request arguments, with bytes such as page images hashed."""
+    payload = json.dumps({"config": config, **request}, sort_keys=True, default=_encode)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(DiskCache):
+    """
+    On-disk cache of model responses keyed by request hash, stored as the list of stream events.
+
+    Args:
+        cache_dir: Root directory of the cache.
+        max_bytes: Size cap of the cache directory in bytes.
+    """
+
+    def __init__(self, cache_dir: str = f"{Dir.Data}{Prefix.RESPONSE_CACHE}", max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__(cache_dir, max_bytes)
+
+    def path(self, key: str) -> Path:
+        """Return the cache file path of an entry; the first two hash characters shard the directory."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the cached events of a request or None on a miss."""
+        data = self._read(self.path(key))
+        return json.loads(data) if data is not None else None
+
+    def put(self, key: str, events: Sequence[Mapping[str, Any]]) -> None:
+        """Store the events of a request; responses that are not JSON serializable are not cached."""
+        try:
+            data = json.dumps(events).encode("utf-8")
+        except TypeError as e:
+            logger.warning(f"Response of request {key} not cached: {e}")
+            return
+        self._write(self.path(key), data)
+
+
+class CachedModel(Model):
+    """
+    Model wrapper that records responses in a ResponseCache and replays them for identical requests.
+
+    Requests are keyed by the wrapped model's config, the messages (including image bytes), the tool
+    specs and the system prompt. Identical requests of later runs are answered from the cache without
+    a model call, so a fully recorded workflow replays offline and deterministically. Results of
+    VOLATILE_TOOLS such as ``current_time`` are not part of the key, so they do not make later calls miss.
+
+    Args:
+        model: Wrapped model.
+        cache: Response store.
+        mode: "record" or "replay", see RESPONSE_CACHE_MODES.
+
+    Raises:
+        InvalidResponseCacheModeError: If mode is not "record" or "replay".
+
+    Example:
+        agent = create_agent(system_prompt, model=CachedModel(create_model(config), ResponseCache(), mode="replay"))
+    """
+
+    def __init__(self, model: Model, cache: ResponseCache, mode: str = "record") -> None:
+        if mode not in RESPONSE_CACHE_MODES[1:]:
+            raise InvalidResponseCacheModeError(mode, RESPONSE_CACHE_MODES[1:])
+        self.model = model
+        self.cache = cache
+        self.mode = mode
+
+    def __getattr__(self, name: str) -> Any:
+        # Provider specific attributes, e.g. BedrockModel.config, are read from the wrapped model
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def _cached(self, key: str) -> list[dict[str, Any]] | None:
+        events = self.cache.get(key)
+        if events is None and self.mode == "replay":
+            raise ResponseCacheMissError(key)
+        return events
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """Stream the cached events of an identical request, or stream from the wrapped model and record its events."""
+        request = {name: kwargs.get(name) for name in REQUEST_KWARGS}
+        key = request_key(self.get_config(), messages=stable_messages(messages), tool_specs=tool_specs, system_prompt=system_prompt, **request)
+        events = self._cached(key)
+        if events is not None:
+            for event in events:
+                # recorded from the wrapped model's stream, so the JSON has the shape of a StreamEvent
+                yield cast(StreamEvent, event)
+            return
+
+        recorded: list[StreamEvent] = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            recorded.append(event)
+            yield event
+        self.cache.put(key, recorded)
+
+    async def structured_output(
+        self,
+        output_model: type[T],
+        prompt: Messages,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[dict[str, T | Any], None]:
+        """Like ``stream``; the final output is stored as JSON and validated against output_model on replay."""
+        key = request_key(self.get_config(), output_model=output_model.model_json_schema(), prompt=stable_messages(prompt), system_prompt=system_prompt)
+        events = self._cached(key)
+        if events is not None:
+            for event in events:
+                yield {"output": output_model.model_validate(event["output"])} if "output" in event else event
+            return
+
+        recorded: list[dict[str, Any]] = []
+        async for event in self.model.structured_output(output_model, prompt, system_prompt, **kwargs):
+            recorded.append({"output": event["output"].model_dump(mode="json")} if "output" in event else event)
+            yield event
+        self.cache.put(key, recorded)
+
+
+@dataclass
+class ResponseCacheSettings:
+    """Response cache mode and store applied to every model built by ``create_model``."""
+
+    mode: str = "off"
+    cache: ResponseCache | None = None
+
+
+# Process-wide settings, set with configure_response_cache
+RESPONSE_CACHE: ResponseCacheSettings = ResponseCacheSettings()
+
+
+def configure_response_cache(mode: str = "off", cache: ResponseCache | None = None) -> None:
+    """
+    Wrap every model built by ``create_model`` from now on in a CachedModel.
+
+    Pooled graphs keep the models they were built with, so configure the cache before the first run.
+
+    Args:
+        mode: One of RESPONSE_CACHE_MODES; "off" disables the cache.
+        cache: Response store. Defaults to the cache below ``data/cache/response/``.
+
+    Raises:
+        InvalidResponseCacheModeError: If mode is not one of RESPONSE_CACHE_MODES.
+    """
+    if mode not in RESPONSE_CACHE_MODES:
+        raise InvalidResponseCacheModeError(mode, RESPONSE_CACHE_MODES)
+    RESPONSE_CACHE.mode = mode
+    RESPONSE_CACHE.cache = (cache or ResponseCache()) if mode != "off" else None
+    logger.info(f"Model response cache: {mode}")
+
+
+def cached_model(model: M) -> M | CachedModel:
+    """Return the model wrapped in the configured response cache, or unchanged if the cache is off."""
+    if RESPONSE_CACHE.mode == "off" or RESPONSE_CACHE.cache is None:
+        return model
+    return CachedModel(model, RESPONSE_CACHE.cache, RESPONSE_CACHE.mode)
@@ -0,0 +1,166 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import fitz  # PyMuPDF
+from loguru import logger
+
+from doc_redaction.utils.doc_session import DocumentSession
+from doc_redaction.utils.layout_profile import LayoutProfile, is_text_layer_layout, profile_page
+
+HEADING_SIZE_RATIO: float = 1.15
+MIN_PAGE_TEXT_LENGTH: int = 50
+MAX_BOLD_LINE_LENGTH: int = 80
+BULLET_CHARS: tuple[str, ...] = ("•", "●", "▪", "■", "◦", "‣", "\u2013", "-", "*")
+BOLD_FLAG: int = 16
+
+
+@dataclass
+class TextLayerConversion:
+    """Result of converting a PDF through its native text layer.
+
+    Attributes:
+        pages: Markdown per page in page order. ``None`` marks a weak page that still needs visual conversion.
+    """
+
+    pages: list[str | None] = field(default_factory=list)
+
+    @property
+    def weak_pages(self) -> list[int]:
+        """Zero-based indices of pages that failed the text-layer quality checks."""
+        return [idx for idx, page in enumerate(self.pages) if page is None]
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every page could be converted from the text layer."""
+        return not self.weak_pages
+
+
+def is_strong_page(page_info: dict[str, Any], layout: LayoutProfile | None = None) -> bool:
+    """
+    Decide whether a page's text layer is good enough to skip visual conversion.
+
+    Args:
+        page_info: A single entry of ``content_analysis.page_details`` produced by ``assess_doc_quality``.
+        layout: Optional layout profile of the page; pages with several text columns are weak.
+
+    Returns:
+        True if the page has a usable text layer, False if it should be sent to OCR or the vision model.
+    """
+    if layout is not None and not is_text_layer_layout(layout):
+        return False
+    return not page_info.get("is_image_page", False) and "potential_issue" not in page_info and page_info.get("text_length", 0) >= MIN_PAGE_TEXT_LENGTH
+
+
+def _line_text(line: dict[str, Any]) -> str:
+    return "".join(span.get("text", "") for span in line.get("spans", [])).strip()
+
+
+def _line_size(line: dict[str, Any]) -> float:
+    return max((span.get("size", 0.0) for span in line.get("spans", [])), default=0.0)
+
+
+def _line_is_bold(line: dict[str, Any]) -> bool:
+    spans = [span for span in line.get("spans", []) if span.get("text", "").strip()]
+    return bool(spans) and all(span.get("flags", 0) & BOLD_FLAG or "bold" in span.get("font", "").lower() for span in spans)
+
+
+def _body_font_size(lines: list[dict[str, Any]]) -> float:
+    sizes: Counter[float] = Counter()
+    for line in lines:
+        for span in line.get("spans", []):
+            sizes[round(span.get("size", 0.0), 1)] += len(span.get("text", "").strip())
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _heading_levels(lines: list[dict[str, Any]], body_size: float) -> dict[float, int]:
+    if not body_size:
+        return {}
+    heading_sizes = sorted({round(_line_size(line), 1) for line in lines if _line_size(line) >= body_size * HEADING_SIZE_RATIO}, reverse=True)
+    return {size: min(level, 3) for level, size in enumerate(heading_sizes, start=1)}
+
+
+def _format_line(line: dict[str, Any], body_size: float, levels: dict[float, int]) -> str:
+    text = _line_text(line)
+    level = levels.get(round(_line_size(line), 1))
+    if level:
+        return f"{'#' * level} {text}"
+    for bullet in BULLET_CHARS:
+        if text.startswith(bullet) and text[len(bullet) : len(bullet) + 1].isspace():
+            return f"- {text[len(bullet) :].strip()}"
+    if _line_is_bold(line) and len(text) <= MAX_BOLD_LINE_LENGTH:
+        return f"**{text}**"
+    return text
+
+
+def _inside(bbox: tuple[float, ...], rect: fitz.Rect) -> bool:
+    x0, y0, x1, y1 = bbox
+    return fitz.Point((x0 + x1) / 2, (y0 + y1) / 2) in rect
+
+
+def page_to_markdown(page: fitz.Page, textpage: fitz.TextPage | None = None) -> str:
+    """
+    Build markdown for a single page from its native text layer.
+
+    Headings are inferred from font sizes larger than the dominant body size, bullet
+    glyphs become markdown list items and tables found by ``page.find_tables`` are
+    emitted as markdown tables at their vertical position.
+
+    Args:
+        page: A PyMuPDF page.
+        textpage: Optional already extracted ``TextPage`` of the page.
+
+    Returns:
+        Markdown representation of the page content.
+    """
+    tables = page.find_tables().tables
+    table_rects = [fitz.Rect(table.bbox) for table in tables]
+
+    blocks = [block for block in page.get_text("dict", sort=True, textpage=textpage)["blocks"] if block.get("type") == 0]
+    lines = [line for block in blocks for line in block.get("lines", []) if _line_text(line)]
+    body_size = _body_font_size(lines)
+    levels = _heading_levels(lines, body_size)
+
+    # (y position, markdown chunk) so that tables land between the surrounding text blocks
+    chunks: list[tuple[float, str]] = [(table.bbox[1], table.to_markdown().strip()) for table in tables]
+    for block in blocks:
+        if any(_inside(block["bbox"], rect) for rect in table_rects):
+            continue
+        formatted = [_format_line(line, body_size, levels) for line in block.get("lines", []) if _line_text(line)]
+        if formatted:
+            chunks.append((block["bbox"][1], "\n".join(formatted)))
+
+    chunks.sort(key=lambda chunk: chunk[0])
+    return "\n\n".join(chunk for _, chunk in chunks)
+
+
+def convert_text_layer(file_path: str, assessment: dict[str, Any], session: DocumentSession | None = None) -> TextLayerConversion:
+    """
+    Convert all pages that pass the text-layer quality checks and have a single text column to markdown.
+
+    Args:
+        file_path: Local path to the PDF document.
+        assessment: Assessment dictionary returned by ``assess_doc_quality`` for the same file.
+        session: Optional open session on the same PDF, reusing its parsed pages.
+
+    Returns:
+        TextLayerConversion with markdown for strong pages and ``None`` for weak pages.
+    """
+    page_details: list[dict[str, Any]] = assessment["content_analysis"]["page_details"]
+    if assessment["file_info"].get("is_encrypted"):
+        return TextLayerConversion(pages=[None] * len(page_details))
+
+    own_session = session is None
+    session = DocumentSession(file_path) if session is None else session
+    try:
+        pages: list[str | None] = [
+            page_to_markdown(session.page(idx), session.text_page(idx)) if is_strong_page(page_info, profile_page(session.page(idx), session.text_page(idx))) else None
+            for idx, page_info in enumerate(page_details)
+        ]
+    finally:
+        if own_session:
+            session.close()
+
+    conversion = TextLayerConversion(pages=pages)
+    logger.info(f"Text layer converted {len(pages) - len(conversion.weak_pages)}/{len(pages)} pages of {file_path}")
+    return conversion
@@ -0,0 +1,81 @@
+import contextlib
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from doc_redaction.utils.commons import CacheStats, atomic_write
+
+DEFAULT_MAX_ENTRIES: int = 4096
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex digest of a string's UTF-8 bytes."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class TokenCountCache:
+    """
+    Token counts keyed by model id and content hash.
+
+    Counts are kept in an in-memory LRU of ``max_entries`` entries. With a ``cache_dir`` they are
+    also persisted as one small file per key, so repeated prompts and document sections are counted
+    once across runs. The cache is safe to share between threads.
+
+    Args:
+        max_entries: Capacity of the in-memory LRU.
+        cache_dir: Optional directory of the on-disk cache, e.g. ``data/cache/tokens/``.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.stats = CacheStats()
+        self._entries: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, model: str, digest: str) -> Path | None:
+        """Return the on-disk file of an entry, or None without a cache directory."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / model.replace(":", "_") / digest[:2] / digest
+
+    def get(self, model: str, digest: str) -> int | None:
+        """Return the cached token count or None on a miss."""
+        key = (model, digest)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return self._entries[key]
+
+        entry = self.path(model, digest)
+        tokens: int | None = None
+        if entry is not None:
+            with contextlib.suppress(FileNotFoundError, ValueError):
+                tokens = int(entry.read_text())
+
+        with self._lock:
+            if tokens is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._remember(key, tokens)
+        return tokens
+
+    def put(self, model: str, digest: str, tokens: int) -> None:
+        """Store a token count in memory and, if configured, on disk."""
+        with self._lock:
+            self._remember((model, digest), tokens)
+
+        entry = self.path(model, digest)
+        if entry is None:
+            return
+        atomic_write(entry, str(tokens).encode("utf-8"))
+
+    def _remember(self, key: tuple[str, str], tokens: int) -> None:
+        self._entries[key] = tokens
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
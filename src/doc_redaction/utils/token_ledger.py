@@ -0,0 +1,229 @@
+import datetime
+import sqlite3
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from loguru import logger
+
+from doc_redaction.utils.commons import Dir, Format, InvalidLedgerGroupingError, Prefix
+
+DEFAULT_BATCH_SIZE: int = 500
+LEDGER_GROUPINGS: dict[str, str] = {"day": "day", "model": "model_id", "document": "document_key", "stage": "stage"}
+
+
+@dataclass
+class LedgerRow:
+    """Token usage of one graph node in one workflow run.
+
+    Attributes:
+        run_id: Identifier shared by all nodes of a run.
+        document_key: Key of the processed document.
+        stage: Graph node name, e.g. "detector_result".
+        model_id: Bedrock model id of the node's agent.
+        input_tokens: Uncached input tokens.
+        output_tokens: Output tokens.
+        cache_read_tokens: Input tokens read from the prompt cache.
+        cache_write_tokens: Input tokens written to the prompt cache.
+        input_cost: Cost of the input tokens.
+        output_cost: Cost of the output tokens.
+        cache_cost: Cost of the cache read and write tokens.
+        latency_ms: Model latency of the node.
+        timestamp: UTC timestamp in ISO format.
+    """
+
+    run_id: str
+    document_key: str
+    stage: str
+    model_id: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    input_cost: float = 0.0
+    output_cost: float = 0.0
+    cache_cost: float = 0.0
+    latency_ms: int = 0
+    timestamp: str = field(default_factory=lambda: datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"))
+
+    @property
+    def day(self) -> str:
+        return self.timestamp[:10]
+
+
+_FIELDS: tuple[str, ...] = tuple(column.name for column in fields(LedgerRow))
+_COLUMNS: tuple[str, ...] = (*_FIELDS, "day")
+_GROUP_COLUMNS: tuple[str, ...] = ("day", "model_id", "document_key", "stage")
+_SUM_COLUMNS: tuple[str, ...] = ("calls", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens", "costs", "latency_ms")
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS token_usage (
+    run_id TEXT NOT NULL,
+    document_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cache_read_tokens INTEGER NOT NULL,
+    cache_write_tokens INTEGER NOT NULL,
+    input_cost REAL NOT NULL,
+    output_cost REAL NOT NULL,
+    cache_cost REAL NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS token_usage_day ON token_usage (day);
+CREATE TABLE IF NOT EXISTS token_usage_daily (
+    day TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    document_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cache_read_tokens INTEGER NOT NULL,
+    cache_write_tokens INTEGER NOT NULL,
+    costs REAL NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    PRIMARY KEY (day, model_id, document_key, stage)
+);
+"""
+
+
+class TokenLedger:
+    """
+    Append-only SQLite ledger of token usage and costs, one row per graph node per run.
+
+    Rows are buffered and written in a single transaction once ``batch_size`` rows are pending, on
+    ``flush`` or when the context manager exits. The same transaction adds the batch to a rollup table
+    with one row per day, model, document and stage, which the aggregations read instead of the raw
+    rows, so reports stay fast over millions of rows. The database is opened on first use in WAL mode,
+    so reports can read while a batch is running.
+
+    Args:
+        path: SQLite database file.
+        batch_size: Number of buffered rows that triggers a write.
+
+    Example:
+        with TokenLedger() as ledger:
+            ledger.record(LedgerRow(run_id="1", document_key="vertrag", stage="detector_result", model_id=MODEL_IDS["haiku"], input_tokens=1200))
+            ledger.aggregate(by="model")
+    """
+
+    def __init__(self, path: str = f"{Dir.Data}{Prefix.TOKEN}ledger{Format.SQLITE}", batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._pending: list[LedgerRow] = []
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "TokenLedger":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The SQLite connection. Creates the database and schema on first access."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def record(self, row: LedgerRow) -> None:
+        """Buffer a row and write the buffer once it reaches ``batch_size`` rows."""
+        self.record_many([row])
+
+    def record_many(self, rows: Iterable[LedgerRow]) -> None:
+        """Buffer rows and write the buffer once it reaches ``batch_size`` rows."""
+        with self._lock:
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered rows in one transaction. Returns the number of written rows."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if rows:
+                with self.connection:
+                    self.connection.executemany(
+                        f"INSERT INTO token_usage ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",  # noqa: S608 - fixed column names
+                        [(*(getattr(row, name) for name in _FIELDS), row.day) for row in rows],
+                    )
+                    self.connection.executemany(
+                        f"""
+                        INSERT INTO token_usage_daily ({", ".join(_GROUP_COLUMNS + _SUM_COLUMNS)}) VALUES ({", ".join("?" * (len(_GROUP_COLUMNS) + len(_SUM_COLUMNS)))})
+                        ON CONFLICT ({", ".join(_GROUP_COLUMNS)}) DO UPDATE SET {", ".join(f"{column} = {column} + excluded.{column}" for column in _SUM_COLUMNS)}
+                        """,  # noqa: S608 - fixed column names
+                        [(*group, *sums) for group, sums in _rollup(rows).items()],
+                    )
+        if rows:
+            logger.debug(f"Token ledger wrote {len(rows)} rows")
+        return len(rows)
+
+    def aggregate(self, by: str = "day", start: str | None = None, end: str | None = None) -> list[dict[str, Any]]:
+        """
+        Sum tokens, costs and latency per group.
+
+        Args:
+            by: One of LEDGER_GROUPINGS ("day", "model", "document" or "stage").
+            start: Optional first day (inclusive), formatted YYYY-MM-DD.
+            end: Optional last day (inclusive), formatted YYYY-MM-DD.
+
+        Returns:
+            One dict per group, ordered by group value, with the keys ``by``, calls, input_tokens,
+            output_tokens, cache_read_tokens, cache_write_tokens, costs and latency_ms.
+
+        Raises:
+            InvalidLedgerGroupingError: If by is not one of LEDGER_GROUPINGS.
+        """
+        if by not in LEDGER_GROUPINGS:
+            raise InvalidLedgerGroupingError(by, tuple(LEDGER_GROUPINGS))
+        self.flush()
+
+        column = LEDGER_GROUPINGS[by]
+        query = f"""
+            SELECT {column}, {", ".join(f"SUM({total})" for total in _SUM_COLUMNS)}
+            FROM token_usage_daily
+            WHERE day >= ? AND day <= ?
+            GROUP BY {column}
+            ORDER BY {column}
+        """  # noqa: S608 - column comes from LEDGER_GROUPINGS
+        with self._lock:
+            result = self.connection.execute(query, (start or "", end or "9999-12-31")).fetchall()
+
+        return [dict(zip((by, *_SUM_COLUMNS), values, strict=True)) for values in result]
+
+    def close(self) -> None:
+        """Write pending rows and close the database."""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _rollup(rows: list[LedgerRow]) -> dict[tuple[str, str, str, str], list[float]]:
+    totals: dict[tuple[str, str, str, str], list[float]] = defaultdict(lambda: [0] * len(_SUM_COLUMNS))
+    for row in rows:
+        group = totals[(row.day, row.model_id, row.document_key, row.stage)]
+        for index, value in enumerate((
+            1,
+            row.input_tokens,
+            row.output_tokens,
+            row.cache_read_tokens,
+            row.cache_write_tokens,
+            row.input_cost + row.output_cost + row.cache_cost,
+            row.latency_ms,
+        )):
+            group[index] += value
+    return totals
@@ -1,29 +1,60 @@
 import datetime
+import functools
 import json
-from typing import Any
+import math
+import random
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Protocol
 
 import boto3
+from botocore.exceptions import ClientError
+from loguru import logger
 
-from doc_redaction.agent import MODEL_IDS
-from doc_redaction.utils.commons import InvalidContentType
+from doc_redaction.agent import MODEL_IDS, ModelConfig, resolve_model_id
+from doc_redaction.utils.commons import InvalidContentType, InvalidTokenCountMethodError, UnpricedModelError
+from doc_redaction.utils.token_cache import TokenCountCache, content_hash
 
-bedrock_runtime = boto3.client("bedrock-runtime")
+INPUT_TYPES: tuple = ("inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens")
+TOKEN_COUNT_METHODS: tuple[str, ...] = ("exact", "estimate")
 
-INPUT_TYPES: tuple = ("inputTokens", "outputTokens")
+# Heuristic for Claude tokenizers: about 3.5 UTF-8 bytes per token, so umlauts and other non-ASCII
+# characters weigh more than plain ASCII; the overhead covers the message framing counted by Bedrock
+BYTES_PER_TOKEN: float = 3.5
+MESSAGE_OVERHEAD_TOKENS: int = 8
 
+COUNT_TOKENS_MAX_WORKERS: int = 8
+THROTTLING_ERRORS: frozenset[str] = frozenset({"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"})
+MAX_RETRIES: int = 5
+BACKOFF_SECONDS: float = 0.5
+
+# Exact counts of this process; repeated prompts and sections are only sent to Bedrock once
+TOKEN_CACHE: TokenCountCache = TokenCountCache()
+
+# Prompt cache pricing relative to the input rate: Anthropic models bill cache reads at 10% and cache
+# writes at 125% (5 minute TTL); Nova bills cache reads at 25% and cache writes at the input rate
 _COST_RATES: dict[str, float] = {
     "amazon.nova-lite-v1:0_inputTokens": 0.078 / 1_000_000,
     "amazon.nova-lite-v1:0_outputTokens": 0.0195 / 1_000_000,
+    "amazon.nova-lite-v1:0_cacheReadInputTokens": 0.0195 / 1_000_000,
+    "amazon.nova-lite-v1:0_cacheWriteInputTokens": 0.078 / 1_000_000,
     "anthropic.claude-haiku-4-5-20251001-v1:0_inputTokens": 0.25 / 1_000_000,
     "anthropic.claude-haiku-4-5-20251001-v1:0_outputTokens": 1.25 / 1_000_000,
+    "anthropic.claude-haiku-4-5-20251001-v1:0_cacheReadInputTokens": 0.025 / 1_000_000,
+    "anthropic.claude-haiku-4-5-20251001-v1:0_cacheWriteInputTokens": 0.3125 / 1_000_000,
     "anthropic.claude-sonnet-4-20250514-v1:0_inputTokens": 3.0 / 1_000_000,
     "anthropic.claude-sonnet-4-20250514-v1:0_outputTokens": 15.0 / 1_000_000,
+    "anthropic.claude-sonnet-4-20250514-v1:0_cacheReadInputTokens": 0.3 / 1_000_000,
+    "anthropic.claude-sonnet-4-20250514-v1:0_cacheWriteInputTokens": 3.75 / 1_000_000,
     "anthropic.claude-sonnet-4-5-20250929-v1:0_inputTokens": 3.3 / 1_000_000,
     "anthropic.claude-sonnet-4-5-20250929-v1:0_outputTokens": 16.5 / 1_000_000,
+    "anthropic.claude-sonnet-4-5-20250929-v1:0_cacheReadInputTokens": 0.33 / 1_000_000,
+    "anthropic.claude-sonnet-4-5-20250929-v1:0_cacheWriteInputTokens": 4.125 / 1_000_000,
 }
 
 
-def summarize_token_usage(all_agents_tokens: dict[str, dict[str, Any]]) -> str:
+def summarize_token_usage(all_agents_tokens: dict[str, dict[str, Any]], nodes: dict[str, dict[str, Any]] | None = None) -> str:
     totals: dict[str, dict[str, Any]] = {}
 
     for token_type in INPUT_TYPES:
@@ -41,12 +72,64 @@ def summarize_token_usage(all_agents_tokens: dict[str, dict[str, Any]]) -> str:
         "costs": sum(v["total_costs"] for v in totals.values()),
     }
 
-    summary: dict[str, Any] = {"token_type": totals, "grand_total": grand_totals}
+    summary: dict[str, Any] = {"token_type": totals, "grand_total": grand_totals, "cache_hit_rate": cache_hit_rate(totals)}
+    if nodes is not None:
+        summary["nodes"] = nodes
 
     return json.dumps(summary)
 
 
-def token_usage(content: str | dict[str, Any], model: str = MODEL_IDS["default"], token_type: str = "outputTokens") -> dict[str, dict[str, Any]]:
+def cache_hit_rate(totals: dict[str, dict[str, Any]]) -> float:
+    """
+    Share of prompt tokens served from the prompt cache.
+
+    Bedrock reports ``inputTokens`` without the cached tokens, so the prompt size is the sum of the
+    uncached, cache-read and cache-write tokens.
+
+    Args:
+        totals: Token totals per token type as built by ``summarize_token_usage``.
+
+    Returns:
+        Cache read tokens divided by all prompt tokens, 0.0 without prompt tokens.
+    """
+    prompt_tokens = sum(totals.get(token_type, {}).get("total_tokens", 0) for token_type in ("inputTokens", "cacheReadInputTokens", "cacheWriteInputTokens"))
+    return totals.get("cacheReadInputTokens", {}).get("total_tokens", 0) / prompt_tokens if prompt_tokens else 0.0
+
+
+class CountTokensClient(Protocol):
+    """The part of the Bedrock runtime client used to count tokens, so a local stub can stand in for it."""
+
+    def count_tokens(self, **kwargs: Any) -> dict[str, Any]: ...
+
+
+@functools.cache
+def bedrock_runtime() -> CountTokensClient:
+    """Return the Bedrock runtime client, created on first use so importing this module needs no AWS session."""
+    return boto3.client("bedrock-runtime")
+
+
+def estimate_tokens(content: str) -> int:
+    """
+    Estimate the token count of a string locally, without a network call.
+
+    Args:
+        content: Text to estimate.
+
+    Returns:
+        Estimated number of input tokens of a single user message with this content.
+
+    Example:
+        estimate_tokens("Vertrag zwischen Spielbank und Rocketbase")
+    """
+    return math.ceil(len(content.encode("utf-8")) / BYTES_PER_TOKEN) + MESSAGE_OVERHEAD_TOKENS
+
+
+def token_usage(
+    content: str | dict[str, Any],
+    model: str = MODEL_IDS["default"],
+    token_type: str = "outputTokens",
+    method: str = "exact",
+) -> dict[str, dict[str, Any]]:
     """Calculate token usage for the entire workflow."""
 
     if isinstance(content, str):
@@ -59,9 +142,10 @@ def token_usage(content: str | dict[str, Any], model: str = MODEL_IDS["default"]
             content=tokens,
             token_type=input_type,
             model=model,
+            method=method,
         )
         for input_type, tokens in content.items()
-        if input_type in ["inputTokens", "outputTokens"]
+        if input_type in INPUT_TYPES
     }
 
     return token_usage
@@ -71,18 +155,20 @@ def count_tokens(
     content: str | int,
     model: str = MODEL_IDS["default"],
     token_type: str = "outputTokens",
+    method: str = "exact",
 ) -> dict[str, Any]:
     """
     Count tokens for model input and estimate cost using Bedrock.
 
-    If content is a string, constructs an Anthropic-style Bedrock request and calls
-    bedrock_runtime.count_tokens. If content is an integer, it is treated as a
-    precomputed token count.
+    If content is a string, the "exact" method constructs an Anthropic-style Bedrock request and
+    calls the count_tokens API, the "estimate" method uses ``estimate_tokens`` without any network
+    call. If content is an integer, it is treated as a precomputed token count.
 
     Args:
         content: User content to tokenize (str) or a precomputed token count (int).
         model: Model id from MODEL_IDS to use for counting.
         token_type: Pricing category to apply when computing cost, either "input" or "output".
+        method: One of TOKEN_COUNT_METHODS.
 
     Returns:
         A dict containing:
@@ -90,22 +176,25 @@ def count_tokens(
             - model_id: The model id used.
             - tokens: The total token count.
             - costs: Estimated cost for the given model and token_type.
+
+    Raises:
+        InvalidTokenCountMethodError: If method is not one of TOKEN_COUNT_METHODS.
+        InvalidContentType: If content is neither str nor int.
+
     Example:
         agent_output_in = count_tokens(content=convert_result.metrics.accumulated_usage["inputTokens"])
         agent_output_out = count_tokens(content=convert_result.metrics.accumulated_usage["outputTokens"])
         structured_output = count_tokens(content=detector_result, token_type="output")
+        estimated = count_tokens(content=markdown, token_type="inputTokens", method="estimate")
     """
+    if method not in TOKEN_COUNT_METHODS:
+        raise InvalidTokenCountMethodError(method, TOKEN_COUNT_METHODS)
 
-    if isinstance(content, str):
-        input_to_count = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 500,
-            "messages": [{"role": "user", "content": content}],
-        })
-
-        response: dict[str, Any] = bedrock_runtime.count_tokens(modelId=model.removeprefix("eu."), input={"invokeModel": {"body": input_to_count}})
+    if isinstance(content, str) and method == "estimate":
+        tokens: int = estimate_tokens(content)
 
-        tokens: int = response["inputTokens"]
+    elif isinstance(content, str):
+        tokens: int = count_tokens_many([content], model=model, max_workers=1)[0]
 
     elif isinstance(content, int):
         tokens: int = content
@@ -128,6 +217,116 @@ def count_tokens(
     return result
 
 
+def count_tokens_many(
+    contents: Sequence[str],
+    model: str = MODEL_IDS["default"],
+    method: str = "exact",
+    max_workers: int = COUNT_TOKENS_MAX_WORKERS,
+    cache: TokenCountCache | None = None,
+    client: CountTokensClient | None = None,
+) -> list[int]:
+    """
+    Count the tokens of many strings with as few Bedrock requests as possible.
+
+    Inputs are deduplicated and looked up in the cache first. The remaining strings are counted
+    concurrently on a bounded thread pool; throttled requests are retried with exponential backoff.
+
+    Args:
+        contents: Strings to count.
+        model: Model id from MODEL_IDS to use for counting.
+        method: One of TOKEN_COUNT_METHODS. "estimate" never calls Bedrock.
+        max_workers: Maximum number of concurrent count_tokens requests.
+        cache: Token count cache. Defaults to the process-wide TOKEN_CACHE.
+        client: Bedrock runtime client, e.g. a stub in tests. Defaults to ``bedrock_runtime()``.
+
+    Returns:
+        Token counts in the order of contents.
+
+    Raises:
+        InvalidTokenCountMethodError: If method is not one of TOKEN_COUNT_METHODS.
+        ClientError: If a request fails for another reason than throttling or runs out of retries.
+
+    Example:
+        counts = count_tokens_many(sections, model=MODEL_IDS["haiku"])
+    """
+    if method not in TOKEN_COUNT_METHODS:
+        raise InvalidTokenCountMethodError(method, TOKEN_COUNT_METHODS)
+    if method == "estimate":
+        return [estimate_tokens(content) for content in contents]
+
+    cache = TOKEN_CACHE if cache is None else cache
+    digests: list[str] = [content_hash(content) for content in contents]
+    counts: dict[str, int] = {}
+    pending: dict[str, str] = {}
+    for digest, content in zip(digests, contents, strict=True):
+        if digest in counts or digest in pending:
+            continue
+        cached = cache.get(model, digest)
+        if cached is None:
+            pending[digest] = content
+        else:
+            counts[digest] = cached
+
+    if pending:
+        client = bedrock_runtime() if client is None else client
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            for digest, tokens in zip(pending, executor.map(lambda content: _request_tokens(client, model, content), pending.values()), strict=True):
+                counts[digest] = tokens
+                cache.put(model, digest, tokens)
+        logger.info(f"Counted tokens of {len(pending)} strings with Bedrock, {len(contents) - len(pending)} served from cache or duplicates")
+
+    return [counts[digest] for digest in digests]
+
+
+def _request_tokens(client: CountTokensClient, model: str, content: str) -> int:
+    input_to_count = json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 500,
+        "messages": [{"role": "user", "content": content}],
+    })
+
+    attempt = 0
+    while True:
+        try:
+            response: dict[str, Any] = client.count_tokens(modelId=model.removeprefix("eu."), input={"invokeModel": {"body": input_to_count}})
+            return response["inputTokens"]
+        except ClientError as err:
+            if err.response.get("Error", {}).get("Code") not in THROTTLING_ERRORS or attempt >= MAX_RETRIES:
+                raise
+        # full jitter keeps concurrent workers from retrying in lockstep
+        delay = random.uniform(0, BACKOFF_SECONDS * 2**attempt)  # noqa: S311 - backoff jitter, not cryptography
+        logger.warning(f"count_tokens throttled, retrying in {delay:.2f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+def is_priced(model_id: str) -> bool:
+    """Return whether token costs of a Bedrock model id or MODEL_IDS key can be calculated."""
+    return all(f"{resolve_model_id(model_id).removeprefix('eu.')}_{token_type}" in _COST_RATES for token_type in INPUT_TYPES)
+
+
+def check_model_pricing(routing: dict[str, ModelConfig]) -> dict[str, ModelConfig]:
+    """
+    Make sure every routed model has token cost rates, before any model call.
+
+    The token summary, the ledger and the preflight estimate price every call, so an unpriced model
+    would only fail after the model calls were paid for.
+
+    Args:
+        routing: ModelConfig per graph stage, e.g. from ``load_model_routing``.
+
+    Returns:
+        The unchanged routing.
+
+    Raises:
+        UnpricedModelError: If a stage is routed to a model without cost rates.
+    """
+    for stage, config in routing.items():
+        if not is_priced(config.model_id):
+            raise UnpricedModelError(stage, config.model_id)
+    return routing
+
+
 def _calculate_token_cost(token: int, model: str = MODEL_IDS["default"], token_type: str = "outputTokens") -> float:
     """
     Estimate the token cost for a given model and token type using per‑million token rates.
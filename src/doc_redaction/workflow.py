@@ -1,141 +1,505 @@
+import atexit
+import json
+import uuid
+from dataclasses import replace
+from pathlib import Path
 from typing import Any
 
 import typer
 from loguru import logger
 from strands import Agent
+from strands.agent import AgentResult
 from strands.multiagent import GraphBuilder
-from strands.multiagent.graph import Graph, GraphResult
-from strands_tools import current_time, image_reader
+from strands.multiagent.base import Status
+from strands.multiagent.graph import GraphResult
+from strands.types.content import ContentBlock
+from strands_tools import current_time
 
-from doc_redaction.agent import MODEL_IDS, create_agent
+from doc_redaction.agent import STAGE_MODELS, ModelConfig, create_agent, create_model, load_model_routing, resolve_model_id
 from doc_redaction.output import SensitiveData
 from doc_redaction.promt import (
-    CONVERTER_SYSTEM_PROMPT,
     DETECTION_SYSTEM_PROMPT,
     REDACTED_SYSTEM_PROMPT,
+    WORKFLOW_TASK_PROMPT,
 )
 from doc_redaction.tool.detect_sensitive_data import detect_sensitive_data
 from doc_redaction.tool.redact_sensitive_data import redact_sensitive_data
 from doc_redaction.tool.tool_utils import omit_empty_keys, remove_temp_files, save_file
-from doc_redaction.utils.commons import Dir, Format, InvalidDocumentKeyError, Prefix, save_as_json
-from doc_redaction.utils.doc_assessment import assess_doc_quality
+from doc_redaction.utils.assessment_cache import AssessmentCache, cached_assess_doc_quality
+from doc_redaction.utils.checkpoint import Checkpoint
+from doc_redaction.utils.commons import Dir, Format, InvalidDocumentKeyError, InvalidWorkflowModeError, Prefix, UnconvertedPagesError, save_as_json
+from doc_redaction.utils.doc_assessment import ASSESSMENT_VERSION
 from doc_redaction.utils.doc_reader import merge_markdown_strings, pdf_to_png
-from doc_redaction.utils.token_tracker import summarize_token_usage, token_usage
+from doc_redaction.utils.doc_session import DocumentSession
+from doc_redaction.utils.graph_pool import GraphPool, WorkflowGraph
+from doc_redaction.utils.layout_profile import is_text_layer_layout, profile_layout, render_clip
+from doc_redaction.utils.local_redaction import redact_locally
+from doc_redaction.utils.node_metrics import NodeMetrics, collect_node_metrics
+from doc_redaction.utils.ocr import OCR_CONFIDENCE_THRESHOLD, ocr_pages
+from doc_redaction.utils.page_conversion import DEFAULT_PAGES_PER_REQUEST, PageConversion, convert_pages
+from doc_redaction.utils.page_dedup import DedupPlan, PageHashIndex, plan_page_dedup
+from doc_redaction.utils.preflight import BudgetRouter, RoutingDecision, preflight
+from doc_redaction.utils.render_cache import RenderCache
+from doc_redaction.utils.response_cache import configure_response_cache
+from doc_redaction.utils.text_layer import TextLayerConversion, convert_text_layer
+from doc_redaction.utils.token_ledger import LedgerRow, TokenLedger
+from doc_redaction.utils.token_tracker import check_model_pricing, summarize_token_usage, token_usage
 
+WORKFLOW_MODES: tuple[str, ...] = ("agent", "local")
+QUALITY_CONFIG: dict[str, Any] = {"assessment_version": ASSESSMENT_VERSION}
 
-def run_doc_processing_wf(key: str = "spielbank_rocketbase_vertrag") -> tuple[dict[str, Any], GraphResult, str]:
+# Markdown of locally converted pages, reused for identical pages of later documents in the same process
+PAGE_INDEX: PageHashIndex = PageHashIndex()
+RENDER_CACHE: RenderCache = RenderCache()
+ASSESSMENT_CACHE: AssessmentCache = AssessmentCache()
+# Usage rows are buffered across runs and written in batches; pending rows are written at interpreter exit
+TOKEN_LEDGER: TokenLedger = TokenLedger()
+atexit.register(TOKEN_LEDGER.close)
+
+# Static part of the task prompt; the schema is serialised deterministically so the prefix is byte-identical across documents
+TASK_PREFIX: str = WORKFLOW_TASK_PROMPT.format(schema=json.dumps(SensitiveData.model_json_schema(), sort_keys=True))
+
+
+def run_doc_processing_wf(
+    key: str = "spielbank_rocketbase_vertrag",
+    router: BudgetRouter | None = None,
+    routing: dict[str, ModelConfig] | None = None,
+    mode: str = "agent",
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    from_stage: str | None = None,
+) -> tuple[dict[str, Any], GraphResult | None, str]:
     """
     Run the document processing workflow for a given document key.
+
+    Every agent gets its own model, configured per graph stage by routing (defaults to STAGE_MODELS).
+    With a router, the document's cost is predicted from its assessment before any model call and the
+    stage models are downgraded to fit the router's budgets; documents that do not fit raise BudgetExceededError.
+    A re-run that skips every stage using a model makes no prediction and reserves no budget.
+
+    Pages that neither the text layer nor OCR can convert are sent to the vision model in parallel calls of up
+    to pages_per_request pages, fewer for complex pages; the graph then only detects and redacts the merged markdown.
+
+    In "local" mode sensitive data is detected with the regex detectors and redacted locally instead of by the
+    detector and redactor agents. Only the conversion of pages without a usable text layer calls a model and
+    no graph runs; the graph result is None then.
+
+    Every stage (see PIPELINE_STAGES) is checkpointed: a re-run of an unchanged document with unchanged stage
+    settings skips the completed stages, e.g. a failed redaction does not repeat the vision conversion.
+    from_stage forces recomputation from that stage on. The graph result is None if the graph was skipped.
+
+    Raises:
+        InvalidDocumentKeyError: If key is empty.
+        InvalidWorkflowModeError: If mode is not one of WORKFLOW_MODES.
+        InvalidPipelineStageError: If from_stage is not one of PIPELINE_STAGES.
+        UnpricedModelError: If routing assigns a model without token cost rates.
     """
     if not isinstance(key, str) or not key:
         raise InvalidDocumentKeyError()
+    if mode not in WORKFLOW_MODES:
+        raise InvalidWorkflowModeError(mode, WORKFLOW_MODES)
 
     # Step 0: Assess document quality
     DOC_QUALITY_IN: str = f"{Dir.Data}{Prefix.CONTRACT}{key}{Format.PDF}"
     DOC_QUALITY_OUT: str = f"{Dir.Data}{Prefix.QUALITY}{key}{Format.JSON}"
-    doc_quality: dict[str, Any] = assess_doc_quality(
-        file_path=DOC_QUALITY_IN,
-        output_path=DOC_QUALITY_OUT,
-    )
-
-    # Step 1: Convert input contract from PDF to markdwon format using vision model Agent
-    multimodal_agent: Agent = create_agent(
-        name="multimodal_agent",
-        system_prompt=CONVERTER_SYSTEM_PROMPT,
-        tools=[
-            image_reader,
-            merge_markdown_strings,
-            save_file,
-            remove_temp_files,
-        ],
-    )
-
-    CONVERT_IN: list[str] = pdf_to_png(
-        pdf_path=f"{Dir.Data}{Prefix.CONTRACT}{key}{Format.PDF}",
-        output_dir=f"{Dir.Data}{Prefix.TEMP}",
-    )
     CONVERT_OUT: str = f"{Dir.Data}{Prefix.MARKDOWN}{key}{Format.MD}"
+    # Rendered pages go to a directory per document, so concurrent runs never remove each other's images
+    TEMP_DIR: str = f"{Dir.Data}{Prefix.TEMP}{key}/"
 
-    # Step 2: Detect sensitve information Agent
+    # Stage outputs are checkpointed per PDF content hash, a re-run resumes after the last valid stage
+    PAGES_OUT: str = f"{Dir.Data}{Prefix.CHECKPOINT}{key}_pages{Format.JSON}"
     DETECT_OUT: str = f"{Dir.Data}{Prefix.CONFIDENTIAL}{key}{Format.JSON}"
-    detector_agent: Agent = create_agent(
-        name="detector_agent",
-        system_prompt=DETECTION_SYSTEM_PROMPT,
-        tools=[
-            current_time,
-            detect_sensitive_data,
-            omit_empty_keys,
-        ],
-        output_model=SensitiveData,
-    )
-    detector_agent.model.update_config(model_id=MODEL_IDS["haiku"])
-
-    # Step 3: Redact sensitive information Agent
     REDACT_OUT: str = f"{Dir.Data}{Prefix.REDACT}{key}{Format.MD}"
 
-    redact_agent: Agent = create_agent(
-        name="redact_agent",
-        system_prompt=REDACTED_SYSTEM_PROMPT,
-        tools=[save_file, redact_sensitive_data],
-    )
-    redact_agent.model.update_config(model_id=MODEL_IDS["haiku"])
+    # The PDF is parsed once and shared by assessment, text-layer conversion, dedup and rendering.
+    # Unchanged documents reuse their cached assessment; the PDF is not opened at all if every stage is skipped.
+    with DocumentSession(DOC_QUALITY_IN) as session:
+        checkpoint: Checkpoint = Checkpoint(key, session.sha256, from_stage=from_stage)
+        if checkpoint.skip("quality", QUALITY_CONFIG):
+            doc_quality: dict[str, Any] = json.loads(Path(DOC_QUALITY_OUT).read_text(encoding="utf-8"))
+        else:
+            doc_quality = cached_assess_doc_quality(
+                file_path=DOC_QUALITY_IN,
+                output_path=DOC_QUALITY_OUT,
+                session=session,
+                cache=ASSESSMENT_CACHE,
+            )
+            checkpoint.complete("quality", QUALITY_CONFIG, [DOC_QUALITY_OUT])
 
-    # Step 4: Build and run workflow graph
-    builder: GraphBuilder = GraphBuilder()
+        models: dict[str, ModelConfig] = check_model_pricing(dict(routing or STAGE_MODELS))
+        # A re-run whose model stages are all checkpointed with the routed models calls no model and reserves no budget
+        routed_configs: dict[str, dict[str, Any]] = stage_configs(models, mode, pages_per_request)
+        skippable: list[str] = checkpoint.skippable_stages(routed_configs)
+        needs_model: bool = any(config.get("model") is not None for stage, config in routed_configs.items() if stage not in skippable)
+        # The routing config applies unless the budget forced a cheaper model on a stage
+        decision: RoutingDecision | None = preflight(DOC_QUALITY_IN, router, doc_quality, models) if router is not None and needs_model else None
+        for stage, model_id in (decision.models if decision is not None else {}).items():
+            if model_id != resolve_model_id(models[stage].model_id):
+                models[stage] = replace(models[stage], model_id=model_id)
+        configs: dict[str, dict[str, Any]] = stage_configs(models, mode, pages_per_request)
+
+        # Step 1: Convert pages with a usable text layer directly, OCR the weak pages locally and send only
+        # low-confidence pages to the vision model
+        if checkpoint.skip("render", configs["render"]):
+            pages, vision_indices, duplicates, digests = _load_local_pages(PAGES_OUT)
+            # Rendered images are not checkpointed, they come back from the render cache if still needed
+            rerender: bool = bool(vision_indices) and not checkpoint.skip("markdown", configs["markdown"])
+            vision_pages: dict[int, str] = _render_pages(session, vision_indices, TEMP_DIR) if rerender else {}
+        else:
+            conversion: TextLayerConversion = convert_text_layer(file_path=DOC_QUALITY_IN, assessment=doc_quality, session=session)
+            vision_pages, duplicates, digests = _convert_locally(session, conversion, TEMP_DIR)
+            pages = conversion.pages
+            _save_local_pages(PAGES_OUT, pages, list(vision_pages), duplicates, digests)
+            checkpoint.complete("render", configs["render"], [PAGES_OUT])
+
+    metrics: dict[str, NodeMetrics] = {}
+    if checkpoint.skip("markdown", configs["markdown"]):
+        markdown: str = Path(CONVERT_OUT).read_text(encoding="utf-8")
+    else:
+        # Step 1b: Convert the remaining pages with parallel vision model calls, sized by the pages' complexity
+        if vision_pages:
+            page_conversion: PageConversion = convert_pages(
+                vision_pages,
+                config=models["convert_result"],
+                pages_per_request=pages_per_request,
+                page_details=doc_quality["content_analysis"]["page_details"],
+            )
+            for page_index, page_markdown in page_conversion.pages.items():
+                pages[page_index] = page_markdown
+                # Later documents reuse the markdown of identical pages instead of converting them again
+                if page_index in digests:
+                    PAGE_INDEX.add(digests[page_index], page_markdown)
+            for page_index, representative in duplicates.items():
+                pages[page_index] = pages[representative]
+            metrics["convert_result"] = page_conversion.metrics
 
-    builder.add_node(multimodal_agent, "convert_result")
-    builder.add_node(detector_agent, "detector_result")
-    builder.add_node(redact_agent, "redact_result")
+        markdown = merge_markdown_strings(pages=_converted_pages(pages), output_file=f"{Dir.Data}{Prefix.MARKDOWN}{key}")
+        save_file(data=markdown, filename=CONVERT_OUT)
+        checkpoint.complete("markdown", configs["markdown"], [CONVERT_OUT])
+    if Path(TEMP_DIR).exists():
+        remove_temp_files(path=TEMP_DIR)
+
+    # Step 2 and 3: Detect and redact sensitive information. The graph runs both stages, so a missing
+    # redaction also repeats the detection.
+    result: GraphResult | None = None
+    if checkpoint.skip("confidential", configs["confidential"]) and checkpoint.skip("redact", configs["redact"]):
+        logger.info(f"Detection and redaction of {key} are up to date")
+    elif mode == "agent":
+        convert_task: str = f"The document was converted and saved to {CONVERT_OUT}. Its markdown content is:\n\n{markdown}\n"
+        user_prompt: list[ContentBlock] = build_task_prompt(convert_task=convert_task, detect_out=DETECT_OUT, redact_out=REDACT_OUT)
+
+        # Step 4: Run the workflow graph on a pooled graph with the same models
+        with GRAPH_POOL.lease(graph_key(models)) as workflow_graph:
+            result = workflow_graph.graph(user_prompt)
+            # Step 5: Summarize token usage and timing per graph node
+            metrics.update(collect_node_metrics(workflow_graph.agents, result.results))
+
+        logger.info(f"Workflow status: {result.status.value}")
+        logger.info(f"Total token usage: {result.accumulated_usage}")
+        _checkpoint_graph_outputs(result, checkpoint, configs, DETECT_OUT, REDACT_OUT)
+    else:
+        sensitive_data, redacted = redact_locally(markdown, key)
+        save_as_json(data=sensitive_data.model_dump_json(indent=2), filename=DETECT_OUT)
+        checkpoint.complete("confidential", configs["confidential"], [DETECT_OUT])
+        save_file(data=redacted, filename=REDACT_OUT)
+        checkpoint.complete("redact", configs["redact"], [REDACT_OUT])
+
+    token_summary: str = _save_token_usage(key, metrics)
+
+    return doc_quality, result, token_summary
 
-    builder.add_edge("convert_result", "detector_result")
-    builder.add_edge("convert_result", "redact_result")
+
+def build_workflow_graph(models: dict[str, ModelConfig]) -> WorkflowGraph:
+    """
+    Build the detector and redactor agents and the graph of the workflow.
+
+    Args:
+        models: Model settings per graph stage.
+
+    Returns:
+        WorkflowGraph with the agents keyed by graph node name.
+    """
+    nodes: dict[str, Agent] = {
+        "detector_result": create_agent(
+            name="detector_agent",
+            system_prompt=DETECTION_SYSTEM_PROMPT,
+            model=create_model(models["detector_result"]),
+            tools=[
+                current_time,
+                detect_sensitive_data,
+                omit_empty_keys,
+            ],
+            output_model=SensitiveData,
+        ),
+        "redact_result": create_agent(
+            name="redact_agent",
+            system_prompt=REDACTED_SYSTEM_PROMPT,
+            model=create_model(models["redact_result"]),
+            tools=[save_file, redact_sensitive_data],
+        ),
+    }
+
+    builder: GraphBuilder = GraphBuilder()
+    for node, agent in nodes.items():
+        builder.add_node(agent, node)
     builder.add_edge("detector_result", "redact_result")
+    builder.set_entry_point("detector_result")
 
-    builder.set_entry_point("convert_result")
     builder.set_execution_timeout(300)
-    graph: Graph = builder.build()
+    return WorkflowGraph(graph=builder.build(), agents=nodes)
+
+
+GRAPH_STAGES: tuple[str, ...] = ("detector_result", "redact_result")
+GraphKey = tuple[tuple[str, ModelConfig], ...]
 
-    user_prompt: str = f"""
-    1. Convert the following list of images to a single markdown: {CONVERT_IN}. Save the result to {CONVERT_OUT}.
-    2. Detect sensitive data. Return the results as structured_output as defined in {SensitiveData} schema. Save the result to {DETECT_OUT}.
-    3. Redact all information provided in detector_result except for the document_analysis field. Save the result to {REDACT_OUT}.
+
+def graph_key(models: dict[str, ModelConfig]) -> GraphKey:
+    """Pool key of a workflow graph: the models of its stages. The conversion model does not affect the graph."""
+    return tuple((stage, models[stage]) for stage in GRAPH_STAGES)
+
+
+def _build_pooled_graph(key: GraphKey) -> WorkflowGraph:
+    return build_workflow_graph(dict(key))
+
+
+# Built agents and graphs are reset and reused for later documents with the same topology and models
+GRAPH_POOL: GraphPool[GraphKey] = GraphPool(factory=_build_pooled_graph)
+
+
+def build_task_prompt(convert_task: str, detect_out: str, redact_out: str) -> list[ContentBlock]:
     """
+    Build the graph task with the static instructions first, a cache point, and the per-document part last.
+
+    Args:
+        convert_task: Converted markdown of the document.
+        detect_out: Output path of the detection result.
+        redact_out: Output path of the redacted document.
 
-    result: GraphResult = graph(user_prompt)
+    Returns:
+        Content blocks of the task prompt.
+    """
+    document_task: str = f"""
+    Document section:
+    - Detection output file: {detect_out}
+    - Redaction output file: {redact_out}
+    - Conversion: {convert_task}
+    """
+    return [{"text": TASK_PREFIX}, {"cachePoint": {"type": "default"}}, {"text": document_task}]
 
-    logger.info(f"Workflow status: {result.status.value}")
-    logger.info(f"Total token usage: {result.accumulated_usage}")
 
-    # Step 5: Summarize token usage
-    agents: list[Agent] = [multimodal_agent, detector_agent, redact_agent]
-    token_summary: str = process_and_summarize_tokens(agents, result)
+def _checkpoint_graph_outputs(result: GraphResult, checkpoint: Checkpoint, configs: dict[str, dict[str, Any]], detect_out: str, redact_out: str) -> None:
+    """Save the detector's structured output and record the detection and redaction stages of a completed graph run."""
+    if result.status != Status.COMPLETED:
+        return
+    detector_result = result.results["detector_result"].result
+    if not isinstance(detector_result, AgentResult) or detector_result.structured_output is None:
+        return
+    save_as_json(data=detector_result.structured_output.model_dump_json(indent=2), filename=detect_out)
+    checkpoint.complete("confidential", configs["confidential"], [detect_out])
+    # The redactor saves its output with a tool call, it is missing if the agent skipped the call
+    if Path(redact_out).is_file():
+        checkpoint.complete("redact", configs["redact"], [redact_out])
+
+
+def stage_configs(models: dict[str, ModelConfig], mode: str, pages_per_request: int) -> dict[str, dict[str, Any]]:
+    """Settings each checkpointed stage output depends on, beyond the PDF and the outputs of earlier stages."""
+    return {
+        "quality": QUALITY_CONFIG,
+        "render": {"ocr_confidence_threshold": OCR_CONFIDENCE_THRESHOLD},
+        "markdown": {"model": models["convert_result"], "pages_per_request": pages_per_request},
+        "confidential": {"mode": mode, "model": models["detector_result"] if mode == "agent" else None},
+        "redact": {"mode": mode, "model": models["redact_result"] if mode == "agent" else None},
+    }
+
+
+def _save_local_pages(path: str, pages: list[str | None], vision_pages: list[int], duplicates: dict[int, int], digests: dict[int, str]) -> None:
+    data = {
+        "pages": pages,
+        "vision_pages": vision_pages,
+        "duplicates": {str(page): representative for page, representative in duplicates.items()},
+        "digests": {str(page): digest for page, digest in digests.items()},
+    }
+    save_as_json(data=json.dumps(data), filename=path)
+
+
+def _load_local_pages(path: str) -> tuple[list[str | None], list[int], dict[int, int], dict[int, str]]:
+    data: dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8"))
+    return (
+        data["pages"],
+        data["vision_pages"],
+        {int(page): representative for page, representative in data["duplicates"].items()},
+        # Checkpoints written before the digests were saved only skip the page index
+        {int(page): digest for page, digest in data.get("digests", {}).items()},
+    )
+
+
+def _converted_pages(pages: list[str | None]) -> list[str]:
+    missing: list[int] = [page_index for page_index, page in enumerate(pages) if page is None]
+    if missing:
+        raise UnconvertedPagesError(missing)
+    return [page or "" for page in pages]
+
+
+def _render_clips(session: DocumentSession, pages: list[int]) -> dict[int, tuple[float, float, float, float]]:
+    # Pages left to OCR or the vision model for their column layout have a full text layer, so only the text area is rendered
+    clips: dict[int, tuple[float, float, float, float]] = {}
+    for profile in profile_layout(session.file_path, pages=pages, session=session):
+        clip = None if is_text_layer_layout(profile) else render_clip(profile)
+        if clip is not None:
+            clips[profile.page_number - 1] = clip
+    return clips
+
+
+def _render_pages(session: DocumentSession, pages: list[int], temp_dir: str) -> dict[int, str]:
+    rendered: list[str] = pdf_to_png(pdf_path=session.file_path, output_dir=temp_dir, pages=pages, cache=RENDER_CACHE, session=session, clips=_render_clips(session, pages))
+    return dict(zip(pages, rendered, strict=True))
+
+
+def _convert_locally(session: DocumentSession, conversion: TextLayerConversion, temp_dir: str) -> tuple[dict[int, str], dict[int, int], dict[int, str]]:
+    """
+    Fill the weak pages of a text-layer conversion without calling a model.
+
+    Blank pages become empty pages, pages already seen in this batch reuse their markdown, unique pages are
+    rendered and OCR'd and duplicates reuse the markdown of their representative page.
+
+    Args:
+        session: Open session on the PDF document.
+        conversion: Text-layer conversion, updated in place.
+        temp_dir: Directory of the rendered page images.
+
+    Returns:
+        Rendered images of the pages that still need the vision model keyed by page index, the duplicate
+        pages whose representative is among them, and the digests of the vision pages, to index their
+        markdown in PAGE_INDEX once converted.
+    """
+    if conversion.is_complete:
+        return {}, {}, {}
+
+    dedup: DedupPlan = plan_page_dedup(session.file_path, pages=conversion.weak_pages, session=session)
+    for page_index in dedup.blank_pages:
+        conversion.pages[page_index] = ""
+    for page_index in dedup.unique_pages:
+        conversion.pages[page_index] = PAGE_INDEX.find(dedup.digests[page_index])
+
+    to_convert: list[int] = [page_index for page_index in dedup.unique_pages if conversion.pages[page_index] is None]
+    rendered: list[str] = (
+        pdf_to_png(
+            pdf_path=session.file_path,
+            output_dir=temp_dir,
+            pages=to_convert,
+            cache=RENDER_CACHE,
+            session=session,
+            clips=_render_clips(session, to_convert),
+        )
+        if to_convert
+        else []
+    )
+    logger.info(f"Render cache stats: {RENDER_CACHE.stats}")
+
+    vision_pages: dict[int, str] = {}
+    for page_index, image_path, ocr_page in zip(to_convert, rendered, ocr_pages(rendered), strict=True):
+        if ocr_page.confidence >= OCR_CONFIDENCE_THRESHOLD:
+            conversion.pages[page_index] = ocr_page.markdown
+            PAGE_INDEX.add(dedup.digests[page_index], ocr_page.markdown)
+        else:
+            vision_pages[page_index] = image_path
+
+    duplicates: dict[int, int] = {}
+    for page_index, representative in dedup.duplicates.items():
+        if conversion.pages[representative] is None:
+            duplicates[page_index] = representative
+        else:
+            conversion.pages[page_index] = conversion.pages[representative]
+
+    return vision_pages, duplicates, {page_index: dedup.digests[page_index] for page_index in vision_pages}
+
+
+def _save_token_usage(key: str, metrics: dict[str, NodeMetrics]) -> str:
+    """Save the token summary of a run and record its ledger rows; a run without model calls keeps the summary of the last run that made them."""
     TOKEN_SUMMARY_OUT: str = f"{Dir.Data}{Prefix.TOKEN}{key}{Format.JSON}"
+    if not metrics and Path(TOKEN_SUMMARY_OUT).is_file():
+        logger.info(f"No model stage ran, keeping the token summary {TOKEN_SUMMARY_OUT}")
+        return Path(TOKEN_SUMMARY_OUT).read_text(encoding="utf-8")
+
+    token_summary: str = process_and_summarize_tokens(metrics)
     save_as_json(data=token_summary, filename=TOKEN_SUMMARY_OUT)
+    TOKEN_LEDGER.record_many(ledger_rows(key, metrics))
+    return token_summary
 
-    return doc_quality, result, token_summary
+
+def ledger_rows(key: str, metrics: dict[str, NodeMetrics]) -> list[LedgerRow]:
+    """
+    Build one token ledger row per executed graph node of a run.
+
+    Args:
+        key: Document key of the run.
+        metrics: Per-node metrics of the run, keyed by graph node name.
+
+    Returns:
+        Ledger rows sharing a new run id.
+    """
+    run_id: str = uuid.uuid4().hex
+    rows: list[LedgerRow] = []
+    for node_name, node in metrics.items():
+        costs: dict[str, dict[str, Any]] = token_usage(content=node.usage, model=node.model_id)
+        rows.append(
+            LedgerRow(
+                run_id=run_id,
+                document_key=key,
+                stage=node_name,
+                model_id=node.model_id,
+                input_tokens=node.input_tokens,
+                output_tokens=node.output_tokens,
+                cache_read_tokens=node.cache_read_tokens,
+                cache_write_tokens=node.cache_write_tokens,
+                input_cost=costs.get("inputTokens", {}).get("costs", 0.0),
+                output_cost=costs.get("outputTokens", {}).get("costs", 0.0),
+                cache_cost=costs.get("cacheReadInputTokens", {}).get("costs", 0.0) + costs.get("cacheWriteInputTokens", {}).get("costs", 0.0),
+                latency_ms=node.model_latency_ms,
+            )
+        )
+    return rows
 
 
-def process_and_summarize_tokens(agents: list[Agent], result: Any) -> str:
+def process_and_summarize_tokens(metrics: dict[str, NodeMetrics]) -> str:
     """
-    Process token usage for all agents and return a summarized token usage string.
+    Process token usage for all graph nodes and return a summarized token usage string.
+
+    Usage is keyed by graph node, so nodes running on the same model are reported separately.
 
     Args:
-        agents: List of Agent objects used in the workflow
-        result: Graph execution result containing accumulated usage data
+        metrics: Per-node metrics of the run, keyed by graph node name.
 
     Returns:
-        str: JSON string with summarized token usage across all agents
+        str: JSON string with summarized token usage across all nodes and the metrics of each node
     """
 
-    all_agents_tokens: dict[str, dict[str, Any]] = {
-        agent.model.get_config()["model_id"]: token_usage(content=result.results[node_name].accumulated_usage, model=agent.model.get_config()["model_id"])
-        for agent, node_name in [(agents[0], "convert_result"), (agents[1], "detector_result"), (agents[2], "redact_result")]
-    }
+    all_agents_tokens: dict[str, dict[str, Any]] = {node_name: token_usage(content=node.usage, model=node.model_id) for node_name, node in metrics.items()}
 
-    result: str = summarize_token_usage(all_agents_tokens)
+    result: str = summarize_token_usage(all_agents_tokens, nodes={node_name: node.to_dict() for node_name, node in metrics.items()})
 
     return result
 
 
+def main(
+    key: str = "spielbank_rocketbase_vertrag",
+    document_budget: float | None = None,
+    routing: str | None = None,
+    mode: str = "agent",
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    from_stage: str | None = None,
+    response_cache: str = "off",
+) -> None:
+    """
+    Command line entry point; a document budget enables preflight model routing, routing is a JSON stage-to-model config.
+
+    Example:
+        python -m doc_redaction.workflow --key spielbank_rocketbase_vertrag --from-stage redact
+        python -m doc_redaction.workflow --key spielbank_rocketbase_vertrag --response-cache replay
+    """
+    configure_response_cache(response_cache)
+    router: BudgetRouter | None = BudgetRouter(document_budget=document_budget) if document_budget is not None else None
+    run_doc_processing_wf(key, router, load_model_routing(routing), mode, pages_per_request, from_stage)
+
+
 if __name__ == "__main__":
-    typer.run(run_doc_processing_wf)
+    typer.run(main)
@@ -6,7 +6,7 @@ from strands.models import BedrockModel
 from strands.models.ollama import OllamaModel
 from strands_tools import calculator, current_time, file_read, file_write
 
-from doc_redaction.agent import bedrock_model, create_agent
+from doc_redaction.agent import MODEL_IDS, STAGE_MODELS, ModelConfig, create_agent, create_model, load_model_routing
 from src.doc_redaction.utils.commons import MissingArgumentError
 
 
@@ -81,12 +81,23 @@ class TestCreateAgent:
     #         create_agent(system_prompt="")
 
     def test_create_agent_uses_default_model_when_none_provided(self):
-        """Test that the default bedrock_model is used when model is None."""
+        """Test that a default model is built when model is None."""
         system_prompt = "You are a default model assistant."
         agent = create_agent(system_prompt=system_prompt, model=None)
 
         assert isinstance(agent, Agent)
-        assert agent.model == bedrock_model
+        assert isinstance(agent.model, BedrockModel)
+        assert agent.model.get_config()["model_id"] == MODEL_IDS["default"]
+
+    def test_agents_do_not_share_models(self):
+        """Test that updating one agent's model leaves other agents untouched."""
+        first = create_agent(system_prompt="You are the first assistant.")
+        second = create_agent(system_prompt="You are the second assistant.")
+
+        first.model.update_config(model_id=MODEL_IDS["haiku"])
+
+        assert first.model is not second.model
+        assert second.model.get_config()["model_id"] == MODEL_IDS["default"]
 
     def test_create_agent_with_all_parameters(self):
         """Test creating an agent with all parameters specified."""
@@ -144,3 +155,28 @@ class TestCreateAgent:
         assert isinstance(agent, Agent)
         assert agent.system_prompt == system_prompt
         assert agent.model == ollama_model
+
+
+class TestModelRouting:
+    """Test suite for the model factory and the stage routing config."""
+
+    def test_create_model_resolves_keys_and_caps_max_tokens(self):
+        model = create_model(ModelConfig(model_id="nova_lite", temperature=0.2))
+
+        config = model.get_config()
+        assert config["model_id"] == MODEL_IDS["nova_lite"]
+        assert config["max_tokens"] == 10000
+        assert config["temperature"] == 0.2
+
+    def test_default_routing(self):
+        assert load_model_routing() == STAGE_MODELS
+        assert STAGE_MODELS["detector_result"].model_id == MODEL_IDS["haiku"]
+
+    def test_routing_file_overrides_fields(self, tmp_path):
+        path = tmp_path / "routing.json"
+        path.write_text('{"detector_result": {"model_id": "nova_lite", "max_tokens": 4000}}')
+
+        routing = load_model_routing(str(path))
+
+        assert routing["detector_result"] == ModelConfig(model_id="nova_lite", max_tokens=4000)
+        assert routing["redact_result"] == STAGE_MODELS["redact_result"]
@@ -0,0 +1,89 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from doc_redaction.utils import assessment_cache
+from doc_redaction.utils.assessment_cache import AssessmentCache, assessment_variant, cached_assess_doc_quality, warm_assessment_cache
+from doc_redaction.utils.doc_assessment import assess_doc_quality
+from doc_redaction.utils.doc_session import DocumentSession
+
+SAMPLE_PDF = "data/contract/spielbank_rocketbase_vertrag.pdf"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AssessmentCache(cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def count_assessments(monkeypatch):
+    calls = []
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs["file_path"])
+        return assess_doc_quality(*args, **kwargs)
+
+    monkeypatch.setattr(assessment_cache, "assess_doc_quality", counting)
+    return calls
+
+
+class TestAssessmentCache:
+    def test_roundtrip(self, cache):
+        cache.put("ab" * 32, "full", {"document_quality": "high"})
+
+        assert cache.get("ab" * 32, "full") == {"document_quality": "high"}
+        assert cache.get("ab" * 32, "sampled-50-0") is None
+        assert cache.path("ab" * 32, "full").parent.name == "ab"
+
+    def test_version_mismatch_is_a_miss(self, tmp_path):
+        AssessmentCache(cache_dir=str(tmp_path), version="1").put("cd" * 32, "full", {"document_quality": "high"})
+
+        upgraded = AssessmentCache(cache_dir=str(tmp_path), version="2")
+
+        assert upgraded.get("cd" * 32, "full") is None
+        assert upgraded.stats.misses == 1
+
+    def test_variants(self):
+        assert assessment_variant("parallel") == assessment_variant("full") == "full"
+        assert assessment_variant("sampled", sample_size=10, seed=3) == "sampled-10-3"
+
+
+class TestCachedAssessDocQuality:
+    def test_unchanged_document_skips_assessment(self, cache, count_assessments, tmp_path):
+        output = tmp_path / "quality.json"
+
+        first = cached_assess_doc_quality(SAMPLE_PDF, output_path=str(output), cache=cache)
+        output.unlink()
+        second = cached_assess_doc_quality(SAMPLE_PDF, output_path=str(output), cache=cache)
+
+        assert len(count_assessments) == 1
+        assert second == json.loads(json.dumps(first))
+        assert json.loads(output.read_text()) == second
+
+    def test_copied_document_hits_by_content(self, cache, count_assessments, tmp_path):
+        copy = tmp_path / "copy.pdf"
+        shutil.copy(SAMPLE_PDF, copy)
+
+        cached_assess_doc_quality(SAMPLE_PDF, cache=cache)
+        with DocumentSession(copy) as session:
+            cached_assess_doc_quality(str(copy), cache=cache, session=session)
+
+        assert count_assessments == [SAMPLE_PDF]
+        assert cache.stats.hits == 1
+
+    def test_warm_up_directory(self, tmp_path, monkeypatch, count_assessments):
+        sample = Path(SAMPLE_PDF).resolve()
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "docs").mkdir()
+        shutil.copy(sample, tmp_path / "docs" / "a.pdf")
+        shutil.copy(sample, tmp_path / "docs" / "b.pdf")
+
+        first = warm_assessment_cache("docs")
+        second = warm_assessment_cache("docs")
+
+        assert first == {"docs/a.pdf": False, "docs/b.pdf": True}
+        assert second == {"docs/a.pdf": True, "docs/b.pdf": True}
+        assert len(count_assessments) == 1
+        assert (tmp_path / "data" / "cache" / "assessment").is_dir()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from doc_redaction.batch import resolve_keys, run_batch
+from doc_redaction.utils.commons import BudgetExceededError, DocumentOutsideContractDirError, InvalidDocumentKeyError
+
+
+def graph_result(status: str = "completed") -> SimpleNamespace:
+    return SimpleNamespace(status=SimpleNamespace(value=status))
+
+
+class TestResolveKeys:
+    def test_keys_paths_directories_and_globs(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        contracts = tmp_path / "data" / "contract"
+        contracts.mkdir(parents=True)
+        for name in ("b.pdf", "a.pdf", "notes.txt"):
+            (contracts / name).touch()
+
+        assert resolve_keys([str(contracts)]) == ["a", "b"]
+        assert resolve_keys(["data/contract/b*"]) == ["b"]
+        assert resolve_keys(["c", "data/contract/d.pdf", "c"]) == ["c", "d"]
+
+    @pytest.mark.parametrize("item", ["elsewhere", "elsewhere/a.pdf", "elsewhere/*.pdf"])
+    def test_pdfs_outside_the_contract_directory(self, tmp_path, monkeypatch, item):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "elsewhere").mkdir()
+        (tmp_path / "elsewhere" / "a.pdf").touch()
+
+        with pytest.raises(DocumentOutsideContractDirError):
+            resolve_keys([item])
+
+
+class TestRunBatch:
+    def test_errors_are_isolated_and_recorded(self, tmp_path):
+        def workflow(key, router):
+            if key == "broken":
+                raise InvalidDocumentKeyError()
+            if key == "expensive":
+                raise BudgetExceededError(key, 1.0)
+            return {}, graph_result("failed" if key == "timeout" else "completed"), "{}"
+
+        manifest = tmp_path / "manifest.jsonl"
+        items = asyncio.run(run_batch(["ok", "broken", "expensive", "timeout"], manifest_path=str(manifest), workflow=workflow))
+
+        assert [item.status for item in items] == ["completed", "error", "refused", "failed"]
+        assert (items[1].error or "").startswith("InvalidDocumentKeyError: ")
+        assert items[2].token_summary is None
+        lines = [json.loads(line) for line in manifest.read_text().splitlines()]
+        assert sorted(line["key"] for line in lines) == ["broken", "expensive", "ok", "timeout"]
+
+    def test_concurrency_is_bounded(self, tmp_path):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def workflow(key, router):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return {}, graph_result(), "{}"
+
+        items = asyncio.run(run_batch([f"doc{i}" for i in range(10)], max_concurrency=3, manifest_path=str(tmp_path / "m.jsonl"), workflow=workflow))
+
+        assert len(items) == 10
+        assert 1 < peak[0] <= 3
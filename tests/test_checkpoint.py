@@ -0,0 +1,128 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from doc_redaction import workflow
+from doc_redaction.agent import STAGE_MODELS
+from doc_redaction.utils.checkpoint import Checkpoint, stage_fingerprint
+from doc_redaction.utils.commons import InvalidPipelineStageError
+from doc_redaction.utils.preflight import BudgetRouter
+from doc_redaction.workflow import run_doc_processing_wf
+
+SAMPLE_PDF = "data/contract/spielbank_rocketbase_vertrag.pdf"
+KEY = "spielbank_rocketbase_vertrag"
+CONFIG = {"model": STAGE_MODELS["convert_result"]}
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "out.md"
+    path.write_text("markdown")
+    return str(path)
+
+
+def _complete_all(checkpoint_dir, output):
+    checkpoint = Checkpoint(KEY, "hash", checkpoint_dir=checkpoint_dir)
+    for stage in ("quality", "render", "markdown"):
+        assert not checkpoint.skip(stage, CONFIG)
+        checkpoint.complete(stage, CONFIG, [output])
+
+
+class TestCheckpoint:
+    def test_completed_stages_are_skipped(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+        checkpoint = Checkpoint(KEY, "hash", checkpoint_dir=tmp_path)
+
+        assert [checkpoint.skip(stage, CONFIG) for stage in ("quality", "render", "markdown", "confidential")] == [True, True, True, False]
+
+    def test_skippable_stages_records_nothing(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+        checkpoint = Checkpoint(KEY, "hash", checkpoint_dir=tmp_path)
+
+        assert checkpoint.skippable_stages(dict.fromkeys(("quality", "render", "markdown", "confidential"), CONFIG)) == ["quality", "render", "markdown"]
+        assert checkpoint.skippable_stages({"quality": CONFIG, "markdown": CONFIG}) == ["quality"]
+        assert checkpoint.skip("quality", CONFIG)
+        assert checkpoint.skip("render", CONFIG)
+
+    def test_changed_pdf_invalidates_all_stages(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+
+        assert not Checkpoint(KEY, "other hash", checkpoint_dir=tmp_path).skip("quality", CONFIG)
+
+    def test_changed_config_recomputes_downstream(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+        checkpoint = Checkpoint(KEY, "hash", checkpoint_dir=tmp_path)
+
+        assert checkpoint.skip("quality", CONFIG)
+        assert not checkpoint.skip("render", {"model": STAGE_MODELS["detector_result"]})
+        assert not checkpoint.skip("markdown", CONFIG)
+
+    def test_modified_output_recomputes(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+        Path(output).write_text("edited")
+
+        assert not Checkpoint(KEY, "hash", checkpoint_dir=tmp_path).skip("quality", CONFIG)
+
+    def test_from_stage(self, tmp_path, output):
+        _complete_all(tmp_path, output)
+        checkpoint = Checkpoint(KEY, "hash", from_stage="render", checkpoint_dir=tmp_path)
+
+        assert checkpoint.skip("quality", CONFIG)
+        assert not checkpoint.skip("render", CONFIG)
+
+    def test_invalid_stage(self, tmp_path):
+        with pytest.raises(InvalidPipelineStageError):
+            Checkpoint(KEY, "hash", from_stage="ocr", checkpoint_dir=tmp_path)
+
+    def test_fingerprint_is_stable(self):
+        assert stage_fingerprint({"b": 1, "model": STAGE_MODELS["redact_result"]}) == stage_fingerprint({"model": STAGE_MODELS["redact_result"], "b": 1})
+
+
+class TestWorkflowResume:
+    @pytest.fixture
+    def workdir(self, tmp_path, monkeypatch):
+        (tmp_path / "data" / "contract").mkdir(parents=True)
+        shutil.copy(SAMPLE_PDF, tmp_path / "data" / "contract")
+        monkeypatch.chdir(tmp_path)
+        run_doc_processing_wf(KEY, mode="local")
+        return tmp_path
+
+    def test_rerun_skips_completed_stages(self, workdir, monkeypatch):
+        monkeypatch.setattr(workflow, "convert_text_layer", pytest.fail)
+        monkeypatch.setattr(workflow, "redact_locally", pytest.fail)
+
+        doc_quality, result, _ = run_doc_processing_wf(KEY, mode="local")
+
+        assert result is None
+        assert doc_quality["file_info"]["page_count"] > 0
+
+    def test_rerun_keeps_token_summary(self, workdir, monkeypatch):
+        summary = Path(f"data/token/{KEY}.json")
+        summary.write_text('{"total_cost": 1.5}')
+        monkeypatch.setattr(workflow.TOKEN_LEDGER, "record_many", pytest.fail)
+
+        _, _, token_summary = run_doc_processing_wf(KEY, mode="local")
+
+        assert token_summary == summary.read_text() == '{"total_cost": 1.5}'
+
+    def test_rerun_without_model_stages_skips_preflight(self, workdir, monkeypatch):
+        monkeypatch.setattr(workflow, "preflight", pytest.fail)
+
+        run_doc_processing_wf(KEY, router=BudgetRouter(document_budget=0.0), mode="local", from_stage="confidential")
+
+    def test_from_stage_recomputes_downstream_only(self, workdir, monkeypatch):
+        redacted = Path(f"data/redact/{KEY}.md")
+        redacted.write_text("stale")
+        monkeypatch.setattr(workflow, "convert_text_layer", pytest.fail)
+
+        run_doc_processing_wf(KEY, mode="local", from_stage="confidential")
+
+        assert redacted.read_text() != "stale"
+        manifest = json.loads(Path(f"data/checkpoint/{KEY}.json").read_text())
+        assert list(manifest["stages"]) == ["quality", "render", "markdown", "confidential", "redact"]
+
+    def test_invalid_from_stage(self, workdir):
+        with pytest.raises(InvalidPipelineStageError):
+            run_doc_processing_wf(KEY, mode="local", from_stage="detect")
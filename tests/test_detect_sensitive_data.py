@@ -1,3 +1,8 @@
+import json
+import os
+import subprocess
+import sys
+
 from src.doc_redaction.tool.detect_sensitive_data import (
     ACCOUNT_RE,
     ADDRESS_REGEXES,
@@ -287,3 +292,18 @@ class TestDetectSensitiveData:
         if "email_addresses" in result:
             # Should only appear once due to set() usage
             assert result["email_addresses"].count("john@example.com") == 1
+
+    def test_results_do_not_depend_on_hash_seed(self):
+        """Test that the result order is the same across processes with different hash seeds."""
+        script = (
+            "import json; from doc_redaction.tool.detect_sensitive_data import detect_sensitive_data; "
+            "print(json.dumps(detect_sensitive_data('zehn, drei, eins, one, two, three: 10.000 EUR, 25 % von 12 Zahlungen')))"
+        )
+
+        outputs = [
+            subprocess.run([sys.executable, "-c", script], env={**os.environ, "PYTHONHASHSEED": seed}, capture_output=True, text=True, check=True).stdout  # noqa: S603
+            for seed in ("1", "2")
+        ]
+
+        assert outputs[0] == outputs[1]
+        assert json.loads(outputs[0])["numbers"] == sorted(json.loads(outputs[0])["numbers"])
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+from doc_redaction.utils.commons import InvalidAssessmentModeError, process_pool_context
+from doc_redaction.utils.doc_assessment import PARALLEL_MIN_PAGES, _stratified_sample, _TextStats, assess_doc_quality
+
+SAMPLE_PDF = "data/contract/spielbank_rocketbase_vertrag.pdf"
+
+
+@pytest.fixture(scope="module")
+def long_pdf(tmp_path_factory):
+    path = tmp_path_factory.mktemp("assessment") / "long.pdf"
+    doc = fitz.open()
+    with fitz.open(SAMPLE_PDF) as sample:
+        for _ in range(PARALLEL_MIN_PAGES // 2):
+            doc.insert_pdf(sample)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class TestTextStats:
+    @pytest.mark.parametrize(
+        "parts",
+        [
+            ["Vertrag zwischen\n", "Spielbank AG\n"],
+            ["Ver", "trag"],
+            ["  ", "", "\n 10.000 € \n", "  "],
+            ["", ""],
+            ["\t\n"],
+        ],
+    )
+    def test_merged_stats_match_the_concatenated_text(self, parts):
+        stats = _TextStats()
+        for part in parts:
+            stats = stats.merge(_TextStats.of(part))
+        text = "".join(parts)
+
+        assert stats.characters == len(text)
+        assert stats.words == len(text.split())
+        assert stats.lines == len(text.split("\n"))
+        assert stats.stripped_length == len(text.strip())
+        assert stats.has_digits == any(ch.isdigit() for ch in text)
+        assert stats.has_special_chars == any(ch in "€$%@#&*" for ch in text)
+
+
+class TestAssessDocQuality:
+    def test_sample_contract_metrics(self):
+        assessment = assess_doc_quality(SAMPLE_PDF)
+
+        metrics = assessment["extraction_metrics"]
+        assert metrics["total_characters"] == 2555
+        assert metrics["total_words"] == 299
+        assert metrics["total_lines"] == 62
+        assert metrics["total_text_blocks"] == 14
+        assert assessment["content_analysis"]["has_meaningful_content"]
+        assert assessment["document_quality"] == "high"
+
+    def test_writes_report(self, tmp_path):
+        output = tmp_path / "quality" / "report.json"
+
+        assess_doc_quality(SAMPLE_PDF, output_path=str(output))
+
+        assert output.exists()
+
+    def test_invalid_mode(self):
+        with pytest.raises(InvalidAssessmentModeError):
+            assess_doc_quality(SAMPLE_PDF, mode="fast")
+
+    def test_parallel_mode_matches_full_mode(self, long_pdf):
+        full = assess_doc_quality(long_pdf)
+        parallel = assess_doc_quality(long_pdf, mode="parallel", max_workers=2)
+
+        for assessment in (full, parallel):
+            for page in assessment["content_analysis"]["page_details"]:
+                page["fonts_used"] = sorted(page["fonts_used"])
+        assert parallel == full
+
+    def test_parallel_mode_in_a_batch_worker_thread(self, long_pdf):
+        full = assess_doc_quality(long_pdf)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            context = executor.submit(process_pool_context).result()
+            parallel = executor.submit(assess_doc_quality, long_pdf, mode="parallel", max_workers=2).result()
+
+        assert context is not None
+        assert context.get_start_method() in ("forkserver", "spawn")
+        assert parallel["extraction_metrics"] == full["extraction_metrics"]
+
+    def test_sampled_mode_extrapolates_with_bounds(self, long_pdf):
+        full = assess_doc_quality(long_pdf)["extraction_metrics"]
+
+        sampled = assess_doc_quality(long_pdf, mode="sampled", sample_size=8)["extraction_metrics"]
+
+        low, high = sampled["sampling"]["bounds"]["total_characters"]
+        assert sampled["sampling"]["sample_size"] == 8
+        assert low <= full["total_characters"] <= high
+        assert sampled["pages_without_content"] == 0
+
+    def test_sampled_mode_on_short_document_is_exact(self):
+        assert assess_doc_quality(SAMPLE_PDF, mode="sampled") == assess_doc_quality(SAMPLE_PDF)
+
+
+class TestStratifiedSample:
+    def test_one_page_per_stratum(self):
+        sample = _stratified_sample(page_count=100, sample_size=10, seed=1)
+
+        assert [page // 10 for page in sample] == list(range(10))
@@ -0,0 +1,63 @@
+import fitz
+import pytest
+
+from doc_redaction.utils.commons import get_pdf_page_count
+from doc_redaction.utils.doc_assessment import assess_doc_quality
+from doc_redaction.utils.doc_reader import PDFNotFoundError, PDFOpenError
+from doc_redaction.utils.doc_session import DocumentSession
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for text in ("Seite eins", "Seite zwei"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class TestDocumentSession:
+    def test_opens_the_document_once(self, pdf, monkeypatch):
+        calls = []
+        original_open = fitz.open
+        monkeypatch.setattr(fitz, "open", lambda *args, **kwargs: calls.append(args) or original_open(*args, **kwargs))
+
+        with DocumentSession(pdf) as session:
+            assess_doc_quality(pdf, session=session)
+            assert session.page_count == 2
+            assert "Seite zwei" in session.text(1)
+
+        assert len(calls) == 1
+
+    def test_caches_text_pages_and_pixmaps(self, pdf):
+        with DocumentSession(pdf) as session:
+            assert session.text_page(0) is session.text_page(0)
+            assert session.pixmap(0, dpi=18) is session.pixmap(0, dpi=18)
+            assert session.pixmap(0, dpi=18) is not session.pixmap(0, dpi=18, colorspace="GRAY")
+
+    def test_close_releases_the_document(self, pdf):
+        session = DocumentSession(pdf)
+        session.text_page(0)
+
+        session.close()
+
+        assert session._document is None
+        assert session._text_pages == {}
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(PDFNotFoundError), DocumentSession(tmp_path / "missing.pdf") as session:
+            session.page_count  # noqa: B018
+
+
+class TestGetPdfPageCount:
+    def test_counts_pages(self, pdf):
+        assert get_pdf_page_count(pdf) == 2
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(b"not a pdf")
+
+        with pytest.raises(PDFOpenError):
+            get_pdf_page_count(str(path))
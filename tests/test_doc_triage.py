@@ -0,0 +1,111 @@
+import fitz
+import pymupdf
+import pytest
+
+from doc_redaction.utils import doc_triage
+from doc_redaction.utils.commons import PDFNotFoundError, PDFOpenError
+from doc_redaction.utils.doc_triage import Route, triage_document
+
+
+def _png() -> bytes:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 40), False)
+    pix.clear_with(128)
+    return pix.tobytes("png")
+
+
+def _save(path, pages, **save_kwargs) -> str:
+    doc = fitz.open()
+    for kind in pages:
+        page = doc.new_page()
+        if kind in ("text", "both"):
+            page.insert_text((72, 72), "Vertrag zwischen den Parteien")
+        if kind in ("image", "both"):
+            page.insert_image(fitz.Rect(72, 100, 272, 300), stream=_png())
+    doc.set_metadata({"title": "Vertrag", "producer": "tests"})
+    doc.save(path, **save_kwargs)
+    doc.close()
+    return str(path)
+
+
+class TestTriageDocument:
+    def test_digital_document(self, tmp_path):
+        record = triage_document(_save(tmp_path / "digital.pdf", ["text", "both"]))
+
+        assert record.route == Route.DIGITAL
+        assert record.page_count == 2
+        assert record.text_layer_pages == [0, 1]
+        assert record.image_counts == [0, 1]
+        assert record.metadata["title"] == "Vertrag"
+        assert not record.is_encrypted
+
+    def test_scanned_document(self, tmp_path):
+        record = triage_document(_save(tmp_path / "scanned.pdf", ["image", "image"]))
+
+        assert record.route == Route.SCANNED
+        assert not record.has_text_layer
+        assert record.image_counts == [1, 1]
+
+    def test_mixed_and_blank_pages(self, tmp_path):
+        record = triage_document(_save(tmp_path / "mixed.pdf", ["text", "image", "blank"]))
+
+        assert record.route == Route.MIXED
+        assert record.text_layer_pages == [0]
+
+    def test_does_not_extract_text(self, tmp_path, monkeypatch):
+        pdf = _save(tmp_path / "digital.pdf", ["text"])
+        monkeypatch.setattr(fitz.Page, "get_text", lambda *args, **kwargs: pytest.fail("text was extracted"))
+        monkeypatch.setattr(fitz.Page, "get_textpage", lambda *args, **kwargs: pytest.fail("text was extracted"))
+
+        assert triage_document(pdf).route == Route.DIGITAL
+
+    def test_text_in_form_xobjects(self, tmp_path):
+        source = fitz.open(_save(tmp_path / "source.pdf", ["text", "image"]))
+        doc = fitz.open()
+        for page_number in range(source.page_count):
+            doc.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), source, page_number)
+        doc.save(tmp_path / "placed.pdf")
+        doc.close()
+
+        record = triage_document(str(tmp_path / "placed.pdf"))
+
+        assert record.route == Route.MIXED
+        assert record.text_layer_pages == [0]
+        assert record.image_counts == [0, 1]
+
+    def test_encrypted_document(self, tmp_path):
+        pdf = _save(tmp_path / "secret.pdf", ["text"], encryption=pymupdf.mupdf.PDF_ENCRYPT_AES_256, user_pw="geheim", owner_pw="geheim")
+
+        record = triage_document(pdf)
+
+        assert record.route == Route.ENCRYPTED
+        assert record.is_encrypted
+        assert record.text_layer_pages == []
+
+    def test_oversized_document(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(doc_triage, "MAX_PAGES", 1)
+
+        assert triage_document(_save(tmp_path / "long.pdf", ["text", "text"])).route == Route.OVERSIZED
+
+    def test_inherited_resources(self, tmp_path):
+        pdf = _save(tmp_path / "inherited.pdf", ["text"])
+        doc = fitz.open(pdf)
+        page_xref = doc.page_xref(0)
+        resources = doc.xref_get_key(page_xref, "Resources")[1]
+        parent = int(doc.xref_get_key(page_xref, "Parent")[1].split()[0])
+        doc.xref_set_key(parent, "Resources", resources)
+        doc.xref_set_key(page_xref, "Resources", "null")
+        doc.save(tmp_path / "moved.pdf")
+        doc.close()
+
+        assert triage_document(str(tmp_path / "moved.pdf")).text_layer_pages == [0]
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(PDFNotFoundError):
+            triage_document(str(tmp_path / "missing.pdf"))
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"not a pdf")
+
+        with pytest.raises(PDFOpenError):
+            triage_document(str(path))
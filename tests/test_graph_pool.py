@@ -0,0 +1,84 @@
+import pytest
+
+from doc_redaction.agent import STAGE_MODELS
+from doc_redaction.utils.graph_pool import GraphPool
+from doc_redaction.workflow import build_workflow_graph, graph_key
+
+
+class FakeGraph:
+    def __init__(self, key):
+        self.key = key
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+@pytest.fixture
+def built():
+    return []
+
+
+@pytest.fixture
+def pool(built):
+    def factory(key):
+        built.append(FakeGraph(key))
+        return built[-1]
+
+    return GraphPool(factory=factory, max_idle=2)
+
+
+class TestGraphPool:
+    def test_reuses_released_graphs_per_key(self, pool, built):
+        with pool.lease("text") as first:
+            pass
+        with pool.lease("text") as second:
+            assert second is first
+        with pool.lease("vision") as third:
+            assert third is not first
+
+        assert len(built) == 2
+        assert first.resets == 2
+        assert (pool.stats.hits, pool.stats.misses) == (1, 2)
+
+    def test_concurrent_leases_get_separate_graphs(self, pool, built):
+        with pool.lease("text") as first, pool.lease("text") as second, pool.lease("text") as third:
+            assert len({id(first), id(second), id(third)}) == 3
+
+        assert pool.stats.evictions == 1
+        assert len(pool._idle["text"]) == 2
+
+    def test_failed_runs_are_not_reused(self, pool, built):
+        with pytest.raises(RuntimeError), pool.lease("text"):
+            raise RuntimeError
+
+        with pool.lease("text") as graph:
+            assert graph is built[-1]
+        assert len(built) == 2
+
+    def test_warm_builds_up_to_max_idle(self, pool, built):
+        pool.warm("text", count=5)
+
+        assert len(built) == 2
+        with pool.lease("text"):
+            assert pool.stats.hits == 1
+
+
+class TestWorkflowGraph:
+    def test_reset_clears_conversation_and_metrics(self):
+        workflow_graph = build_workflow_graph(STAGE_MODELS)
+        detector = workflow_graph.agents["detector_result"]
+        detector.messages.append({"role": "user", "content": [{"text": "previous document"}]})
+        detector.event_loop_metrics.cycle_count = 3
+
+        workflow_graph.reset()
+
+        assert detector.messages == []
+        assert detector.event_loop_metrics.cycle_count == 0
+        assert set(workflow_graph.graph.nodes) == {"detector_result", "redact_result"}
+
+    def test_graph_key_depends_on_graph_models_only(self):
+        assert graph_key(STAGE_MODELS) == graph_key(dict(reversed(STAGE_MODELS.items())))
+        assert graph_key(STAGE_MODELS) == graph_key({**STAGE_MODELS, "convert_result": STAGE_MODELS["detector_result"]})
+        assert graph_key(STAGE_MODELS) != graph_key({**STAGE_MODELS, "redact_result": STAGE_MODELS["convert_result"]})
+        hash(graph_key(STAGE_MODELS))
@@ -0,0 +1,89 @@
+import fitz
+import numpy as np
+import pytest
+
+from doc_redaction.utils.layout_profile import CLIP_MARGIN, FONT_SIZE_BINS, HEATMAP_SIZE, LayoutProfile, is_text_layer_layout, profile_layout, profile_page, render_clip
+
+SAMPLE_PDF = "data/contract/spielbank_rocketbase_vertrag.pdf"
+
+
+@pytest.fixture
+def page():
+    doc = fitz.open()
+    yield doc.new_page(width=600, height=800)
+    doc.close()
+
+
+def _write_column(page, x, lines=20, fontsize=11):
+    for row in range(lines):
+        page.insert_text((x, 100 + row * 16), "Lorem ipsum dolor sit amet", fontsize=fontsize)
+
+
+class TestProfilePage:
+    def test_single_column(self, page):
+        _write_column(page, 72)
+
+        profile = profile_page(page)
+
+        assert profile.column_count == 1
+        assert profile.table_likeness == 0
+        assert profile.margins is not None
+        assert profile.content_box is not None
+        assert profile.margins[0] == pytest.approx(72, abs=1)
+        assert profile.content_box[0] == pytest.approx(72, abs=1)
+        assert profile.page_number == 1
+
+    def test_two_columns(self, page):
+        _write_column(page, 50, fontsize=9)
+        _write_column(page, 330, fontsize=9)
+
+        profile = profile_page(page)
+
+        assert profile.column_count == 2
+        assert not is_text_layer_layout(profile)
+
+    def test_table_rows(self, page):
+        for row in range(10):
+            for col, x in enumerate((60, 220, 380)):
+                page.insert_text((x, 100 + row * 16), f"Zelle {row}-{col}", fontsize=10)
+
+        assert profile_page(page).table_likeness == 1.0
+
+    def test_coverage_and_font_sizes(self, page):
+        page.insert_text((20, 40), "Titel", fontsize=30)
+        _write_column(page, 72, lines=5)
+
+        profile = profile_page(page)
+
+        assert profile.coverage.shape == (HEATMAP_SIZE, HEATMAP_SIZE)
+        assert profile.coverage[0].sum() > 0
+        assert profile.coverage[-1].sum() == 0
+        assert 0 < profile.text_coverage < 1
+        assert len(profile.font_size_histogram) == len(FONT_SIZE_BINS) - 1
+        assert profile.font_size_histogram[FONT_SIZE_BINS.index(24.0)] == len("Titel")
+        assert profile.font_size_histogram[FONT_SIZE_BINS.index(10.0)] == 5 * len("Lorem ipsum dolor sit amet")
+
+    def test_empty_page(self, page):
+        profile = profile_page(page)
+
+        assert profile.column_count == 0
+        assert profile.content_box is None
+        assert not np.any(profile.coverage)
+
+
+class TestRenderClip:
+    def test_content_box_with_margin(self):
+        profile = LayoutProfile(page_number=1, content_box=(5.0, 100.0, 300.0, 400.0))
+
+        assert render_clip(profile) == (0.0, 100.0 - CLIP_MARGIN, 300.0 + CLIP_MARGIN, 400.0 + CLIP_MARGIN)
+
+    def test_page_without_text(self):
+        assert render_clip(LayoutProfile(page_number=1)) is None
+
+
+class TestProfileLayout:
+    def test_profiles_every_page(self):
+        profiles = profile_layout(SAMPLE_PDF)
+
+        assert [profile.page_number for profile in profiles] == list(range(1, len(profiles) + 1))
+        assert all(profile.column_count == 1 for profile in profiles)
@@ -0,0 +1,111 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from doc_redaction.utils.commons import InvalidWorkflowModeError
+from doc_redaction.utils.local_redaction import REDACTION_SYMBOL, detect_names, redact_locally, redact_spans, redaction_spans, to_sensitive_data
+from doc_redaction.workflow import run_doc_processing_wf
+
+SAMPLE_PDF = "data/contract/spielbank_rocketbase_vertrag.pdf"
+SAMPLE_MARKDOWN = "data/markdown/spielbank_rocketbase_vertrag.md"
+
+
+class TestRedactionSpans:
+    def test_longest_value_wins(self):
+        markdown = "IBAN DE89370400440532013000, Konto 0532013000"
+
+        spans = redaction_spans(markdown, ["0532013000", "DE89370400440532013000"])
+
+        assert [markdown[start:end] for start, end in spans] == ["DE89370400440532013000", "0532013000"]
+
+    def test_whole_words_and_whitespace(self):
+        markdown = "§1 Leistungsumfang von Max  Mustermann"
+
+        spans = redaction_spans(markdown, ["1 Leist", "Max Mustermann", " "])
+
+        assert [markdown[start:end] for start, end in spans] == ["Max  Mustermann"]
+
+    @pytest.mark.parametrize(
+        ("markdown", "redacted"),
+        [
+            ("Kontakt: _Lisa Schneider_", "Kontakt: _<REDACTED>_"),
+            ("Kontakt: **Lisa** Schneider", "Kontakt: **<REDACTED>"),
+            ("IBAN DE89370400440532013000_", "IBAN <REDACTED>_"),
+        ],
+    )
+    def test_values_in_markdown_emphasis(self, markdown, redacted):
+        assert redact_locally(markdown, "vertrag")[1] == redacted
+
+    def test_redact_spans(self):
+        assert redact_spans("call 0301234567 or mail a@b.de", [(5, 15), (24, 30)], "#") == "call # or mail #"
+
+
+class TestDetectNames:
+    @pytest.mark.parametrize(
+        ("markdown", "names"),
+        [
+            ("Der Auftraggeber\nMax Mustermann", ["Max Mustermann"]),
+            ("Vertreten durch: Dr. Hans Meier, Vorstandsvorsitzender", ["Hans Meier"]),
+            ("Bank: Franz Fischer; Dienstleister: Sandra König", ["Franz Fischer", "Sandra König"]),
+            ("## Anwendbares Recht\n\nDie Spielbank AG und Der Vertrag", []),
+            ("**Amazon Web Services, Inc.**", []),
+        ],
+    )
+    def test_name_positions(self, markdown, names):
+        assert detect_names(markdown) == names
+
+
+class TestRedactLocally:
+    def test_contract_markdown(self):
+        markdown = Path(SAMPLE_MARKDOWN).read_text(encoding="utf-8")
+
+        _, redacted = redact_locally(markdown, "spielbank_rocketbase_vertrag")
+
+        for heading in (line for line in markdown.splitlines() if line.startswith("#")):
+            assert heading in redacted.splitlines()
+        for name in ("Lisa", "Schneider", "Hans", "Meier"):
+            assert name not in redacted
+        assert "zehntausend" not in redacted
+        assert "Die Spielbank AG" in redacted
+
+    def test_detects_and_redacts(self):
+        markdown = "# Vertrag\n\nper E-Mail an **john.doe@example.com**, Telefon +49 30 1234567.\nVergütung: 10.000 EUR pro Monat.\n"
+
+        sensitive_data, redacted = redact_locally(markdown, "vertrag")
+
+        assert "john.doe@example.com" not in redacted
+        assert "10.000 EUR" not in redacted
+        assert redacted.startswith("# Vertrag")
+        assert REDACTION_SYMBOL in redacted
+        assert sensitive_data.document_analysis.document_name == "vertrag"
+        assert sensitive_data.representative[0].email_addresses == "john.doe@example.com"
+        assert sensitive_data.contract_terms.currency_amounts
+        assert sensitive_data.risk_assessment.contains_personal_data
+
+    def test_number_words_only(self):
+        sensitive_data = to_sensitive_data({"numbers": ["12", "zehn", "two"]}, "vertrag", "Gemäß DSGVO")
+
+        assert sensitive_data.contract_terms.number_words == ["two", "zehn"]
+        assert not sensitive_data.document_analysis.sensitive_data_detected
+        assert sensitive_data.data_protection_compliance.mentioned
+
+
+class TestLocalWorkflow:
+    def test_runs_offline(self, tmp_path, monkeypatch):
+        (tmp_path / "data" / "contract").mkdir(parents=True)
+        shutil.copy(SAMPLE_PDF, tmp_path / "data" / "contract")
+        monkeypatch.chdir(tmp_path)
+
+        _, result, token_summary = run_doc_processing_wf("spielbank_rocketbase_vertrag", mode="local")
+
+        assert result is None
+        assert json.loads(token_summary)["grand_total"]["tokens"] == 0
+        confidential = json.loads(Path("data/confidential/spielbank_rocketbase_vertrag.json").read_text())
+        assert confidential["document_analysis"]["sensitive_data_detected"]
+        assert REDACTION_SYMBOL in Path("data/redact/spielbank_rocketbase_vertrag.md").read_text()
+
+    def test_invalid_mode(self):
+        with pytest.raises(InvalidWorkflowModeError):
+            run_doc_processing_wf("spielbank_rocketbase_vertrag", mode="offline")
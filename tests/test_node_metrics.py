@@ -0,0 +1,72 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from strands.agent.agent_result import AgentResult
+from strands.multiagent.base import NodeResult, Status
+from strands.telemetry.metrics import EventLoopMetrics, ToolMetrics
+
+from doc_redaction.utils.node_metrics import collect_node_metrics
+from doc_redaction.workflow import process_and_summarize_tokens
+
+HAIKU = "eu.anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+def _agent(model_id: str = HAIKU):
+    return SimpleNamespace(model=SimpleNamespace(get_config=lambda: {"model_id": model_id}))
+
+
+def _node_result(input_tokens: int, output_tokens: int, cycles: int = 2, tool_time: float = 0.25) -> NodeResult:
+    metrics = EventLoopMetrics(
+        cycle_count=cycles, tool_metrics={"save_file": ToolMetrics(tool={"toolUseId": "tooluse_1", "name": "save_file", "input": {}}, call_count=3, total_time=tool_time)}
+    )
+    agent_result = AgentResult(stop_reason="end_turn", message={"role": "assistant", "content": []}, metrics=metrics, state={})
+    return NodeResult(
+        result=agent_result,
+        execution_time=2000,
+        status=Status.COMPLETED,
+        accumulated_usage={
+            "inputTokens": input_tokens,
+            "outputTokens": output_tokens,
+            "totalTokens": input_tokens + output_tokens,
+            "cacheReadInputTokens": 30,
+            "cacheWriteInputTokens": 7,
+        },
+        accumulated_metrics={"latencyMs": 1200},
+    )
+
+
+@pytest.fixture
+def run():
+    agents = {"detector_result": _agent(), "redact_result": _agent()}
+    results = {"detector_result": _node_result(1000, 100), "redact_result": _node_result(2000, 300, cycles=1, tool_time=0.5)}
+    return agents, results
+
+
+class TestCollectNodeMetrics:
+    def test_nodes_sharing_a_model_are_kept_apart(self, run):
+        metrics = collect_node_metrics(*run)
+
+        assert list(metrics) == ["detector_result", "redact_result"]
+        assert [node.input_tokens for node in metrics.values()] == [1000, 2000]
+
+    def test_timing_and_usage(self, run):
+        node = collect_node_metrics(*run)["redact_result"]
+
+        assert (node.status, node.wall_time_ms, node.model_latency_ms, node.tool_time_ms, node.tool_calls, node.cycles) == ("completed", 2000, 1200, 500, 3, 1)
+        assert (node.output_tokens, node.cache_read_tokens, node.cache_write_tokens) == (300, 30, 7)
+
+    def test_skips_nodes_that_did_not_run(self, run):
+        agents, results = run
+
+        assert list(collect_node_metrics({**agents, "convert_result": _agent()}, results)) == ["detector_result", "redact_result"]
+
+
+class TestProcessAndSummarizeTokens:
+    def test_sums_all_nodes_and_persists_node_metrics(self, run):
+        summary = json.loads(process_and_summarize_tokens(collect_node_metrics(*run)))
+
+        assert summary["token_type"]["inputTokens"]["total_tokens"] == 3000
+        assert summary["token_type"]["outputTokens"]["total_tokens"] == 400
+        assert summary["nodes"]["detector_result"]["cycles"] == 2
+        assert summary["nodes"]["redact_result"]["wall_time_ms"] == 2000
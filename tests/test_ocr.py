@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytesseract
+from PIL import Image
+
+from doc_redaction.utils import ocr
+from doc_redaction.utils.ocr import ocr_page, ocr_pages
+
+TESSERACT_DATA = {
+    "block_num": [1, 1, 1, 1, 2],
+    "par_num": [1, 1, 1, 1, 1],
+    "line_num": [1, 1, 2, 2, 1],
+    "text": ["Spielbank", "AG", "Musterstraße", "1", "Vertrag"],
+    "conf": [90, 80, 70, 60, 100],
+}
+
+
+def _image(tmp_path):
+    path = tmp_path / "page_01.png"
+    Image.new("RGB", (10, 10), "white").save(path)
+    return str(path)
+
+
+class TestOcrPage:
+    def test_groups_words_into_lines_and_paragraphs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pytesseract, "image_to_data", lambda *args, **kwargs: TESSERACT_DATA)
+
+        page = ocr_page(_image(tmp_path))
+
+        assert page.markdown == "Spielbank AG\nMusterstraße 1\n\nVertrag"
+        assert page.confidence == 80.0
+        assert page.word_count == 5
+
+    def test_ignores_non_word_boxes(self, tmp_path, monkeypatch):
+        data = {key: [*values, values[-1]] for key, values in TESSERACT_DATA.items()}
+        data["text"][-1] = ""
+        data["conf"][-1] = -1
+        monkeypatch.setattr(pytesseract, "image_to_data", lambda *args, **kwargs: data)
+
+        page = ocr_page(_image(tmp_path))
+
+        assert page.word_count == 5
+
+
+class TestOcrPages:
+    def test_missing_tesseract_escalates_all_pages(self, tmp_path, monkeypatch):
+        def not_found():
+            raise pytesseract.TesseractNotFoundError()
+
+        monkeypatch.setattr(ocr.pytesseract, "get_tesseract_version", not_found)
+
+        pages = ocr_pages([_image(tmp_path)])
+
+        assert [page.confidence for page in pages] == [0.0]
+
+    def test_tesseract_errors_escalate_the_pages(self, tmp_path, monkeypatch):
+        def missing_language(*args, **kwargs):
+            raise pytesseract.TesseractError(1, "Failed loading language 'deu'")
+
+        monkeypatch.setattr(ocr.pytesseract, "get_tesseract_version", lambda: "5.3.0")
+        monkeypatch.setattr(ocr.pytesseract, "image_to_data", missing_language)
+        # threads instead of processes, so the workers see the patched pytesseract
+        monkeypatch.setattr(ocr, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+
+        pages = ocr_pages([_image(tmp_path), _image(tmp_path)])
+
+        assert [page.confidence for page in pages] == [0.0, 0.0]
+        assert [page.markdown for page in pages] == ["", ""]
+
+    def test_empty_input(self):
+        assert ocr_pages([]) == []
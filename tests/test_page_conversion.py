@@ -0,0 +1,164 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import cast
+
+import pytest
+from strands import Agent
+from strands.agent.agent_result import AgentResult
+from strands.telemetry.metrics import EventLoopMetrics
+
+from doc_redaction.agent import MODEL_IDS
+from doc_redaction.utils import page_conversion
+from doc_redaction.utils.commons import InvalidDocumentFormatError, PageConversionError, PageSplitError
+from doc_redaction.utils.page_conversion import MAX_IMAGES_PER_REQUEST, convert_pages, image_block, plan_page_requests, split_pages
+
+
+class FakePageAgent:
+    """Answers every page with its delimiter and number; fails the first calls of requests starting with a page listed in failures."""
+
+    def __init__(self, failures: dict[int, int], tracker: dict[str, int], lock: threading.Lock) -> None:
+        self.failures = failures
+        self.tracker = tracker
+        self.lock = lock
+
+    def __call__(self, content):
+        pages = [int(block["text"].split()[1].rstrip(":")) for block in content[1:] if "text" in block]
+        page = pages[0]
+        with self.lock:
+            self.tracker["running"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["running"])
+        try:
+            time.sleep(0.01)
+            with self.lock:
+                self.tracker["calls"] += 1
+                if self.failures.get(page, 0) > 0:
+                    self.failures[page] -= 1
+                    raise ConnectionError(page)
+            metrics = EventLoopMetrics(cycle_count=1)
+            metrics.accumulated_usage["inputTokens"] = 100 * len(pages)
+            metrics.accumulated_usage["outputTokens"] = 10 * len(pages)
+            markdown = "\n".join(f"<!-- page {page} -->\n  page {page}\n" for page in pages)
+            return AgentResult(stop_reason="end_turn", message={"role": "assistant", "content": [{"text": markdown}]}, metrics=metrics, state={})
+        finally:
+            with self.lock:
+                self.tracker["running"] -= 1
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = {}
+    for page_index in range(6):
+        path = tmp_path / f"page_{page_index + 1}.png"
+        path.write_bytes(b"png")
+        paths[page_index] = str(path)
+    return paths
+
+
+@pytest.fixture
+def tracker():
+    return {"running": 0, "peak": 0, "calls": 0}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(page_conversion, "RETRY_BACKOFF_SECONDS", 0.0)
+
+
+def _factory(tracker: dict[str, int], failures: dict[int, int] | None = None) -> Callable[[], Agent]:
+    lock = threading.Lock()
+    failures = failures or {}
+    # FakePageAgent only implements the call convert_pages makes
+    return lambda: cast(Agent, FakePageAgent(failures, tracker, lock))
+
+
+class TestConvertPages:
+    def test_pages_in_order_with_bounded_concurrency(self, images, tracker):
+        conversion = convert_pages(images, max_concurrency=2, pages_per_request=1, agent_factory=_factory(tracker))
+
+        assert list(conversion.pages.items()) == [(page_index, f"page {page_index + 1}") for page_index in range(6)]
+        assert 1 <= tracker["peak"] <= 2
+        assert tracker["calls"] == conversion.requests == 6
+
+    def test_pages_packed_into_requests(self, images, tracker):
+        conversion = convert_pages(images, pages_per_request=4, agent_factory=_factory(tracker))
+
+        assert list(conversion.pages.items()) == [(page_index, f"page {page_index + 1}") for page_index in range(6)]
+        assert tracker["calls"] == conversion.requests == 2
+
+    def test_metrics_cover_all_pages(self, images, tracker):
+        metrics = convert_pages(images, agent_factory=_factory(tracker)).metrics
+
+        assert metrics.node == "convert_result"
+        assert metrics.model_id == MODEL_IDS["default"]
+        assert metrics.input_tokens == 600
+        assert metrics.output_tokens == 60
+        assert metrics.cycles == 2
+
+    def test_failed_page_is_retried_alone(self, images, tracker):
+        failures = {3: 2}
+        conversion = convert_pages(images, retries=2, pages_per_request=1, agent_factory=_factory(tracker, failures))
+
+        assert conversion.pages[2] == "page 3"
+        assert failures == {3: 0}
+        assert tracker["calls"] == 8
+
+    def test_page_failing_all_retries_raises(self, images, tracker):
+        with pytest.raises(PageConversionError) as error:
+            convert_pages(images, retries=1, pages_per_request=2, agent_factory=_factory(tracker, {5: 2}))
+
+        assert error.value.pages == [4, 5]
+
+    def test_image_block(self, images):
+        assert image_block(images[0]) == {"image": {"format": "png", "source": {"bytes": b"png"}}}
+
+    def test_image_block_rejects_other_files(self, tmp_path):
+        with pytest.raises(InvalidDocumentFormatError):
+            image_block(str(tmp_path / "page_1.tiff"))
+
+
+def _page(page_number: int, text_length: int = 0, width: float = 595.0, height: float = 842.0) -> dict:
+    return {"page_number": page_number, "text_length": text_length, "page_dimensions": {"width": width, "height": height}}
+
+
+class TestPlanPageRequests:
+    def test_simple_pages_fill_requests(self):
+        assert plan_page_requests(list(range(10)), pages_per_request=4, page_details=[_page(n) for n in range(1, 11)]) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    def test_complex_pages_get_smaller_requests(self):
+        details = [_page(1), _page(2, text_length=8000), _page(3), _page(4), _page(5)]
+
+        assert plan_page_requests(list(range(5)), pages_per_request=4, page_details=details) == [[0], [1], [2, 3, 4]]
+
+    def test_limits(self):
+        assert plan_page_requests(list(range(30)), pages_per_request=100, page_details=[_page(n, width=100, height=100) for n in range(1, 31)])[0] == list(
+            range(MAX_IMAGES_PER_REQUEST)
+        )
+        assert plan_page_requests(list(range(4)), pages_per_request=4, max_output_tokens=2800) == [[0, 1], [2, 3]]
+        # Pages without details are assumed to use the largest image, about 3300 tokens each
+        assert len(plan_page_requests(list(range(12)), pages_per_request=12)) == 2
+
+
+class TestSplitPages:
+    def test_split_at_delimiters(self):
+        markdown = "<!-- page 3 -->\n# Title\n\n<!-- page 4 -->\ntext\n"
+
+        assert split_pages(markdown, [2, 3]) == {2: "# Title", 3: "text"}
+
+    def test_single_page_without_delimiter(self):
+        assert split_pages("# Title\n", [0]) == {0: "# Title"}
+
+    def test_text_before_first_delimiter_is_kept(self):
+        markdown = "Vertrag\n<!-- page 1 -->\n# Title\n<!-- page 2 -->\ntext\n"
+
+        assert split_pages(markdown, [0, 1]) == {0: "Vertrag\n\n# Title", 1: "text"}
+
+    def test_missing_delimiter(self):
+        with pytest.raises(PageSplitError):
+            split_pages("<!-- page 3 -->\n# Title\n", [2, 3])
+
+    def test_repeated_delimiter(self):
+        markdown = "<!-- page 3 -->\n# Title\n<!-- page 3 -->\nmore\n<!-- page 4 -->\ntext\n"
+
+        with pytest.raises(PageSplitError, match=r"found \[3, 3, 4\]"):
+            split_pages(markdown, [2, 3])
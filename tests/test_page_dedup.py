@@ -0,0 +1,77 @@
+import fitz
+import numpy as np
+
+from doc_redaction.utils.page_dedup import DUPLICATE_MAX_DISTANCE, PageHashIndex, dhash, hamming_distances, plan_page_dedup
+
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            # the rectangle position depends on the text so that different pages look different
+            offset = 50 * (len(text) % 5)
+            page.insert_text((72, 72), text, fontsize=36)
+            page.draw_rect(fitz.Rect(72 + offset, 200 + offset, 300 + offset, 400 + offset), fill=(0, 0, 0))
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class TestHashing:
+    def test_hamming_distances_count_differing_bits(self):
+        hashes = np.array([0b0000, 0b0011, 0b1111], dtype=np.uint64)
+
+        assert hamming_distances(hashes, np.uint64(0)).tolist() == [0, 2, 4]
+
+    def test_dhash_is_stable_for_identical_images(self):
+        samples = np.tile(np.arange(100, dtype=np.float32), (50, 1))
+
+        assert dhash(samples) == dhash(samples.copy())
+        assert dhash(samples) != dhash(samples[:, ::-1])
+
+
+class TestPlanPageDedup:
+    def test_groups_blank_and_duplicate_pages(self, tmp_path):
+        pdf = _write_pdf(tmp_path / "doc.pdf", ["Annex A", "", "Annex A", "Unterschriften"])
+
+        plan = plan_page_dedup(pdf)
+
+        assert plan.blank_pages == [1]
+        assert plan.duplicates == {2: 0}
+        assert plan.unique_pages == [0, 3]
+
+    def test_pages_differing_in_a_name_are_not_duplicates(self, tmp_path):
+        doc = fitz.open()
+        for name in ("Lisa Schneider", "Lisa Schneiber"):
+            page = doc.new_page()
+            page.draw_rect(fitz.Rect(72, 200, 300, 400), fill=(0, 0, 0))
+            page.insert_text((72, 600), f"Unterschrift: {name}", fontsize=9)
+        doc.save(tmp_path / "doc.pdf")
+        doc.close()
+
+        plan = plan_page_dedup(tmp_path / "doc.pdf")
+
+        assert hamming_distances(np.array([plan.hashes[0]], dtype=np.uint64), np.uint64(plan.hashes[1]))[0] <= DUPLICATE_MAX_DISTANCE
+        assert plan.duplicates == {}
+        assert plan.digests[0] != plan.digests[1]
+
+    def test_only_requested_pages_are_considered(self, tmp_path):
+        pdf = _write_pdf(tmp_path / "doc.pdf", ["Annex A", "", "Annex A"])
+
+        plan = plan_page_dedup(pdf, pages=[1, 2])
+
+        assert plan.blank_pages == [1]
+        assert plan.unique_pages == [2]
+
+
+class TestPageHashIndex:
+    def test_finds_identical_pages_only(self):
+        index = PageHashIndex()
+        index.add("a1", "# Annex A")
+
+        assert index.find("a1") == "# Annex A"
+        assert index.find("a2") is None
+
+    def test_empty_index(self):
+        assert PageHashIndex().find("a1") is None
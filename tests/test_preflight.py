@@ -0,0 +1,113 @@
+import pytest
+
+from doc_redaction.agent import MODEL_IDS, STAGE_MODELS, ModelConfig
+from doc_redaction.utils import preflight
+from doc_redaction.utils.commons import BudgetExceededError
+from doc_redaction.utils.preflight import MAX_IMAGE_EDGE, BudgetRouter, dry_run, image_tokens, model_ladder, predict_stage_tokens
+
+A4 = {"width": 595.0, "height": 842.0}
+
+
+def make_assessment(text_pages: int, image_pages: int, page_count: int | None = None) -> dict:
+    text = {"text_length": 3500, "is_image_page": False, "page_dimensions": A4}
+    image = {"text_length": 0, "is_image_page": True, "page_dimensions": A4}
+    details = [dict(text) for _ in range(text_pages)] + [dict(image) for _ in range(image_pages)]
+    return {"file_info": {"page_count": page_count or len(details)}, "content_analysis": {"page_details": details}}
+
+
+class TestPredictStageTokens:
+    def test_image_tokens_are_capped_by_max_edge(self):
+        assert image_tokens(A4["width"], A4["height"], dpi=72) == -(-595 * 842 // 750)
+        assert image_tokens(A4["width"], A4["height"], dpi=600) == image_tokens(A4["width"], A4["height"], dpi=1200)
+        assert image_tokens(A4["width"], A4["height"], dpi=600) <= MAX_IMAGE_EDGE**2 / 750
+
+    def test_text_only_document_skips_conversion(self):
+        stages, vision_pages = predict_stage_tokens(make_assessment(text_pages=3, image_pages=0))
+
+        assert vision_pages == 0
+        assert set(stages) == {"detector_result", "redact_result"}
+        assert stages["redact_result"][1] == 3000
+
+    def test_scanned_pages_need_conversion(self):
+        stages, vision_pages = predict_stage_tokens(make_assessment(text_pages=1, image_pages=2))
+
+        assert vision_pages == 2
+        assert stages["convert_result"][0] > stages["detector_result"][0]
+
+    def test_sampled_assessment_is_scaled_to_page_count(self):
+        full, _ = predict_stage_tokens(make_assessment(text_pages=10, image_pages=10))
+        sampled, vision_pages = predict_stage_tokens(make_assessment(text_pages=1, image_pages=1, page_count=20))
+
+        assert vision_pages == 10
+        assert sampled["detector_result"] == full["detector_result"]
+
+
+class TestBudgetRouter:
+    def test_unlimited_budget_accepts_preferred_models(self):
+        decision = BudgetRouter().route("a.pdf", make_assessment(text_pages=1, image_pages=1))
+
+        assert decision.status == "accepted"
+        assert decision.models == {"convert_result": MODEL_IDS["default"], "detector_result": MODEL_IDS["haiku"], "redact_result": MODEL_IDS["haiku"]}
+
+    def test_tight_budget_downgrades(self):
+        assessment = make_assessment(text_pages=1, image_pages=1)
+        preferred = BudgetRouter().route("a.pdf", assessment)
+
+        decision = BudgetRouter(document_budget=preferred.cost * 0.9).route("a.pdf", assessment)
+
+        assert decision.status == "downgraded"
+        assert decision.cost <= preferred.cost * 0.9
+        assert decision.models["convert_result"] != MODEL_IDS["default"]
+
+    def test_impossible_budget_refuses(self):
+        decision = BudgetRouter(document_budget=0.0).route("a.pdf", make_assessment(text_pages=1, image_pages=0))
+
+        assert decision.status == "refused"
+        assert set(decision.models.values()) == {MODEL_IDS["nova_lite"]}
+
+    def test_routed_models_start_the_ladders(self):
+        models = {**STAGE_MODELS, "convert_result": ModelConfig(model_id="sonnet4_5"), "redact_result": ModelConfig(model_id="nova_lite")}
+
+        decision = BudgetRouter().route("a.pdf", make_assessment(text_pages=1, image_pages=1), models)
+
+        assert decision.models == {"convert_result": MODEL_IDS["sonnet4_5"], "detector_result": MODEL_IDS["haiku"], "redact_result": MODEL_IDS["nova_lite"]}
+
+    def test_downgrade_keeps_other_routed_models(self):
+        models = {**STAGE_MODELS, "detector_result": ModelConfig(model_id="default")}
+        assessment = make_assessment(text_pages=3, image_pages=0)
+        routed = BudgetRouter().route("a.pdf", assessment, models)
+
+        decision = BudgetRouter(document_budget=routed.cost * 0.9).route("a.pdf", assessment, models)
+
+        assert decision.status == "downgraded"
+        assert decision.models["detector_result"] != MODEL_IDS["default"]
+        assert decision.models["redact_result"] == MODEL_IDS["haiku"]
+
+    def test_model_ladder_only_offers_cheaper_models(self):
+        assert model_ladder("haiku") == (MODEL_IDS["haiku"], MODEL_IDS["nova_lite"])
+        assert model_ladder("nova_lite") == (MODEL_IDS["nova_lite"],)
+
+    def test_batch_budget_is_reserved(self):
+        assessment = make_assessment(text_pages=1, image_pages=0)
+        cost = BudgetRouter().route("a.pdf", assessment).cost
+        router = BudgetRouter(batch_budget=cost * 1.5)
+
+        assert router.route("a.pdf", assessment).status == "accepted"
+        assert router.route("b.pdf", assessment).status != "accepted"
+        assert router.spent <= cost * 1.5
+
+    def test_preflight_raises_when_refused(self):
+        with pytest.raises(BudgetExceededError):
+            preflight.preflight("a.pdf", BudgetRouter(document_budget=0.0), make_assessment(text_pages=1, image_pages=0))
+
+
+class TestDryRun:
+    def test_reports_every_document(self, tmp_path, monkeypatch, capsys):
+        for name in ("b.pdf", "a.pdf", "notes.txt"):
+            (tmp_path / name).touch()
+        monkeypatch.setattr(preflight, "cached_assess_doc_quality", lambda file_path: make_assessment(text_pages=2, image_pages=1))
+
+        decisions = dry_run(str(tmp_path))
+
+        assert [decision.file_path for decision in decisions] == [str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")]
+        assert "Total: 2/2 documents accepted" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+import fitz
+
+from doc_redaction.utils import commons
+from doc_redaction.utils.doc_reader import pdf_to_png
+from doc_redaction.utils.render_cache import RenderCache
+
+KEY = ("ab" * 32, 0, 200, "RGB", "png")
+
+
+class TestRenderCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = RenderCache(cache_dir=str(tmp_path))
+
+        assert cache.get(*KEY) is None
+        cache.put(*KEY, b"image")
+
+        assert cache.get(*KEY) == b"image"
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert cache.stats.hit_rate == 0.5
+
+    def test_entries_follow_the_umask(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(commons, "UMASK", 0o022)
+        cache = RenderCache(cache_dir=str(tmp_path))
+
+        cache.put(*KEY, b"image")
+
+        assert cache.path(*KEY).stat().st_mode & 0o777 == 0o644
+
+    def test_render_settings_are_part_of_the_key(self, tmp_path):
+        cache = RenderCache(cache_dir=str(tmp_path))
+        cache.put(*KEY, b"image")
+
+        assert cache.get(KEY[0], 0, 300, "RGB", "png") is None
+        assert cache.get(KEY[0], 0, 200, "GRAY", "png") is None
+        assert cache.get(KEY[0], 1, 200, "RGB", "png") is None
+
+    def test_evicts_least_recently_used_entries(self, tmp_path):
+        cache = RenderCache(cache_dir=str(tmp_path), max_bytes=10)
+        cache.put(KEY[0], 0, 200, "RGB", "png", b"12345")
+        cache.put(KEY[0], 1, 200, "RGB", "png", b"12345")
+        old = cache.path(KEY[0], 0, 200, "RGB", "png")
+        os.utime(old, (0, 0))
+
+        cache.put(KEY[0], 2, 200, "RGB", "png", b"12345")
+
+        assert not old.exists()
+        assert cache.size() == 10
+        assert cache.stats.evictions == 1
+
+
+class TestPdfToPngCache:
+    def test_repeated_render_is_served_from_cache(self, tmp_path, monkeypatch):
+        pdf = tmp_path / "doc.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Vertrag")
+        doc.save(pdf)
+        doc.close()
+        cache = RenderCache(cache_dir=str(tmp_path / "cache"))
+
+        first = pdf_to_png(pdf, tmp_path / "out", cache=cache)
+        monkeypatch.setattr(fitz.Page, "get_pixmap", lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("re-rendered")))
+        second = pdf_to_png(pdf, tmp_path / "out2", cache=cache)
+
+        assert cache.stats.hits == 1
+        assert Path(first[0]).read_bytes() == Path(second[0]).read_bytes()
+
+    def test_clipped_renders_are_cached_separately(self, tmp_path):
+        pdf = tmp_path / "doc.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Vertrag")
+        doc.save(pdf)
+        doc.close()
+        cache = RenderCache(cache_dir=str(tmp_path / "cache"))
+
+        whole = pdf_to_png(pdf, tmp_path / "out", cache=cache)
+        clipped = pdf_to_png(pdf, tmp_path / "out2", cache=cache, clips={0: (60.0, 50.0, 200.0, 90.0)})
+
+        assert cache.stats.hits == 0
+        assert fitz.Pixmap(clipped[0]).width < fitz.Pixmap(whole[0]).width
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from strands import Agent
+from strands.models.bedrock import BedrockModel
+from strands.models.model import Model
+from strands_tools import current_time
+
+from doc_redaction.agent import create_model
+from doc_redaction.utils.commons import InvalidResponseCacheModeError, ResponseCacheMissError
+from doc_redaction.utils.response_cache import CachedModel, ResponseCache, configure_response_cache, request_key
+
+
+class FakeModel(Model):
+    """Answers every request with a fixed text and counts the calls."""
+
+    def __init__(self, text: str = "converted") -> None:
+        self.text = text
+        self.calls = 0
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {"model_id": "fake"}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        yield {"output": output_model()}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        for event in (
+            {"messageStart": {"role": "assistant"}},
+            {"contentBlockDelta": {"delta": {"text": self.text}}},
+            {"contentBlockStop": {}},
+            {"messageStop": {"stopReason": "end_turn"}},
+            {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 2, "totalTokens": 12}, "metrics": {"latencyMs": 5}}},
+        ):
+            yield event
+
+
+class ToolCallingModel(FakeModel):
+    """Calls current_time on the first request of a conversation and answers with a fixed text once it has the result."""
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        if any("toolResult" in block for block in messages[-1]["content"]):
+            async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+        self.calls += 1
+        for event in (
+            {"messageStart": {"role": "assistant"}},
+            {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "tooluse_1", "name": "current_time"}}}},
+            {"contentBlockDelta": {"delta": {"toolUse": {"input": "{}"}}}},
+            {"contentBlockStop": {}},
+            {"messageStop": {"stopReason": "tool_use"}},
+            {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 2, "totalTokens": 12}, "metrics": {"latencyMs": 5}}},
+        ):
+            yield event
+
+
+def _image_message(data: bytes) -> list:
+    return [{"role": "user", "content": [{"text": "Convert page 1 to markdown."}, {"image": {"format": "png", "source": {"bytes": data}}}]}]
+
+
+async def _collect(model: Model, messages: list) -> list:
+    return [event async for event in model.stream(messages, None, "system")]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(cache_dir=str(tmp_path))
+
+
+class TestCachedModel:
+    def test_agent_replays_recorded_response(self, cache):
+        recorder = FakeModel()
+        assert str(Agent(model=CachedModel(recorder, cache), system_prompt="system")("page")).strip() == "converted"
+
+        replayer = FakeModel(text="other")
+        result = Agent(model=CachedModel(replayer, cache, mode="replay"), system_prompt="system")("page")
+
+        assert str(result).strip() == "converted"
+        assert (recorder.calls, replayer.calls) == (1, 0)
+        assert cache.stats.hits == 1
+
+    def test_replay_of_run_with_volatile_tool_call(self, cache):
+        recorder = ToolCallingModel()
+        Agent(model=CachedModel(recorder, cache), system_prompt="system", tools=[current_time])("What time is it?")
+
+        replayer = ToolCallingModel(text="other")
+        result = Agent(model=CachedModel(replayer, cache, mode="replay"), system_prompt="system", tools=[current_time])("What time is it?")
+
+        assert str(result).strip() == "converted"
+        assert (recorder.calls, replayer.calls) == (2, 0)
+
+    def test_replay_miss_raises(self, cache):
+        with pytest.raises(ResponseCacheMissError):
+            asyncio.run(_collect(CachedModel(FakeModel(), cache, mode="replay"), _image_message(b"page")))
+
+    def test_key_covers_image_bytes(self, cache):
+        model = FakeModel()
+        cached = CachedModel(model, cache)
+        asyncio.run(_collect(cached, _image_message(b"page 1")))
+        asyncio.run(_collect(cached, _image_message(b"page 1")))
+        asyncio.run(_collect(cached, _image_message(b"page 2")))
+
+        assert model.calls == 2
+
+    def test_key_covers_config(self):
+        messages = _image_message(b"page")
+
+        assert request_key({"model_id": "a"}, messages=messages) == request_key({"model_id": "a"}, messages=messages)
+        assert request_key({"model_id": "a"}, messages=messages) != request_key({"model_id": "b"}, messages=messages)
+
+    def test_size_cap_evicts(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path), max_bytes=600)
+        cached = CachedModel(FakeModel(), cache)
+        for page in range(4):
+            asyncio.run(_collect(cached, _image_message(bytes([page]))))
+
+        assert cache.size() <= 600
+        assert cache.stats.evictions > 0
+
+    def test_invalid_mode(self, cache):
+        with pytest.raises(InvalidResponseCacheModeError):
+            CachedModel(FakeModel(), cache, mode="off")
+
+
+class TestConfigureResponseCache:
+    def test_create_model_wraps_when_configured(self, cache):
+        try:
+            configure_response_cache("replay", cache)
+            model = create_model()
+        finally:
+            configure_response_cache("off")
+
+        assert isinstance(model, CachedModel)
+        assert isinstance(model.model, BedrockModel)
+        assert model.config["model_id"] == model.model.config["model_id"]
+        assert isinstance(create_model(), BedrockModel)
+
+    def test_invalid_mode(self):
+        with pytest.raises(InvalidResponseCacheModeError):
+            configure_response_cache("playback")
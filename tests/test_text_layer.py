@@ -0,0 +1,83 @@
+import fitz
+
+from doc_redaction.utils.doc_assessment import assess_doc_quality
+from doc_redaction.utils.layout_profile import LayoutProfile
+from doc_redaction.utils.text_layer import TextLayerConversion, convert_text_layer, is_strong_page, page_to_markdown
+
+BODY = "Die Rocketbase GmbH erbringt Dienstleistungen im Bereich Dokumentenverarbeitung und Hosting."
+
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        y = 72
+        for text, size in lines:
+            page.insert_text((72, y), text, fontsize=size)
+            y += size * 2
+    doc.save(path)
+    doc.close()
+    return str(path)
+
+
+class TestPageToMarkdown:
+    def test_larger_font_becomes_heading(self, tmp_path):
+        pdf = _write_pdf(tmp_path / "doc.pdf", [[("Vertrag", 24), (BODY, 11)]])
+
+        with fitz.open(pdf) as doc:
+            markdown = page_to_markdown(doc[0])
+
+        assert markdown.splitlines()[0] == "# Vertrag"
+        assert BODY in markdown
+
+    def test_bullets_become_list_items(self, tmp_path):
+        pdf = _write_pdf(tmp_path / "doc.pdf", [[(BODY, 11), ("- Hosting von Anwendungen", 11)]])
+
+        with fitz.open(pdf) as doc:
+            markdown = page_to_markdown(doc[0])
+
+        assert "- Hosting von Anwendungen" in markdown
+
+
+class TestIsStrongPage:
+    def test_page_with_issue_is_weak(self):
+        assert not is_strong_page({"text_length": 500, "potential_issue": "Low text density - possible scanned document"})
+
+    def test_image_page_is_weak(self):
+        assert not is_strong_page({"text_length": 500, "is_image_page": True})
+
+    def test_text_page_is_strong(self):
+        assert is_strong_page({"text_length": 500, "is_image_page": False})
+
+    def test_multi_column_page_is_weak(self):
+        assert not is_strong_page({"text_length": 500, "is_image_page": False}, LayoutProfile(page_number=1, column_count=2))
+        assert is_strong_page({"text_length": 500, "is_image_page": False}, LayoutProfile(page_number=1, column_count=1))
+
+
+class TestConvertTextLayer:
+    def test_blank_pages_are_left_for_visual_conversion(self, tmp_path):
+        pdf = _write_pdf(tmp_path / "doc.pdf", [[(BODY, 11)] * 20, []])
+
+        conversion = convert_text_layer(pdf, assess_doc_quality(pdf))
+
+        assert conversion.weak_pages == [1]
+        assert not conversion.is_complete
+        assert BODY in (conversion.pages[0] or "")
+
+    def test_multi_column_pages_are_left_for_visual_conversion(self, tmp_path):
+        pdf = tmp_path / "columns.pdf"
+        doc = fitz.open()
+        page = doc.new_page()
+        for x in (50, 320):
+            for row in range(20):
+                page.insert_text((x, 100 + row * 16), "Lorem ipsum dolor sit amet", fontsize=9)
+        doc.save(pdf)
+        doc.close()
+
+        assert convert_text_layer(str(pdf), assess_doc_quality(str(pdf))).weak_pages == [0]
+
+    def test_complete_conversion(self):
+        conversion = TextLayerConversion(pages=["# Page", "text"])
+
+        assert conversion.is_complete
+        assert conversion.weak_pages == []
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from doc_redaction.utils.commons import InvalidLedgerGroupingError
+from doc_redaction.utils.node_metrics import NodeMetrics
+from doc_redaction.utils.token_ledger import LedgerRow, TokenLedger
+from doc_redaction.workflow import ledger_rows
+
+HAIKU = "eu.anthropic.claude-haiku-4-5-20251001-v1:0"
+SONNET = "eu.anthropic.claude-sonnet-4-20250514-v1:0"
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with TokenLedger(path=str(tmp_path / "ledger.sqlite"), batch_size=3) as ledger:
+        yield ledger
+
+
+def _row(day: str, model: str = HAIKU, key: str = "vertrag", stage: str = "detector_result", tokens: int = 100) -> LedgerRow:
+    return LedgerRow(
+        run_id=day,
+        document_key=key,
+        stage=stage,
+        model_id=model,
+        input_tokens=tokens,
+        output_tokens=10,
+        input_cost=0.5,
+        output_cost=0.25,
+        latency_ms=40,
+        timestamp=f"{day}T10:00:00+00:00",
+    )
+
+
+class TestTokenLedger:
+    def test_writes_in_batches(self, ledger):
+        ledger.record(_row("2026-01-01"))
+        ledger.record(_row("2026-01-01"))
+        assert not ledger.path.exists()
+
+        ledger.record(_row("2026-01-02"))
+
+        assert ledger.connection.execute("SELECT COUNT(*) FROM token_usage").fetchone() == (3,)
+
+    def test_close_writes_pending_rows(self, tmp_path):
+        path = tmp_path / "ledger.sqlite"
+        with TokenLedger(path=str(path)) as ledger:
+            ledger.record(_row("2026-01-01"))
+
+        assert sqlite3.connect(path).execute("SELECT document_key, day FROM token_usage").fetchall() == [("vertrag", "2026-01-01")]
+
+    def test_aggregate_by_grouping(self, ledger):
+        ledger.record_many([
+            _row("2026-01-01", model=HAIKU, key="a", stage="detector_result"),
+            _row("2026-01-01", model=SONNET, key="b", stage="convert_result", tokens=300),
+            _row("2026-01-02", model=HAIKU, key="a", stage="redact_result"),
+            _row("2026-01-02", model=HAIKU, key="a", stage="redact_result"),
+        ])
+
+        by_day = ledger.aggregate(by="day")
+        by_model = ledger.aggregate(by="model")
+
+        assert [(row["day"], row["calls"], row["input_tokens"]) for row in by_day] == [("2026-01-01", 2, 400), ("2026-01-02", 2, 200)]
+        assert {row["model"]: row["calls"] for row in by_model} == {HAIKU: 3, SONNET: 1}
+        assert {row["document"]: row["costs"] for row in ledger.aggregate(by="document")} == {"a": 2.25, "b": 0.75}
+        assert {row["stage"]: row["latency_ms"] for row in ledger.aggregate(by="stage")} == {"convert_result": 40, "detector_result": 40, "redact_result": 80}
+
+    def test_aggregate_day_range(self, ledger):
+        ledger.record_many([_row("2026-01-01"), _row("2026-01-15"), _row("2026-02-01")])
+
+        assert [row["day"] for row in ledger.aggregate(by="day", start="2026-01-02", end="2026-01-31")] == ["2026-01-15"]
+
+    def test_rollup_matches_raw_rows(self, ledger):
+        ledger.record_many([_row("2026-01-01", tokens=tokens) for tokens in range(10)])
+        ledger.flush()
+
+        raw = ledger.connection.execute("SELECT SUM(input_tokens) FROM token_usage").fetchone()[0]
+        assert ledger.aggregate(by="day")[0]["input_tokens"] == raw == 45
+
+    def test_invalid_grouping(self, ledger):
+        with pytest.raises(InvalidLedgerGroupingError):
+            ledger.aggregate(by="week")
+
+
+class TestLedgerRows:
+    def test_one_row_per_node(self):
+        metrics = {
+            "detector_result": NodeMetrics(node="detector_result", model_id=HAIKU, status="completed", model_latency_ms=1500, input_tokens=1000, cache_read_tokens=50),
+            "redact_result": NodeMetrics(node="redact_result", model_id=HAIKU, status="completed", input_tokens=10),
+        }
+
+        rows = ledger_rows("vertrag", metrics)
+
+        assert [row.stage for row in rows] == ["detector_result", "redact_result"]
+        assert rows[0].run_id == rows[1].run_id
+        assert (rows[0].model_id, rows[0].input_tokens, rows[0].cache_read_tokens, rows[0].latency_ms) == (HAIKU, 1000, 50, 1500)
+        assert rows[0].input_cost == pytest.approx(1000 * 0.25 / 1_000_000)
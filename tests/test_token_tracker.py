@@ -0,0 +1,229 @@
+import importlib
+import json
+import threading
+from typing import Any
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+from doc_redaction.agent import STAGE_MODELS, load_model_routing
+from doc_redaction.utils import token_tracker
+from doc_redaction.utils.commons import InvalidContentType, InvalidTokenCountMethodError, UnpricedModelError
+from doc_redaction.utils.token_cache import TokenCountCache, content_hash
+from doc_redaction.utils.token_tracker import check_model_pricing, count_tokens, count_tokens_many, estimate_tokens, is_priced, summarize_token_usage, token_usage
+
+HAIKU = "eu.anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+class StubClient:
+    def __init__(self, tokens: int = 42, throttle: int = 0) -> None:
+        self.tokens = tokens
+        self.throttle = throttle
+        self.calls: list[dict] = []
+        self._lock = threading.Lock()
+
+    def count_tokens(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+            if self.throttle:
+                self.throttle -= 1
+                raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "CountTokens")
+        return {"inputTokens": self.tokens + len(kwargs["input"]["invokeModel"]["body"])}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    cache = TokenCountCache()
+    monkeypatch.setattr(token_tracker, "TOKEN_CACHE", cache)
+    monkeypatch.setattr(token_tracker.time, "sleep", lambda _: None)
+    return cache
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    client = StubClient()
+    monkeypatch.setattr(token_tracker, "bedrock_runtime", lambda: client)
+    return client
+
+
+class TestBedrockClient:
+    def test_import_creates_no_client(self, monkeypatch):
+        monkeypatch.setattr(boto3, "client", lambda *args, **kwargs: pytest.fail("client created at import"))
+
+        importlib.reload(token_tracker)
+
+    def test_client_is_created_once(self, monkeypatch):
+        created = []
+        monkeypatch.setattr(boto3, "client", lambda *args, **kwargs: created.append(args) or object())
+        token_tracker.bedrock_runtime.cache_clear()
+
+        assert token_tracker.bedrock_runtime() is token_tracker.bedrock_runtime()
+        assert created == [("bedrock-runtime",)]
+        token_tracker.bedrock_runtime.cache_clear()
+
+
+class TestCountTokens:
+    def test_exact_calls_bedrock(self, stub_client):
+        result = count_tokens("Hallo Welt", HAIKU, "inputTokens")
+
+        tokens = 42 + len(stub_client.calls[0]["input"]["invokeModel"]["body"])
+        assert result["tokens"] == tokens
+        assert result["costs"] == pytest.approx(tokens * 0.25 / 1_000_000)
+        assert stub_client.calls[0]["modelId"] == HAIKU.removeprefix("eu.")
+
+    def test_estimate_needs_no_client(self, stub_client):
+        result = count_tokens("Hallo Welt", HAIKU, "inputTokens", method="estimate")
+
+        assert result["tokens"] == estimate_tokens("Hallo Welt")
+        assert stub_client.calls == []
+
+    def test_precomputed_count(self, stub_client):
+        assert count_tokens(1000, model=HAIKU, method="estimate")["tokens"] == 1000
+        assert stub_client.calls == []
+
+    def test_invalid_method(self):
+        with pytest.raises(InvalidTokenCountMethodError):
+            count_tokens("Hallo", method="guess")
+
+    def test_invalid_content(self):
+        # callers outside the type checker, e.g. JSON token counts, can pass other types
+        content: Any = 1.5
+        with pytest.raises(InvalidContentType):
+            count_tokens(content)
+
+    def test_token_usage_passes_method(self, stub_client):
+        usage = token_usage({"inputTokens": "Vertrag", "outputTokens": 10, "totalTokens": 99}, model=HAIKU, method="estimate")
+
+        assert set(usage) == {"inputTokens", "outputTokens"}
+        assert usage["inputTokens"]["tokens"] == estimate_tokens("Vertrag")
+        assert stub_client.calls == []
+
+
+class TestCountTokensMany:
+    def test_deduplicates_and_keeps_order(self, stub_client):
+        counts = count_tokens_many(["a", "bb", "a", "ccc", "bb"], model=HAIKU)
+
+        assert len(stub_client.calls) == 3
+        assert counts[0] == counts[2]
+        assert counts[1] == counts[4]
+        assert counts[0] < counts[1] < counts[3]
+
+    def test_cached_strings_are_not_requested_again(self, stub_client, fresh_cache):
+        first = count_tokens_many(["Präambel", "§ 1 Vertragsgegenstand"], model=HAIKU)
+        second = count_tokens_many(["§ 1 Vertragsgegenstand", "Präambel"], model=HAIKU)
+
+        assert second == first[::-1]
+        assert len(stub_client.calls) == 2
+        assert fresh_cache.stats.hits == 2
+
+    def test_cache_is_keyed_by_model(self, stub_client):
+        count_tokens_many(["Präambel"], model=HAIKU)
+        count_tokens_many(["Präambel"], model="eu.anthropic.claude-sonnet-4-20250514-v1:0")
+
+        assert len(stub_client.calls) == 2
+
+    def test_retries_throttling(self):
+        client = StubClient(throttle=2)
+
+        counts = count_tokens_many(["a", "b", "c"], model=HAIKU, client=client, max_workers=3)
+
+        assert len(client.calls) == 5
+        assert len(counts) == 3
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        monkeypatch.setattr(token_tracker, "MAX_RETRIES", 1)
+
+        with pytest.raises(ClientError):
+            count_tokens_many(["a"], model=HAIKU, client=StubClient(throttle=5))
+
+    def test_other_errors_are_not_retried(self):
+        class FailingClient(StubClient):
+            def count_tokens(self, **kwargs):
+                self.calls.append(kwargs)
+                raise ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "CountTokens")
+
+        client = FailingClient()
+        with pytest.raises(ClientError):
+            count_tokens_many(["a"], model=HAIKU, client=client)
+        assert len(client.calls) == 1
+
+    def test_estimate(self, stub_client):
+        assert count_tokens_many(["a", "b"], method="estimate") == [estimate_tokens("a"), estimate_tokens("b")]
+        assert stub_client.calls == []
+
+
+class TestTokenCountCache:
+    def test_lru_eviction(self):
+        cache = TokenCountCache(max_entries=2)
+        for digest, tokens in (("a", 1), ("b", 2)):
+            cache.put(HAIKU, digest, tokens)
+        cache.get(HAIKU, "a")
+        cache.put(HAIKU, "c", 3)
+
+        assert cache.get(HAIKU, "b") is None
+        assert cache.get(HAIKU, "a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_disk_cache_survives_restart(self, tmp_path):
+        digest = content_hash("Präambel")
+        TokenCountCache(cache_dir=str(tmp_path)).put(HAIKU, digest, 7)
+
+        restarted = TokenCountCache(cache_dir=str(tmp_path))
+
+        assert restarted.get(HAIKU, digest) == 7
+        path = restarted.path(HAIKU, digest)
+        assert path is not None
+        assert path.is_file()
+
+
+class TestPromptCacheAccounting:
+    def test_cache_tokens_are_priced(self):
+        usage = token_usage({"inputTokens": 1000, "outputTokens": 10, "cacheReadInputTokens": 4000, "cacheWriteInputTokens": 2000}, model=HAIKU)
+
+        assert usage["cacheReadInputTokens"]["costs"] == pytest.approx(4000 * 0.025 / 1_000_000)
+        assert usage["cacheWriteInputTokens"]["costs"] == pytest.approx(2000 * 0.3125 / 1_000_000)
+
+    def test_every_model_has_cache_rates(self):
+        models = {category.rsplit("_", 1)[0] for category in token_tracker._COST_RATES}
+
+        for model in models:
+            assert all(f"{model}_{token_type}" in token_tracker._COST_RATES for token_type in token_tracker.INPUT_TYPES)
+
+    def test_summary_reports_cache_tokens_and_hit_rate(self):
+        nodes = {
+            "detector_result": token_usage({"inputTokens": 1000, "outputTokens": 100, "cacheReadInputTokens": 3000, "cacheWriteInputTokens": 0}, model=HAIKU),
+            "redact_result": token_usage({"inputTokens": 1000, "outputTokens": 100, "cacheWriteInputTokens": 3000}, model=HAIKU),
+        }
+
+        summary = json.loads(summarize_token_usage(nodes))
+
+        assert summary["token_type"]["cacheReadInputTokens"]["total_tokens"] == 3000
+        assert summary["token_type"]["cacheWriteInputTokens"]["total_tokens"] == 3000
+        assert summary["grand_total"]["tokens"] == 2000 + 200 + 6000
+        assert summary["cache_hit_rate"] == pytest.approx(3000 / 8000)
+
+
+class TestEstimateTokens:
+    def test_scales_with_length(self):
+        assert estimate_tokens("") == token_tracker.MESSAGE_OVERHEAD_TOKENS
+        assert estimate_tokens("a" * 350) == 100 + token_tracker.MESSAGE_OVERHEAD_TOKENS
+
+    def test_non_ascii_weighs_more(self):
+        assert estimate_tokens("ä" * 70) > estimate_tokens("a" * 70)
+
+
+class TestModelPricing:
+    def test_stage_models_are_priced(self):
+        assert check_model_pricing(STAGE_MODELS) == STAGE_MODELS
+        assert is_priced("nova_lite")
+        assert is_priced(HAIKU)
+
+    def test_unpriced_routing_is_rejected(self, tmp_path):
+        path = tmp_path / "routing.json"
+        path.write_text('{"redact_result": {"model_id": "nova_pro"}}')
+
+        with pytest.raises(UnpricedModelError) as error:
+            check_model_pricing(load_model_routing(str(path)))
+
+        assert error.value.stage == "redact_result"
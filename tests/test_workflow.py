@@ -0,0 +1,50 @@
+import fitz
+
+from doc_redaction import workflow
+from doc_redaction.agent import MODEL_IDS
+from doc_redaction.output import SensitiveData
+from doc_redaction.utils.node_metrics import NodeMetrics
+from doc_redaction.utils.ocr import OcrPage
+from doc_redaction.utils.page_conversion import PageConversion
+from doc_redaction.utils.page_dedup import PageHashIndex
+from doc_redaction.utils.token_ledger import TokenLedger
+from doc_redaction.workflow import TASK_PREFIX, build_task_prompt, run_doc_processing_wf
+
+
+class TestBuildTaskPrompt:
+    def test_static_prefix_comes_first(self):
+        first = build_task_prompt("Convert page 1.", "data/confidential/a.json", "data/redact/a.md")
+        second = build_task_prompt("The markdown is ...", "data/confidential/b.json", "data/redact/b.md")
+
+        assert first[0] == second[0] == {"text": TASK_PREFIX}
+        assert first[1] == {"cachePoint": {"type": "default"}}
+
+    def test_document_details_come_last(self):
+        prompt = build_task_prompt("Convert page 1.", "data/confidential/a.json", "data/redact/a.md")
+
+        assert "data/confidential/a.json" in prompt[-1]["text"]
+        assert "data/redact/a.md" in prompt[-1]["text"]
+        assert "Convert page 1." in prompt[-1]["text"]
+        assert "data/" not in TASK_PREFIX
+
+    def test_prefix_contains_the_output_schema(self):
+        assert all(field in TASK_PREFIX for field in SensitiveData.model_json_schema()["properties"])
+
+
+class TestPageIndex:
+    def test_vision_pages_are_indexed(self, tmp_path, monkeypatch):
+        (tmp_path / "data" / "contract").mkdir(parents=True)
+        doc = fitz.open()
+        doc.new_page().draw_rect(fitz.Rect(72, 200, 300, 400), fill=(0, 0, 0))
+        doc.save(tmp_path / "data" / "contract" / "scan.pdf")
+        doc.close()
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(workflow, "PAGE_INDEX", PageHashIndex())
+        monkeypatch.setattr(workflow, "TOKEN_LEDGER", TokenLedger(str(tmp_path / "ledger.sqlite")))
+        monkeypatch.setattr(workflow, "ocr_pages", lambda paths: [OcrPage(image_path=path, markdown="", confidence=0.0, word_count=0) for path in paths])
+        metrics = NodeMetrics(node="convert_result", model_id=MODEL_IDS["default"], status="completed")
+        monkeypatch.setattr(workflow, "convert_pages", lambda images, **kwargs: PageConversion(pages=dict.fromkeys(images, "# Scan"), metrics=metrics, requests=1))
+
+        run_doc_processing_wf("scan", mode="local")
+
+        assert list(workflow.PAGE_INDEX.markdown.values()) == ["# Scan"]